@@ -10,39 +10,45 @@ import sys
 import time
 import subprocess
 import re
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from dotenv import load_dotenv
 
-# Import smol-agents
-from smolagents import (
-    CodeAgent,
-    LiteLLMModel,
-    tool,
-)
+# smolagents (and litellm through it) take seconds to import, so they are
+# only loaded when a phase first creates a model or an agent
+from src.archetypes import ArchetypeMatch, classifier
+from src.core import TaskContext, config, log, span, start_trace, task_context
+from src.llm import LLMMetrics, collect_llm_metrics, current_phase, llm_phase
+from src.prompts import render
+from src.runner.checkpoint import Checkpoint, file_sha256
+from src.runner.early_exit import EarlyExit
+from src.runner.revision import changed_definitions, select_tests
+from src.runner.speculative import SpeculativeCandidate, SpeculativeCoder
+from src.runner.validation import check_contract_compiles
+from src.scaffold import copy_project, instantiate, new_project_dir, template_dir, workspace_gc
 
 load_dotenv()
 
 
-def log(msg: str):
-    """Print timestamped message to stdout for backend to capture"""
-    ts = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
-    print(f"[{ts}] {msg}", flush=True)
-
-
 def run_command(cmd: List[str], cwd: Optional[str] = None, input_text: Optional[str] = None) -> tuple[int, str, str]:
     """Execute a shell command and return exit code, stdout, stderr"""
     log(f"Running command: {' '.join(cmd)}")
     try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            input=input_text,
-            timeout=300,  # 5 minute timeout
-        )
+        with span("subprocess", command=' '.join(cmd)) as s:
+            result = subprocess.run(
+                cmd,
+                cwd=cwd,
+                capture_output=True,
+                text=True,
+                input=input_text,
+                timeout=300,  # 5 minute timeout
+            )
+            if s:
+                s.set_attribute("returncode", result.returncode)
         return result.returncode, result.stdout, result.stderr
     except subprocess.TimeoutExpired:
         log(f"Command timed out: {' '.join(cmd)}")
@@ -52,179 +58,154 @@ def run_command(cmd: List[str], cwd: Optional[str] = None, input_text: Optional[
         return 1, "", str(e)
 
 
-# Define tools for agents
-@tool
-def execute_shell_command(command: str) -> str:
-    """
-    Execute a shell command and return the output.
+# Tools of the agents that create and fix files
+FILE_TOOLS = ["write_file", "read_file", "replace_in_file", "apply_patch", "execute_shell_command"]
+_dependencies_installed = False
+_environment_ready = False
+_setup_lock = threading.Lock()
 
-    Args:
-        command: The shell command to execute
 
-    Returns:
-        The command output or error message
-    """
-    log(f"Tool: Executing shell command: {command}")
-    try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd="/workspace"
-        )
-        output = result.stdout if result.returncode == 0 else result.stderr
-        log(f"Command output: {output[:200]}...")
-        return output
-    except Exception as e:
-        error_msg = f"Error executing command: {str(e)}"
-        log(error_msg)
-        return error_msg
+def ensure_dependencies() -> None:
+    """Install the contract build dependencies once per process"""
+    global _dependencies_installed
+    with _setup_lock:
+        if _dependencies_installed:
+            return
+        log("Installing Python dependencies...")
+        requirements = template_dir(config.SCAFFOLD_TEMPLATE) / "requirements.txt"
+        rc, stdout, stderr = run_command(["pip", "install", "-r", str(requirements)])
+        if rc != 0:
+            log(f"Warning: pip install had issues: {stderr}")
+        else:
+            _dependencies_installed = True
 
 
-@tool
-def read_file(filepath: str) -> str:
-    """
-    Read the contents of a file.
+def ensure_environment() -> None:
+    """Check AlgoKit and start LocalNet once per process"""
+    global _environment_ready
+    with _setup_lock:
+        if _environment_ready:
+            return
 
-    Args:
-        filepath: Path to the file to read
+        # Check if algokit is installed
+        rc, stdout, stderr = run_command(["algokit", "--version"])
+        if rc != 0:
+            log("ERROR: AlgoKit not installed!")
+            raise RuntimeError("AlgoKit not found in container")
 
-    Returns:
-        The file contents or error message
-    """
-    log(f"Tool: Reading file: {filepath}")
-    try:
-        full_path = Path("/workspace") / filepath
-        with open(full_path, 'r') as f:
-            content = f.read()
-        log(f"Read {len(content)} characters from {filepath}")
-        return content
-    except Exception as e:
-        error_msg = f"Error reading file: {str(e)}"
-        log(error_msg)
-        return error_msg
+        log(f"AlgoKit version: {stdout.strip()}")
+
+        # Start LocalNet
+        log("Starting AlgoKit LocalNet...")
+        run_command(["algokit", "localnet", "start"])
+        time.sleep(5)  # Give LocalNet time to start
+        _environment_ready = True
 
 
-@tool
-def write_file(filepath: str, content: str) -> str:
-    """
-    Write content to a file.
+@contextmanager
+def phase(name: str):
+    """Trace a pipeline phase and attribute its LLM calls to it"""
+    with span(f"phase.{name}"), llm_phase(name):
+        yield
 
-    Args:
-        filepath: Path to the file to write
-        content: Content to write to the file
 
-    Returns:
-        Success or error message
-    """
-    log(f"Tool: Writing to file: {filepath}")
-    try:
-        full_path = Path("/workspace") / filepath
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(full_path, 'w') as f:
-            f.write(content)
-        log(f"Wrote {len(content)} characters to {filepath}")
-        return f"Successfully wrote to {filepath}"
-    except Exception as e:
-        error_msg = f"Error writing file: {str(e)}"
-        log(error_msg)
-        return error_msg
+def new_agent(tool_names: List[str], **kwargs) -> Any:
+    """Create a CodeAgent with the named tools from src.tools"""
+    from smolagents import CodeAgent
+    from src import tools as agent_tools
 
+    return CodeAgent(tools=[getattr(agent_tools, name) for name in tool_names], **kwargs)
 
-@tool
-def search_documentation(query: str) -> str:
-    """
-    Search the AlgoKit documentation for information.
 
-    Args:
-        query: The search query
+def create_model(model_id: Optional[str] = None, **kwargs) -> Any:
+    """Initialize Azure OpenAI model (model_id and kwargs override the defaults)"""
+    from src.llm.model import AccountedLiteLLMModel
 
-    Returns:
-        Relevant documentation content
-    """
-    log(f"Tool: Searching documentation for: {query}")
-    try:
-        doc_path = Path(__file__).parent / "docs" / "algokit_guide.md"
-        with open(doc_path, 'r') as f:
-            docs = f.read()
-
-        # Simple keyword search - return relevant sections
-        lines = docs.split('\n')
-        relevant_lines = []
-        query_lower = query.lower()
-
-        for i, line in enumerate(lines):
-            if query_lower in line.lower():
-                # Include context (5 lines before and after)
-                start = max(0, i - 5)
-                end = min(len(lines), i + 6)
-                relevant_lines.extend(lines[start:end])
-                relevant_lines.append("---")
-
-        if relevant_lines:
-            result = '\n'.join(relevant_lines[:500])  # Limit size
-            log(f"Found {len(relevant_lines)} relevant lines")
-            return result
+    log("Initializing Azure OpenAI model...")
+
+    # Check for Azure OpenAI credentials
+    api_key = os.getenv("AZURE_OPENAI_API_KEY")
+    endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+    api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
+
+    if not api_key or not endpoint:
+        log("WARNING: Azure OpenAI credentials not found. Using fallback.")
+        # Fallback to OpenAI if available
+        if os.getenv("OPENAI_API_KEY"):
+            return AccountedLiteLLMModel(model_id=model_id or config.default_model_id, **kwargs)
         else:
-            return "No specific documentation found. Please refer to general AlgoKit commands: algokit init, algokit project run build, algokit project deploy localnet"
-    except Exception as e:
-        error_msg = f"Error searching documentation: {str(e)}"
-        log(error_msg)
-        return error_msg
+            raise ValueError("No LLM credentials found. Please set AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT")
+
+    # Configure for Azure OpenAI
+    model_id = model_id or config.default_model_id
+    log(f"Using Azure OpenAI model: {model_id}")
+
+    return AccountedLiteLLMModel(
+        model_id=model_id,
+        api_key=api_key,
+        api_base=endpoint,
+        api_version=api_version,
+        **kwargs,
+    )
 
 
 class AlgorandAgentSystem:
     """Multi-agent system for Algorand smart contract generation"""
 
-    def __init__(self, prompt: str):
+    def __init__(
+        self,
+        prompt: str,
+        model: Optional[Any] = None,
+        task_id: Optional[str] = None,
+        resume: bool = False,
+        revise_of: Optional[str] = None,
+    ):
+        """
+        Create the system; pass a model to share one LLM client between tasks.
+
+        With resume, the phases recorded in the task's checkpoint by an
+        earlier, failed run are not run again. With revise_of, the prompt is
+        a change to the contract of that earlier task, made to a copy of its
+        project instead of generating a new contract.
+        """
+        from src.tools import ToolCache
+
         self.prompt = prompt
-        self.workspace = Path("/workspace")
+        self.task_id = task_id or uuid.uuid4().hex[:8]
+        self.workspace = config.WORKSPACE_DIR
+        # Tools resolve paths and run commands relative to the task's context,
+        # never the process working directory
+        self.context = TaskContext(self.task_id[:8], self.workspace)
+        self.checkpoint = Checkpoint(self.task_id)
+        self.resume = resume
+        self.reused_phases: List[str] = []
+        self.revise_of = revise_of
+        # The original request followed by the revisions applied since
+        self.requests: List[str] = [prompt]
         self.project_name = None
+        self.project_dir = None
         self.contract_name = None
         self.app_id = None
         self.deployment_result = {}
-
-        # Initialize LLM
-        self.model = self._init_model()
-
-        # Initialize agents
-        self.tools = [
-            execute_shell_command,
-            read_file,
-            write_file,
-            search_documentation,
-        ]
-
-    def _init_model(self):
-        """Initialize Azure OpenAI model"""
-        log("Initializing Azure OpenAI model...")
-
-        # Check for Azure OpenAI credentials
-        api_key = os.getenv("AZURE_OPENAI_API_KEY")
-        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
-        deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT", "gpt-4o-mini")
-        api_version = os.getenv("AZURE_OPENAI_API_VERSION", "2024-02-15-preview")
-
-        if not api_key or not endpoint:
-            log("WARNING: Azure OpenAI credentials not found. Using fallback.")
-            # Fallback to OpenAI if available
-            if os.getenv("OPENAI_API_KEY"):
-                return LiteLLMModel(model_id="gpt-4o-mini")
-            else:
-                raise ValueError("No LLM credentials found. Please set AZURE_OPENAI_API_KEY and AZURE_OPENAI_ENDPOINT")
-
-        # Configure for Azure OpenAI
-        model_id = f"azure/{deployment}"
-        log(f"Using Azure OpenAI model: {deployment}")
-
-        return LiteLLMModel(
-            model_id=model_id,
-            api_key=api_key,
-            api_base=endpoint,
-            api_version=api_version,
-        )
+        self.prompt_stats: Dict[str, Dict[str, Any]] = {}
+        self.coding_report: Dict[str, Any] = {}
+        self.template_params: Dict[str, Any] = {}
+        self.testing_response = ""
+        self.tests_passed = False
+        self.artifacts: Dict[str, Any] = {}
+        self.early_exits: Dict[str, Dict[str, Any]] = {}
+        self.metrics = LLMMetrics()
+        self.tool_cache = ToolCache()
+
+        # The LLM client is created on first use: the template fast path needs none
+        self._model = model
+
+    @property
+    def model(self) -> Any:
+        """LLM shared by the agent phases"""
+        if self._model is None:
+            self._model = create_model()
+        return self._model
 
     def run(self) -> Dict[str, Any]:
         """Execute the complete agent workflow"""
@@ -232,83 +213,283 @@ class AlgorandAgentSystem:
         log("Starting Algorand Smart Contract AI Agent System")
         log("=" * 60)
 
+        from src.tools import use_tool_cache
+
+        tracer = start_trace()
+        with task_context(self.context), collect_llm_metrics(self.metrics), use_tool_cache(self.tool_cache):
+            return self._run_phases(tracer)
+
+    def _run_phases(self, tracer) -> Dict[str, Any]:
+        """Run the pipeline phases in order, skipping those restored from the checkpoint"""
         try:
+            if self.resume:
+                self.restore_checkpoint()
+
             # Phase 1: Project Setup
-            self.setup_project()
-
-            # Phase 2: Planning Agent - Analyze prompt and create plan
-            log("\n" + "=" * 60)
-            log("PHASE 2: PLANNING")
-            log("=" * 60)
-            requirements = self.planner_agent()
-
-            if not requirements:
-                log("WARNING: Planning returned no requirements, using basic structure")
-                requirements = ["Basic smart contract functionality"]
-
-            # Phase 3: Coding Agent - Generate smart contract
-            log("\n" + "=" * 60)
-            log("PHASE 3: CODE GENERATION")
-            log("=" * 60)
-            self.coding_agent()
-
-            # Phase 4: Testing Agent - Generate and run tests
-            log("\n" + "=" * 60)
-            log("PHASE 4: TESTING")
-            log("=" * 60)
-            tests_passed = self.testing_agent()
-
-            if not tests_passed:
+            if self.checkpoint.done("setup"):
+                # The restored project still needs the toolchain and LocalNet
+                ensure_environment()
+            elif self.revise_of:
+                with phase("setup_revision"):
+                    requirements = self.setup_revision()
+                self._record_setup()
+                self.checkpoint.record("plan", requirements=requirements)
+            else:
+                with phase("setup_project"):
+                    self.setup_project()
+                self._record_setup()
+
+            if not self.checkpoint.done("code"):
+                if self.revise_of:
+                    # Only the requested change is made to the copied contract
+                    with phase("revision_agent"):
+                        self.revision_agent(self.checkpoint.get("plan")["requirements"])
+                else:
+                    # Prompts matching a contract archetype are filled into its template,
+                    # skipping the LLM phases
+                    with phase("template"):
+                        templated = self.template_fast_path()
+
+                    if not templated:
+                        # Phase 2: Planning Agent - Analyze prompt and create plan
+                        log("\n" + "=" * 60)
+                        log("PHASE 2: PLANNING")
+                        log("=" * 60)
+                        if self.checkpoint.done("plan"):
+                            requirements = self.checkpoint.get("plan")["requirements"]
+                        else:
+                            with phase("planner_agent"):
+                                requirements = self.planner_agent()
+
+                            if not requirements:
+                                log("WARNING: Planning returned no requirements, using basic structure")
+                                requirements = ["Basic smart contract functionality"]
+                            self.checkpoint.record("plan", requirements=requirements)
+
+                        # Phase 3: Coding Agent - Generate smart contract
+                        log("\n" + "=" * 60)
+                        log("PHASE 3: CODE GENERATION")
+                        log("=" * 60)
+                        with phase("coding_agent"):
+                            self.coding_agent()
+
+                self.checkpoint.record(
+                    "code",
+                    coding_report=self.coding_report,
+                    template_params=self.template_params,
+                    contract_sha256=file_sha256(self.contract_path),
+                )
+
+            if not self.checkpoint.done("test"):
+                if self.coding_report.get("mode") == "template":
+                    with phase("template_tests"):
+                        self.tests_passed = self.run_tests()
+                elif self.coding_report.get("mode") == "revision":
+                    with phase("revision_tests"):
+                        self.tests_passed = self.run_tests(self.coding_report["tests"])
+                else:
+                    # Phase 4: Testing Agent - Generate and run tests
+                    log("\n" + "=" * 60)
+                    log("PHASE 4: TESTING")
+                    log("=" * 60)
+                    with phase("testing_agent"):
+                        self.tests_passed = self.testing_agent()
+                self.checkpoint.record(
+                    "test", tests_passed=self.tests_passed, response=self.testing_response[-4000:]
+                )
+
+            if not self.tests_passed:
                 log("WARNING: Tests did not pass, but continuing with deployment")
 
+            # Keep the compiled contract in the shared artifact store
+            if not self.checkpoint.done("artifacts"):
+                with phase("build_artifacts"):
+                    self.build_artifacts(self.tests_passed)
+                self.checkpoint.record("artifacts", artifacts=self.artifacts)
+
             # Phase 5: Deployment Agent - Deploy to LocalNet
-            log("\n" + "=" * 60)
-            log("PHASE 5: DEPLOYMENT")
-            log("=" * 60)
-            self.deployment_agent()
+            if not self.checkpoint.done("deploy"):
+                log("\n" + "=" * 60)
+                log("PHASE 5: DEPLOYMENT")
+                log("=" * 60)
+                with phase("deployment_agent"):
+                    self.deployment_agent()
+                self.checkpoint.record("deploy", app_id=self.app_id, deployment_result=self.deployment_result)
+
+            self.tool_cache.log_summary()
 
             # Return final result
             return {
                 "app_id": self.app_id or "0",
                 "message": self.deployment_result.get("message", "Deployment completed"),
+                "task_id": self.task_id,
                 "project_name": self.project_name,
+                "project_dir": str(self.project_dir),
                 "contract_name": self.contract_name,
                 "transaction_id": self.deployment_result.get("transaction_id", ""),
                 "prompt_excerpt": self.prompt[:100] + "..." if len(self.prompt) > 100 else self.prompt,
+                "prompts": self.prompt_stats,
+                "llm_metrics": self.metrics.summary(),
+                "tool_cache": self.tool_cache.summary(),
+                "coding": self.coding_report,
+                "early_exit": self.early_exits,
+                "artifacts": self.artifacts,
+                "checkpoint": {"resumed": bool(self.reused_phases), "reused_phases": self.reused_phases},
+                "revision_of": self.revise_of,
+                "trace": self._finish_trace(tracer),
             }
 
         except Exception as e:
             log(f"ERROR in agent workflow: {e}")
+            self._finish_trace(tracer)
             raise
 
+    @property
+    def contract_path(self) -> Path:
+        return self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
+
+    def restore_checkpoint(self) -> None:
+        """Restore the outputs of the phases an earlier run of this task completed"""
+        if not self.checkpoint.load():
+            log("No checkpoint found for this task, running every phase")
+            return
+
+        setup = self.checkpoint.get("setup")
+        project_dir = Path(setup["project_dir"]) if setup else None
+        if project_dir is None or not project_dir.is_dir():
+            log("Checkpointed project is gone, running every phase")
+            self.checkpoint.invalidate("setup")
+            return
+        self.project_name = setup["project_name"]
+        self.contract_name = setup["contract_name"]
+        self.requests = setup["requests"]
+        self.project_dir = project_dir
+        self.context.workspace = self.context.cwd = self.project_dir
+
+        code = self.checkpoint.get("code")
+        if code:
+            self.coding_report = code["coding_report"]
+            self.template_params = code["template_params"]
+            if code["contract_sha256"] != file_sha256(self.contract_path):
+                if not self.contract_path.exists():
+                    self.checkpoint.invalidate("code")
+                else:
+                    # The contract changed since it was tested; test, build and deploy it again
+                    log("Contract differs from the checkpointed one, testing it again")
+                    self.checkpoint.invalidate("test")
+
+        test = self.checkpoint.get("test")
+        if test:
+            self.tests_passed = test["tests_passed"]
+            self.testing_response = test["response"]
+        if self.checkpoint.done("artifacts"):
+            self.artifacts = self.checkpoint.get("artifacts")["artifacts"]
+        deploy = self.checkpoint.get("deploy")
+        if deploy:
+            self.app_id = deploy["app_id"]
+            self.deployment_result = deploy["deployment_result"]
+
+        self.reused_phases = self.checkpoint.completed()
+        log(f"Resuming task {self.task_id} from checkpoint; reusing phases: {', '.join(self.reused_phases)}")
+
+    def template_fast_path(self) -> bool:
+        """Generate the contract and tests from a template if the prompt clearly asks for one"""
+        if not config.TEMPLATE_FAST_PATH:
+            return False
+
+        start = time.perf_counter()
+        match = classifier().classify(self.prompt)
+        if match is None:
+            log("Template fast path: no archetype resembles the prompt")
+            return False
+        log(
+            f"Template fast path: closest archetype {match.archetype.name} "
+            f"(score {match.score:.2f}, margin {match.margin:.2f}, coverage {match.coverage:.2f}"
+            + (f", unknown terms: {', '.join(match.unknown)})" if match.unknown else ")")
+        )
+        if (
+            match.score < config.TEMPLATE_MIN_SCORE
+            or match.margin < config.TEMPLATE_MIN_MARGIN
+            or match.coverage < config.TEMPLATE_MIN_COVERAGE
+        ):
+            log("Template fast path: match not confident enough, using the agents")
+            return False
+
+        if not self._apply_template(match):
+            return False
+        self.coding_report = {
+            "mode": "template",
+            **match.summary(),
+            "params": self.template_params,
+            "latency_s": round(time.perf_counter() - start, 3),
+        }
+        return True
+
+    def _apply_template(self, match: ArchetypeMatch) -> bool:
+        """Write the template's contract and tests, keeping them only if the contract compiles"""
+        archetype = match.archetype
+        self.template_params = archetype.extract(self.prompt)
+        log(f"Template fast path: generating a {archetype.name} contract with {self.template_params}")
+
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
+        test_path = self.project_dir / "tests" / f"test_{self.contract_name}.py"
+        contract_path.parent.mkdir(parents=True, exist_ok=True)
+        contract_path.write_text(archetype.contract(self.contract_name, self.template_params))
+        init_path = contract_path.parent / "__init__.py"
+        if not init_path.exists():
+            init_path.write_text("")
+        test_path.parent.mkdir(parents=True, exist_ok=True)
+        test_path.write_text(archetype.tests(self.contract_name, self.template_params))
+
+        ensure_dependencies()
+        ok, error = check_contract_compiles(contract_path)
+        if not ok:
+            log(f"WARNING: Template contract does not compile, using the agents: {error[-500:]}")
+            contract_path.unlink(missing_ok=True)
+            test_path.unlink(missing_ok=True)
+            return False
+        log(f"✓ Generated {archetype.name} contract from template at {contract_path.relative_to(self.project_dir)}")
+        return True
+
+    def run_tests(self, selection: Optional[List[str]] = None) -> bool:
+        """
+        Run the project's tests without an agent.
+
+        Args:
+            selection: Node IDs within the contract's test file to run (all tests if None or empty)
+        """
+        if selection:
+            test_path = f"tests/test_{self.contract_name}.py"
+            targets = [f"{test_path}::{node_id}" for node_id in selection]
+            log(f"Running {len(selection)} affected tests: {', '.join(selection)}")
+        else:
+            targets = ["tests/"]
+            log("Running tests...")
+        rc, stdout, stderr = run_command(["pytest", *targets, "-v"], cwd=str(self.project_dir))
+        self.testing_response = (stdout + stderr)[-4000:]
+        log(f"Test output:\n{self.testing_response}")
+        if rc == 0:
+            log("Tests PASSED ✓")
+            return True
+        log("Tests FAILED")
+        return False
+
     def planner_agent(self) -> List[str]:
         """Planner Agent: Break down the prompt into actionable steps"""
         log("=" * 60)
         log("PLANNER AGENT: Analyzing requirements...")
         log("=" * 60)
 
-        agent = CodeAgent(
-            tools=[],
+        agent = new_agent(
+            [],
             model=self.model,
             max_steps=3,
         )
 
-        planning_prompt = f"""
-You are a planning agent for Algorand smart contract development.
-
-User Request: {self.prompt}
-
-Create a detailed plan for implementing this smart contract. Break it down into:
-1. Contract requirements and features
-2. State variables needed
-3. Methods/functions to implement
-4. Testing strategy
-
-Keep the plan concise and actionable. Focus on what needs to be built.
-"""
+        planning_prompt = self._render_prompt("planner", prompt=self.prompt)
 
         try:
-            response = agent.run(planning_prompt)
+            response = self._run_agent(agent, planning_prompt)
             plan_text = str(response)
             log(f"Plan created:\n{plan_text}")
             return plan_text.split('\n')
@@ -328,28 +509,16 @@ Keep the plan concise and actionable. Focus on what needs to be built.
         log("RESEARCH AGENT: Consulting AlgoKit documentation...")
         log("=" * 60)
 
-        agent = CodeAgent(
-            tools=[search_documentation],
+        agent = new_agent(
+            ["search_documentation"],
             model=self.model,
             max_steps=5,
         )
 
-        research_prompt = f"""
-You are a research agent specialized in AlgoKit and Algorand development.
-
-User wants to create: {self.prompt}
-
-Search the documentation and provide:
-1. The exact commands needed to create an AlgoKit project
-2. How to structure the smart contract
-3. How to build and deploy the contract
-4. Any special considerations for this type of contract
-
-Use the search_documentation tool to find relevant information.
-"""
+        research_prompt = self._render_prompt("research", prompt=self.prompt)
 
         try:
-            response = agent.run(research_prompt)
+            response = self._run_agent(agent, research_prompt)
             notes = str(response)
             log(f"Research notes:\n{notes}")
             return notes
@@ -370,146 +539,162 @@ Use the search_documentation tool to find relevant information.
         log(f"Project name: {self.project_name}")
         log(f"Contract name: {self.contract_name}")
 
-        # Ensure workspace exists
-        self.workspace.mkdir(exist_ok=True)
-        os.chdir(self.workspace)
-
-        # Check if algokit is installed
-        rc, stdout, stderr = run_command(["algokit", "--version"])
-        if rc != 0:
-            log("ERROR: AlgoKit not installed!")
-            raise RuntimeError("AlgoKit not found in container")
-
-        log(f"AlgoKit version: {stdout.strip()}")
-
-        # Start LocalNet
-        log("Starting AlgoKit LocalNet...")
-        run_command(["algokit", "localnet", "start"])
-        time.sleep(5)  # Give LocalNet time to start
+        # Check AlgoKit and start LocalNet (once per process)
+        ensure_environment()
 
         # Create project non-interactively
         log("Creating AlgoKit project...")
 
-        # Use algokit init with answers piped
-        project_dir = self.workspace / self.project_name
-        if project_dir.exists():
-            log(f"Project directory {self.project_name} already exists, removing...")
-            run_command(["rm", "-rf", str(project_dir)])
-
-        # Create minimal project structure manually
-        project_dir.mkdir(exist_ok=True)
-        (project_dir / "smart_contracts").mkdir(exist_ok=True)
-        (project_dir / "smart_contracts" / self.contract_name).mkdir(exist_ok=True)
-        (project_dir / "tests").mkdir(exist_ok=True)
+        # Old task projects are removed in the background, never on the task path
+        workspace_gc()
+
+        # Instantiate the project template into a directory of its own
+        self.project_dir = new_project_dir(self.project_name)
+        instantiate(config.SCAFFOLD_TEMPLATE, self.project_dir, self.contract_name)
+        # From here on the agents' tools are confined to this task's project
+        self.context.workspace = self.context.cwd = self.project_dir
+
+        log(f"Created project structure at {self.project_dir}")
+
+    def _record_setup(self):
+        """Checkpoint the project set up for this task"""
+        self.checkpoint.record(
+            "setup",
+            project_name=self.project_name,
+            project_dir=str(self.project_dir),
+            contract_name=self.contract_name,
+            requests=self.requests,
+        )
 
-        log(f"Created project structure at {project_dir}")
+    def setup_revision(self) -> List[str]:
+        """
+        Set up a revision's project as a copy of the revised task's project.
 
-    def coding_agent(self):
-        """Coding Agent: Generate the smart contract code"""
+        Returns:
+            The revised task's plan, extended with the requested change
+        """
         log("=" * 60)
-        log("CODING AGENT: Generating smart contract from prompt...")
+        log(f"PROJECT SETUP: Copying the project of task {self.revise_of}...")
         log("=" * 60)
 
-        agent = CodeAgent(
-            tools=[write_file, read_file, execute_shell_command],
-            model=self.model,
-            max_steps=15,
-        )
-
-        coding_prompt = f"""
-You are an expert Algorand smart contract developer using Beaker framework.
-
-User's request: {self.prompt}
-
-You must create a Beaker smart contract that fulfills the user's requirements.
+        base = Checkpoint(self.revise_of)
+        setup = base.get("setup") if base.load() else {}
+        base_dir = Path(setup["project_dir"]) if setup else None
+        if base_dir is None or not base.done("code") or not base_dir.is_dir():
+            raise RuntimeError(f"Task {self.revise_of} cannot be revised: its workspace is no longer available")
 
-CRITICAL IMPORT RULES (MUST FOLLOW EXACTLY):
-1. Import Application from beaker: `from beaker import Application, GlobalStateValue`
-2. Import PyTeal components: `from pyteal import *`
-3. NEVER import abi from beaker - it comes from pyteal automatically with `from pyteal import *`
-
-FILE REQUIREMENTS:
-1. File location: {self.project_name}/smart_contracts/{self.contract_name}/contract.py
-2. Contract must export an Application instance named 'app'
-3. Use Beaker decorators (@app.external, @app.external(read_only=True))
-
-EXACT CONTRACT TEMPLATE (COPY THIS STRUCTURE):
-```python
-from beaker import Application, GlobalStateValue
-from pyteal import *
-
-# Create the application
-app = Application("{self.contract_name}")
+        self.project_name = setup["project_name"]
+        self.contract_name = setup["contract_name"]
+        self.requests = [*setup["requests"], self.prompt]
+        log(f"Project name: {self.project_name}")
+        log(f"Contract name: {self.contract_name}")
 
-# Define state variables if needed (example)
-# counter = GlobalStateValue(
-#     stack_type=TealType.uint64,
-#     key="counter",
-#     default=Int(0)
-# )
+        ensure_environment()
+        workspace_gc()
 
-@app.external
-def hello(name: abi.String, *, output: abi.String) -> Expr:
-    \"\"\"Say hello to someone\"\"\"
-    return output.set(Concat(Bytes("Hello, "), name.get()))
+        # The revised task's project stays as it is; the change is made to a copy
+        self.project_dir = new_project_dir(self.project_name)
+        copy_project(base_dir, self.project_dir, self.revise_of)
+        self.context.workspace = self.context.cwd = self.project_dir
 
-# Add more methods based on user requirements
-```
+        log(f"Created project structure at {self.project_dir}")
+        return [*base.get("plan").get("requirements", []), f"Revision: {self.prompt}"]
 
-EXAMPLES OF CORRECT CODE:
+    def revision_agent(self, requirements: List[str]):
+        """Revision Agent: Make the requested change to the contract and its tests"""
+        log("=" * 60)
+        log("REVISION AGENT: Changing the existing smart contract...")
+        log("=" * 60)
 
-Example 1 - Counter Contract:
-```python
-from beaker import Application, GlobalStateValue
-from pyteal import *
+        start = time.perf_counter()
+        test_path = self.project_dir / "tests" / f"test_{self.contract_name}.py"
+        old_contract = self.contract_path.read_text()
+        old_tests = test_path.read_text() if test_path.exists() else ""
 
-app = Application("Counter")
+        agent = new_agent(
+            FILE_TOOLS,
+            model=self.model,
+            max_steps=10,
+        )
 
-counter = GlobalStateValue(
-    stack_type=TealType.uint64,
-    key="counter",
-    default=Int(0)
-)
+        revision_prompt = self._render_prompt(
+            "revision",
+            prompt=self.requests[0],
+            plan="\n".join(line for line in requirements if line.strip()),
+            contract_name=self.contract_name,
+            contract_path=f"smart_contracts/{self.contract_name}/contract.py",
+            test_path=f"tests/test_{self.contract_name}.py",
+            contract=old_contract,
+            instruction=self.prompt,
+        )
 
-@app.external
-def increment() -> Expr:
-    return counter.set(counter + Int(1))
+        try:
+            result = self._run_agent(agent, revision_prompt)
+            log(f"Agent result: {result}")
+        except Exception as e:
+            # The project is a copy, so a failed revision leaves the revised task intact
+            raise RuntimeError(f"Revision agent failed: {e}")
+
+        new_contract = self.contract_path.read_text()
+        if new_contract == old_contract:
+            log("WARNING: Revision agent left the contract unchanged")
+        ensure_dependencies()
+        ok, error = check_contract_compiles(self.contract_path)
+        if not ok:
+            log(f"WARNING: Revised contract does not compile: {error[-500:]}")
+
+        changed = changed_definitions(old_contract, new_contract)
+        selection = None
+        if changed is not None:
+            selection = select_tests(old_tests, test_path.read_text() if test_path.exists() else "", changed)
+        if not selection:
+            # Module-level changes, or none of the tests refers to the changed code
+            log("Revision affects the whole contract, all tests will run")
+        self.coding_report = {
+            "mode": "revision",
+            "revision_of": self.revise_of,
+            "changed": sorted(changed) if changed is not None else None,
+            "tests": selection or None,
+            "latency_s": round(time.perf_counter() - start, 3),
+        }
 
-@app.external(read_only=True)
-def get_counter(*, output: abi.Uint64) -> Expr:
-    return output.set(counter)
-```
+    def coding_agent(self):
+        """Coding Agent: Generate the smart contract code"""
+        log("=" * 60)
+        log("CODING AGENT: Generating smart contract from prompt...")
+        log("=" * 60)
 
-Example 2 - Greeting Contract:
-```python
-from beaker import Application
-from pyteal import *
+        if config.SPECULATIVE_K > 1:
+            self._speculative_coding_agent(config.SPECULATIVE_K)
+            return
 
-app = Application("Greeter")
+        start = time.perf_counter()
 
-@app.external
-def greet(name: abi.String, *, output: abi.String) -> Expr:
-    return output.set(Concat(Bytes("Hello, "), name.get()))
-```
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
+        early_exit = self._early_exit(
+            "contract compiles", lambda: check_contract_compiles(contract_path), [contract_path]
+        )
 
-RULES:
-- Use @app.external decorator for methods that modify state
-- Use @app.external(read_only=True) for view-only methods
-- ABI types: abi.String, abi.Uint64, abi.Uint32, abi.Bool, abi.Address
-- All ABI methods with return values need `*, output: abi.Type` parameter
-- Use GlobalStateValue for persistent storage (counter, flags, etc.)
-- Keep the contract simple and focused on the user's requirements
+        agent = new_agent(
+            FILE_TOOLS,
+            model=self.model,
+            max_steps=15,
+            step_callbacks=[early_exit] if early_exit else None,
+        )
 
-Now create the contract file using write_file tool. Follow the template EXACTLY, especially the imports!
-"""
+        coding_prompt = self._render_prompt(
+            "coding",
+            prompt=self.prompt,
+            contract_name=self.contract_name,
+            contract_path=f"smart_contracts/{self.contract_name}/contract.py",
+        )
 
         try:
-            result = agent.run(coding_prompt)
+            result = self._run_agent(agent, coding_prompt, early_exit)
             log("✓ Smart contract generated successfully")
             log(f"Agent result: {result}")
 
             # Verify contract was created
-            contract_path = self.workspace / self.project_name / "smart_contracts" / self.contract_name / "contract.py"
             if not contract_path.exists():
                 log("WARNING: Contract file was not created by agent, using fallback")
                 self._create_fallback_contract()
@@ -525,6 +710,74 @@ Now create the contract file using write_file tool. Follow the template EXACTLY,
             log("Using fallback contract due to agent failure")
             self._create_fallback_contract()
 
+        self.coding_report = {"mode": "single", "latency_s": round(time.perf_counter() - start, 3)}
+
+    def _speculative_coding_agent(self, k: int):
+        """Run k coding agents in parallel and keep the first contract that compiles"""
+        start = time.perf_counter()
+
+        # The compile check needs beaker and pyteal
+        ensure_dependencies()
+
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
+        coding_phase = current_phase()
+        temperatures = config.SPECULATIVE_TEMPERATURES or [None]
+        models = config.SPECULATIVE_MODELS
+
+        candidates = []
+        for i in range(k):
+            relative = f".candidates/c{i}/contract.py"
+            temperature = temperatures[i % len(temperatures)]
+            overrides = {"temperature": temperature} if temperature is not None else {}
+            model = create_model(
+                model_id=models[i % len(models)] if models else None,
+                **overrides,
+            )
+            candidates.append(SpeculativeCandidate(i, model, self.project_dir / relative, relative, temperature))
+
+        coder = SpeculativeCoder(
+            candidates,
+            build_agent=lambda c, on_step: new_agent(
+                FILE_TOOLS,
+                model=c.model,
+                max_steps=15,
+                step_callbacks=[on_step],
+            ),
+            build_task=lambda c: self._render_prompt(
+                "coding",
+                prompt=self.prompt,
+                contract_name=self.contract_name,
+                contract_path=c.relative_path,
+            ),
+            run_agent=self._run_agent,
+            validate=check_contract_compiles,
+            tokens_used=lambda: self.metrics.total_tokens(coding_phase),
+            token_budget=config.SPECULATIVE_TOKEN_BUDGET,
+            measure_baseline=config.SPECULATIVE_MEASURE_BASELINE,
+        )
+        winner = coder.run()
+
+        contract_path.parent.mkdir(parents=True, exist_ok=True)
+        if winner:
+            contract_path.write_text(winner.contract_path.read_text())
+            log(f"✓ Using contract from speculative candidate {winner.index}")
+        else:
+            log("WARNING: No speculative candidate compiled, using fallback")
+            self._create_fallback_contract()
+        shutil.rmtree(self.project_dir / ".candidates", ignore_errors=True)
+
+        init_path = contract_path.parent / "__init__.py"
+        if not init_path.exists():
+            init_path.write_text("")
+
+        self.coding_report = {**coder.report(), "latency_s": round(time.perf_counter() - start, 3)}
+        report = self.coding_report
+        if report["speedup"]:
+            log(
+                f"Speculative coding: valid contract after {report['time_to_valid_s']}s vs "
+                f"{report['baseline_s']}s single-attempt baseline, {report['speedup']}x"
+            )
+
     def _create_hardcoded_hello_world(self):
         """Create hardcoded Hello World contract for testing deployment"""
         contract_code = f'''from beaker import Application
@@ -538,15 +791,16 @@ def hello(name: abi.String, *, output: abi.String) -> Expr:
     return output.set(Concat(Bytes("Hello, "), name.get()))
 '''
 
-        contract_path = self.workspace / self.project_name / "smart_contracts" / self.contract_name / "contract.py"
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
         contract_path.parent.mkdir(parents=True, exist_ok=True)
         contract_path.write_text(contract_code)
         log(f"Created Hello World Beaker contract at {contract_path}")
 
         # Create __init__.py
         init_path = contract_path.parent / "__init__.py"
-        init_path.write_text("")
-        log(f"Created __init__.py at {init_path}")
+        if not init_path.exists():
+            init_path.write_text("")
+            log(f"Created __init__.py at {init_path}")
 
     def _create_fallback_contract(self):
         """Create a simple fallback contract if agent fails"""
@@ -578,14 +832,15 @@ def get_counter(*, output: abi.Uint64) -> Expr:
     return output.set(counter)
 '''
 
-        contract_path = self.workspace / self.project_name / "smart_contracts" / self.contract_name / "contract.py"
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
         contract_path.parent.mkdir(parents=True, exist_ok=True)
         contract_path.write_text(contract_code)
         log(f"Created fallback contract at {contract_path}")
 
         # Create __init__.py
         init_path = contract_path.parent / "__init__.py"
-        init_path.write_text("")
+        if not init_path.exists():
+            init_path.write_text("")
 
     def testing_agent(self) -> bool:
         """Testing Agent: Create and run tests"""
@@ -593,32 +848,29 @@ def get_counter(*, output: abi.Uint64) -> Expr:
         log("TESTING AGENT: Creating and running tests...")
         log("=" * 60)
 
-        agent = CodeAgent(
-            tools=[write_file, read_file, execute_shell_command],
+        test_path = self.project_dir / "tests" / f"test_{self.contract_name}.py"
+        early_exit = self._early_exit("tests pass", self._check_tests, [test_path, self.contract_path])
+
+        agent = new_agent(
+            FILE_TOOLS,
             model=self.model,
             max_steps=10,
+            step_callbacks=[early_exit] if early_exit else None,
         )
 
-        testing_prompt = f"""
-You are a testing agent for Algorand smart contracts.
-
-Contract location: {self.project_name}/smart_contracts/{self.contract_name}/contract.py
-
-Create a test file at: {self.project_name}/tests/test_{self.contract_name}.py
-
-The test should:
-1. Import necessary testing libraries (pytest, algokit_utils)
-2. Set up a LocalNet client
-3. Test the contract methods
-4. Verify the expected behavior
-
-After creating the test, run it using: cd {self.project_name} && pytest tests/ -v
-
-Use the write_file and execute_shell_command tools.
-"""
+        testing_prompt = self._render_prompt(
+            "testing",
+            contract_path=f"smart_contracts/{self.contract_name}/contract.py",
+            test_path=f"tests/test_{self.contract_name}.py",
+        )
 
         try:
-            response = agent.run(testing_prompt)
+            response = self._run_agent(agent, testing_prompt, early_exit)
+            if early_exit is not None and early_exit.stopped:
+                self.testing_response = early_exit.output
+                log("Tests PASSED ✓")
+                return True
+            self.testing_response = str(response)
             log(f"Testing agent completed: {response}")
 
             # Check if tests passed by looking at the output
@@ -632,22 +884,37 @@ Use the write_file and execute_shell_command tools.
             log(f"Testing agent error: {e}")
             return False
 
+    def build_artifacts(self, tests_passed: bool):
+        """Compile the contract into the artifact store (reused if already stored)"""
+        from src.artifacts import artifact_store
+
+        ensure_dependencies()
+        contract_path = self.project_dir / "smart_contracts" / self.contract_name / "contract.py"
+        try:
+            store = artifact_store()
+            self.artifacts = store.compile(contract_path)
+            # The entry is shared by every task with this contract; the test outcome is this task's
+            store.save_task_file(self.task_id, "test_results.json", json.dumps({
+                "artifact_key": self.artifacts["key"],
+                "tests_passed": tests_passed,
+                "response": self.testing_response[-4000:],
+            }, indent=2))
+            self.artifacts["task_files"] = ["test_results.json"]
+        except Exception as e:
+            # Deployment compiles the contract itself, so a failure here is not fatal
+            log(f"WARNING: Could not store artifacts: {e}")
+            self.artifacts = {"error": str(e)[:500]}
+
     def deployment_agent(self):
         """Deployment Agent: Build and deploy the contract"""
         log("=" * 60)
         log("DEPLOYMENT AGENT: Building and deploying contract...")
         log("=" * 60)
 
-        project_path = self.workspace / self.project_name
+        project_path = self.project_dir
 
         # Install dependencies
-        log("Installing Python dependencies...")
-        rc, stdout, stderr = run_command(
-            ["pip", "install", "beaker-pyteal", "pyteal", "algokit-utils"],
-            cwd=str(project_path)
-        )
-        if rc != 0:
-            log(f"Warning: pip install had issues: {stderr}")
+        ensure_dependencies()
 
         # Build the contract
         log("Building smart contract...")
@@ -656,81 +923,10 @@ Use the write_file and execute_shell_command tools.
         if not contract_path.exists():
             raise RuntimeError(f"Contract file not found: {contract_path}")
 
-        # Create a simple deployment script
-        # Get algod server from environment or use default
-        algod_server = os.getenv("ALGOD_SERVER", "http://localhost:4001")
-        algod_token = os.getenv("ALGOD_TOKEN", "a" * 64)
-
-        log("Creating deployment script...")
-        deploy_script = f'''#!/usr/bin/env python3
-import sys
-import os
-from algosdk.v2client import algod
-from beaker.client import ApplicationClient
-import algokit_utils
-
-# Connect to LocalNet
-algod_server = os.getenv("ALGOD_SERVER", "{algod_server}")
-algod_token = os.getenv("ALGOD_TOKEN", "{algod_token}")
-
-print(f"Connecting to Algorand node at {{algod_server}}...")
-
-try:
-    # Create algod client
-    algod_client = algod.AlgodClient(algod_token, algod_server)
-    status = algod_client.status()
-    print(f"✓ Connected to node. Last round: {{status.get('last-round')}}")
-except Exception as e:
-    print(f"ERROR: Cannot connect to Algorand node: {{e}}", file=sys.stderr)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
-    sys.exit(1)
-
-try:
-    # Get LocalNet default account
-    deployer = algokit_utils.get_localnet_default_account(algod_client)
-    print(f"✓ Using deployer account: {{deployer.address}}")
-except Exception as e:
-    print(f"ERROR: Cannot get LocalNet account: {{e}}", file=sys.stderr)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
-    sys.exit(1)
-
-try:
-    print("Deploying contract...")
-
-    # Import the Beaker app
-    from smart_contracts.{self.contract_name}.contract import app
-
-    # Create ApplicationClient with the Beaker app
-    app_client = ApplicationClient(
-        client=algod_client,
-        app=app,
-        signer=deployer.signer,
-        sender=deployer.address,
-    )
-
-    # Deploy the application
-    app_id, app_addr, txn_id = app_client.create()
-
-    print(f"DEPLOYED_APP_ID: {{app_id}}")
-    print(f"DEPLOYED_TXN: {{txn_id}}")
-    print(f"✓ Deployment successful!")
-
-except Exception as e:
-    print(f"ERROR: Deployment failed: {{e}}", file=sys.stderr)
-    import traceback
-    traceback.print_exc(file=sys.stderr)
-    sys.exit(1)
-'''
-
-        deploy_path = project_path / "deploy.py"
-        deploy_path.write_text(deploy_script)
-        deploy_path.chmod(0o755)
-
+        # deploy.py comes with the project template
         log("Running deployment script...")
         rc, stdout, stderr = run_command(
-            ["python", "deploy.py"],
+            ["python", "deploy.py", self.contract_name],
             cwd=str(project_path)
         )
 
@@ -768,6 +964,74 @@ except Exception as e:
             # Raise an exception instead of silently continuing
             raise RuntimeError(f"Deployment failed: {error_msg}\n\nFull error:\n{stderr}")
 
+    def _run_agent(self, agent: Any, task: str, early_exit: Optional[EarlyExit] = None) -> Any:
+        """Run a CodeAgent and record how many of its steps were used (and saved by an early exit)"""
+        try:
+            return agent.run(task)
+        except Exception:
+            # Stopping the agent interrupts its run
+            if early_exit is None or not early_exit.stopped:
+                raise
+            return f"Stopped after the agent's last step: {early_exit.reason}"
+        finally:
+            steps = sum(1 for step in agent.memory.steps if type(step).__name__ == "ActionStep")
+            self.metrics.record_steps(steps, agent.max_steps)
+            log(f"Agent used {steps}/{agent.max_steps} steps")
+            if early_exit is not None:
+                report = early_exit.report(steps, agent.max_steps)
+                self.early_exits[current_phase()] = report
+                if report["criterion_met_at_step"] is not None:
+                    self.metrics.record_early_exit(report["steps_saved"], report["tokens_saved"])
+                    bound = "" if report["exact"] else "at least "
+                    log(
+                        f"Early exit: {bound}{report['steps_saved']} steps and "
+                        f"{report['tokens_saved']} tokens saved"
+                    )
+            self.tool_cache.log_summary(current_phase())
+
+    def _early_exit(
+        self, reason: str, criterion: Callable[[], Tuple[bool, str]], watch: List[Path]
+    ) -> Optional[EarlyExit]:
+        """Create the early-exit step callback for an agent phase (None if disabled)"""
+        if config.EARLY_EXIT not in ("on", "shadow"):
+            return None
+        # The criteria compile the contract, which needs beaker and pyteal
+        ensure_dependencies()
+        return EarlyExit(reason, criterion, watch, stop=config.EARLY_EXIT == "on")
+
+    def _check_tests(self) -> Tuple[bool, str]:
+        """Run the project's tests, returning whether they passed and their output"""
+        rc, stdout, stderr = run_command(["pytest", "tests/", "-q"], cwd=str(self.project_dir))
+        return rc == 0, (stdout + stderr)[-4000:]
+
+    def _finish_trace(self, tracer) -> Dict[str, Any]:
+        """Export the task's spans and return their summary"""
+        summary = tracer.summary()
+        try:
+            path = tracer.export(config.TRACE_DIR / f"{tracer.trace_id}.json")
+            summary["file"] = str(path)
+            log(f"Trace written to {path}")
+        except OSError as e:
+            log(f"WARNING: Could not write trace file: {e}")
+        return summary
+
+    def _render_prompt(self, name: str, **variables: str) -> str:
+        """Render a prompt template and record its token counts before sending"""
+        rendered = render(name, **variables)
+        # Tokenize for the configured model rather than touching self.model,
+        # which would create the LLM client on paths that never call it
+        counts = rendered.token_counts(self._model.model_id if self._model is not None else config.default_model_id)
+        self.prompt_stats[name] = {
+            "template": rendered.key,
+            "prefix_hash": rendered.template.prefix_hash,
+            **counts,
+        }
+        log(
+            f"Prompt {rendered.key}: {counts['total']} tokens "
+            f"(static prefix {counts['prefix']}, variable suffix {counts['suffix']})"
+        )
+        return rendered.text
+
     def _sanitize_name(self, text: str) -> str:
         """Convert text to valid project name"""
         # Remove special chars, convert to lowercase
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Deploy the project's contract to LocalNet.
+
+Usage: python deploy.py <ContractName>
+"""
+import os
+import sys
+
+import algokit_utils
+from algosdk.v2client import algod
+from beaker.client import ApplicationClient
+
+if len(sys.argv) != 2:
+    print("usage: deploy.py <ContractName>", file=sys.stderr)
+    sys.exit(2)
+contract_name = sys.argv[1]
+
+# Connect to LocalNet
+algod_server = os.getenv("ALGOD_SERVER", "http://localhost:4001")
+algod_token = os.getenv("ALGOD_TOKEN", "a" * 64)
+
+print(f"Connecting to Algorand node at {algod_server}...")
+
+try:
+    # Create algod client
+    algod_client = algod.AlgodClient(algod_token, algod_server)
+    status = algod_client.status()
+    print(f"✓ Connected to node. Last round: {status.get('last-round')}")
+except Exception as e:
+    print(f"ERROR: Cannot connect to Algorand node: {e}", file=sys.stderr)
+    import traceback
+    traceback.print_exc(file=sys.stderr)
+    sys.exit(1)
+
+try:
+    # Get LocalNet default account
+    deployer = algokit_utils.get_localnet_default_account(algod_client)
+    print(f"✓ Using deployer account: {deployer.address}")
+except Exception as e:
+    print(f"ERROR: Cannot get LocalNet account: {e}", file=sys.stderr)
+    import traceback
+    traceback.print_exc(file=sys.stderr)
+    sys.exit(1)
+
+try:
+    print("Deploying contract...")
+
+    # Import the Beaker app
+    import importlib
+    app = importlib.import_module(f"smart_contracts.{contract_name}.contract").app
+
+    # Create ApplicationClient with the Beaker app
+    app_client = ApplicationClient(
+        client=algod_client,
+        app=app,
+        signer=deployer.signer,
+        sender=deployer.address,
+    )
+
+    # Deploy the application
+    app_id, app_addr, txn_id = app_client.create()
+
+    print(f"DEPLOYED_APP_ID: {app_id}")
+    print(f"DEPLOYED_TXN: {txn_id}")
+    print("✓ Deployment successful!")
+
+except Exception as e:
+    print(f"ERROR: Deployment failed: {e}", file=sys.stderr)
+    import traceback
+    traceback.print_exc(file=sys.stderr)
+    sys.exit(1)
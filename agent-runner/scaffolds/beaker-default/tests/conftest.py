@@ -0,0 +1,47 @@
+"""
+Shared pytest fixtures for the generated contract.
+"""
+import importlib
+import os
+from pathlib import Path
+
+import algokit_utils
+import pytest
+from algosdk.v2client import algod
+from beaker.client import ApplicationClient
+
+
+@pytest.fixture(scope="session")
+def algod_client():
+    """Client of the LocalNet node."""
+    return algod.AlgodClient(
+        os.getenv("ALGOD_TOKEN", "a" * 64),
+        os.getenv("ALGOD_SERVER", "http://localhost:4001"),
+    )
+
+
+@pytest.fixture(scope="session")
+def deployer(algod_client):
+    """Funded LocalNet default account."""
+    return algokit_utils.get_localnet_default_account(algod_client)
+
+
+@pytest.fixture(scope="session")
+def contract_app():
+    """The Beaker app of the project's contract."""
+    root = Path(__file__).parent.parent / "smart_contracts"
+    name = next(p.name for p in sorted(root.iterdir()) if (p / "contract.py").exists())
+    return importlib.import_module(f"smart_contracts.{name}.contract").app
+
+
+@pytest.fixture
+def app_client(algod_client, deployer, contract_app):
+    """A freshly created instance of the contract."""
+    client = ApplicationClient(
+        client=algod_client,
+        app=contract_app,
+        signer=deployer.signer,
+        sender=deployer.address,
+    )
+    client.create()
+    return client
@@ -0,0 +1,5 @@
+"""Contract template library and the prompt classifier selecting from it."""
+from .classifier import ArchetypeClassifier, ArchetypeMatch, classifier
+from .library import ARCHETYPES, Archetype
+
+__all__ = ["ARCHETYPES", "Archetype", "ArchetypeClassifier", "ArchetypeMatch", "classifier"]
@@ -0,0 +1,122 @@
+"""
+Prompt classifier for the contract template library.
+
+A TF-IDF model over each archetype's example prompts, entirely local (no
+network, no model download). A prompt is matched to an archetype only if
+it is clearly most similar to that archetype (score, and margin over the
+runner-up) and nearly all of its words belong to the archetype's
+vocabulary, i.e. it asks for nothing the template lacks: "a counter that
+also mints an NFT" is left to the agents.
+"""
+import math
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.retrieval.bm25 import tokenize
+from .library import ARCHETYPES, Archetype
+
+# Words any contract request may use without changing what is asked for
+_GENERIC = tokenize(
+    "create make build write generate develop implement deploy design simple basic small minimal "
+    "smart contract contracts app application dapp algorand algokit beaker pyteal teal python "
+    "method methods function functions endpoint abi please want need would like should must "
+    "new has have also all each every let lets allow allows able just plus my our we me some named "
+    "user users account accounts anyone someone people caller sender store stores stored storing "
+    "keep keeps track tracking save saves return returns show called call calls"
+)
+
+
+class ArchetypeMatch:
+    """Result of classifying a prompt against one archetype."""
+
+    def __init__(self, archetype: Archetype, score: float, margin: float, coverage: float, unknown: List[str]):
+        """
+        Initialize the match.
+
+        Args:
+            archetype: Best matching archetype
+            score: Cosine similarity of the prompt to the archetype (0 to 1)
+            margin: Lead of the score over the runner-up archetype
+            coverage: Share of the prompt's words in the archetype's vocabulary
+            unknown: Prompt words outside that vocabulary
+        """
+        self.archetype = archetype
+        self.score = score
+        self.margin = margin
+        self.coverage = coverage
+        self.unknown = unknown
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "archetype": self.archetype.name,
+            "score": round(self.score, 3),
+            "margin": round(self.margin, 3),
+            "coverage": round(self.coverage, 3),
+            "unknown_terms": self.unknown,
+        }
+
+
+class ArchetypeClassifier:
+    """TF-IDF nearest-archetype classifier."""
+
+    def __init__(self, archetypes: Iterable[Archetype]):
+        """
+        Build the model.
+
+        Args:
+            archetypes: Archetypes to choose from
+        """
+        self.archetypes = list(archetypes)
+        documents = [Counter(tokenize(" ".join(a.examples))) for a in self.archetypes]
+        df = Counter(term for doc in documents for term in doc)
+        n = len(documents)
+        self._idf = {term: math.log((1 + n) / (1 + count)) + 1 for term, count in df.items()}
+        self._vectors = [self._vector(doc) for doc in documents]
+        generic = set(_GENERIC)
+        self._vocabularies = [
+            generic | set(tokenize(" ".join(a.examples) + " " + a.vocabulary)) for a in self.archetypes
+        ]
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        """Return the L2-normalized TF-IDF vector of a term count."""
+        weights = {t: (1 + math.log(c)) * self._idf[t] for t, c in terms.items() if t in self._idf}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        return {t: w / norm for t, w in weights.items()}
+
+    def classify(self, prompt: str) -> Optional[ArchetypeMatch]:
+        """
+        Find the archetype closest to a prompt.
+
+        Args:
+            prompt: User's prompt
+
+        Returns:
+            The best match with its scores, or None if the prompt shares no
+            term with any archetype
+        """
+        terms = tokenize(prompt)
+        query = self._vector(Counter(terms))
+        if not query:
+            return None
+        scores = [sum(w * vector.get(t, 0.0) for t, w in query.items()) for vector in self._vectors]
+        ranked = sorted(range(len(scores)), key=scores.__getitem__, reverse=True)
+        best = ranked[0]
+        runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+
+        vocabulary = self._vocabularies[best]
+        # Numbers are template parameters; single letters are fragments such as the "s" of "user's"
+        content = [t for t in terms if not t.isdigit() and len(t) > 1]
+        unknown = sorted({t for t in content if t not in vocabulary})
+        coverage = 1 - sum(1 for t in content if t in unknown) / len(content) if content else 0.0
+        return ArchetypeMatch(self.archetypes[best], scores[best], scores[best] - runner_up, coverage, unknown)
+
+
+_classifier: Optional[ArchetypeClassifier] = None
+
+
+def classifier() -> ArchetypeClassifier:
+    """Return the classifier over the template library (built on first use)."""
+    global _classifier
+    if _classifier is None:
+        _classifier = ArchetypeClassifier(ARCHETYPES.values())
+    return _classifier
@@ -0,0 +1,625 @@
+"""
+Library of parameterized contract templates.
+
+Each archetype is a contract family common enough in prompts to be filled
+in without an LLM: a counter, a greeter, a poll and an escrow. An
+archetype extracts its parameters from the prompt with a few patterns
+(e.g. "with decrement", "start at 10", "3 options") and renders a Beaker
+contract and a pytest file for the project template's LocalNet fixtures.
+
+Contracts keep their state in a state class passed to Application, so
+the global and local schemas of the deployed app include it.
+"""
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+_NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+    "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+}
+
+_ONLY_CREATOR = re.compile(r"\b(only (the )?(creator|owner|admin|deployer)|owner[- ]only|admin[- ]only|restricted)\b")
+
+
+def _number(text: Optional[str]) -> Optional[int]:
+    """Parse a digit string or an English number word."""
+    if text is None:
+        return None
+    text = text.lower()
+    return int(text) if text.isdigit() else _NUMBER_WORDS.get(text)
+
+
+class Archetype:
+    """A contract family that can be generated from a template."""
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        examples: List[str],
+        vocabulary: str,
+        extract: Callable[[str], Dict[str, Any]],
+        contract: Callable[[str, Dict[str, Any]], str],
+        tests: Callable[[str, Dict[str, Any]], str],
+    ):
+        """
+        Define an archetype.
+
+        Args:
+            name: Archetype name
+            description: What the generated contract does
+            examples: Prompts asking for this archetype (classifier training data)
+            vocabulary: Further words a prompt for it may use, e.g. its parameters
+            extract: Returns the template parameters found in a prompt
+            contract: Renders contract.py from the contract name and parameters
+            tests: Renders the pytest file from the contract name and parameters
+        """
+        self.name = name
+        self.description = description
+        self.examples = examples
+        self.vocabulary = vocabulary
+        self.extract = extract
+        self.contract = contract
+        self.tests = tests
+
+
+# --- Counter -----------------------------------------------------------------
+
+def _counter_params(prompt: str) -> Dict[str, Any]:
+    text = prompt.lower()
+    start = re.search(r"\b(?:start(?:s|ing)?|initial(?:ized)?|begin(?:s|ning)?)\b[^.\d]{0,20}?(\d+)", text)
+    step = re.search(r"\bby (\d+|" + "|".join(_NUMBER_WORDS) + r")\b", text)
+    return {
+        "initial": int(start.group(1)) if start else 0,
+        "step": max(1, _number(step.group(1)) or 1) if step else 1,
+        "decrement": bool(re.search(r"\b(decrement|decrease|subtract|count(?:s|ing)? down|minus)\b", text)),
+        "reset": bool(re.search(r"\breset", text)),
+        "only_creator": bool(_ONLY_CREATOR.search(text)),
+    }
+
+
+def _counter_contract(name: str, p: Dict[str, Any]) -> str:
+    auth = "authorize=Authorize.only_creator()" if p["only_creator"] else ""
+    external = f"@app.external({auth})" if auth else "@app.external"
+    source = f'''from beaker import Application, Authorize, GlobalStateValue
+from pyteal import *
+
+
+class {name}State:
+    counter = GlobalStateValue(
+        stack_type=TealType.uint64,
+        default=Int({p["initial"]}),
+        descr="Current count",
+    )
+
+
+app = Application("{name}", state={name}State())
+
+
+@app.create(bare=True)
+def create() -> Expr:
+    """Create the app with the counter at its initial value"""
+    return app.initialize_global_state()
+
+
+{external}
+def increment(*, output: abi.Uint64) -> Expr:
+    """Increase the counter by {p["step"]} and return the new value"""
+    return Seq(
+        app.state.counter.set(app.state.counter + Int({p["step"]})),
+        output.set(app.state.counter),
+    )
+'''
+    if p["decrement"]:
+        source += f'''
+
+{external}
+def decrement(*, output: abi.Uint64) -> Expr:
+    """Decrease the counter by {p["step"]} (never below zero) and return the new value"""
+    return Seq(
+        Assert(app.state.counter >= Int({p["step"]}), comment="counter cannot go below zero"),
+        app.state.counter.set(app.state.counter - Int({p["step"]})),
+        output.set(app.state.counter),
+    )
+'''
+    if p["reset"]:
+        source += f'''
+
+{external}
+def reset() -> Expr:
+    """Set the counter back to its initial value"""
+    return app.state.counter.set_default()
+'''
+    source += '''
+
+@app.external(read_only=True)
+def get_counter(*, output: abi.Uint64) -> Expr:
+    """Return the current counter value"""
+    return output.set(app.state.counter)
+'''
+    return source
+
+
+def _counter_tests(name: str, p: Dict[str, Any]) -> str:
+    initial, step = p["initial"], p["step"]
+    imports = "import pytest\n" if p["decrement"] else ""
+    source = f'''"""
+Tests of the {name} counter.
+"""
+{imports}
+
+def test_starts_at_initial_value(app_client):
+    assert app_client.call("get_counter").return_value == {initial}
+
+
+def test_increment(app_client):
+    assert app_client.call("increment").return_value == {initial + step}
+    assert app_client.call("increment").return_value == {initial + 2 * step}
+    assert app_client.call("get_counter").return_value == {initial + 2 * step}
+'''
+    if p["decrement"]:
+        source += f'''
+
+def test_decrement(app_client):
+    app_client.call("increment")
+    assert app_client.call("decrement").return_value == {initial}
+
+
+def test_decrement_below_zero_fails(app_client):
+    for _ in range({initial // step}):
+        app_client.call("decrement")
+    with pytest.raises(Exception):
+        app_client.call("decrement")
+'''
+    if p["reset"]:
+        source += f'''
+
+def test_reset(app_client):
+    app_client.call("increment")
+    app_client.call("reset")
+    assert app_client.call("get_counter").return_value == {initial}
+'''
+    return source
+
+
+COUNTER = Archetype(
+    name="counter",
+    description="Global counter with increment, optional decrement and reset, and a getter",
+    examples=[
+        "Create a simple counter contract",
+        "Create a counter contract with increment and decrement methods",
+        "A smart contract that counts how many times it was called",
+        "Build a counter that can be incremented and read",
+        "Counter app with increment, decrement and reset",
+        "Make a contract that stores a number and increases it by one",
+        "Tally counter smart contract with a get count method",
+    ],
+    vocabulary="count counter number value increment increase decrement decrease reset tally add subtract "
+               "step start initial zero one two get read current store global state only creator owner admin",
+    extract=_counter_params,
+    contract=_counter_contract,
+    tests=_counter_tests,
+)
+
+
+# --- Greeter -----------------------------------------------------------------
+
+_GREETINGS = ["good morning", "good evening", "hello", "hi", "hey", "welcome", "greetings", "howdy", "gm"]
+
+
+def _greeter_params(prompt: str) -> Dict[str, Any]:
+    quoted = re.search(r"""["']([A-Za-z][A-Za-z ,!]{0,30}?)[,!]?\s*(?:<?name>?|\{name\})?["']""", prompt)
+    greeting = "Hello"
+    if quoted:
+        greeting = quoted.group(1).strip(" ,!")
+    else:
+        text = prompt.lower()
+        for word in _GREETINGS:
+            if re.search(rf"\b{word}\b", text) and word != "hello":
+                greeting = "GM" if word == "gm" else word.capitalize()
+                break
+    return {
+        "greeting": greeting,
+        "count": bool(re.search(r"\b(count|counts|counter|how many|number of)\b", prompt.lower())),
+    }
+
+
+def _greeter_contract(name: str, p: Dict[str, Any]) -> str:
+    greeting = p["greeting"].replace("\\", "").replace('"', "")
+    if not p["count"]:
+        return f'''from beaker import Application
+from pyteal import *
+
+app = Application("{name}")
+
+
+@app.external
+def hello(name: abi.String, *, output: abi.String) -> Expr:
+    """Greet someone by name"""
+    return output.set(Concat(Bytes("{greeting}, "), name.get()))
+'''
+    return f'''from beaker import Application, GlobalStateValue
+from pyteal import *
+
+
+class {name}State:
+    greetings = GlobalStateValue(
+        stack_type=TealType.uint64,
+        default=Int(0),
+        descr="Number of greetings given",
+    )
+
+
+app = Application("{name}", state={name}State())
+
+
+@app.create(bare=True)
+def create() -> Expr:
+    """Create the app with no greetings given"""
+    return app.initialize_global_state()
+
+
+@app.external
+def hello(name: abi.String, *, output: abi.String) -> Expr:
+    """Greet someone by name and count the greeting"""
+    return Seq(
+        app.state.greetings.increment(),
+        output.set(Concat(Bytes("{greeting}, "), name.get())),
+    )
+
+
+@app.external(read_only=True)
+def get_greetings(*, output: abi.Uint64) -> Expr:
+    """Return how many greetings were given"""
+    return output.set(app.state.greetings)
+'''
+
+
+def _greeter_tests(name: str, p: Dict[str, Any]) -> str:
+    greeting = p["greeting"].replace("\\", "").replace('"', "")
+    source = f'''"""
+Tests of the {name} greeter.
+"""
+
+
+def test_hello(app_client):
+    assert app_client.call("hello", name="Algorand").return_value == "{greeting}, Algorand"
+'''
+    if p["count"]:
+        source += '''
+
+def test_counts_greetings(app_client):
+    assert app_client.call("get_greetings").return_value == 0
+    app_client.call("hello", name="a")
+    app_client.call("hello", name="b")
+    assert app_client.call("get_greetings").return_value == 2
+'''
+    return source
+
+
+GREETER = Archetype(
+    name="greeter",
+    description="Method greeting a name, optionally counting the greetings",
+    examples=[
+        "Create a hello world contract",
+        "Simple greeter contract that says hello to a name",
+        "A contract with a hello method that takes a name and returns a greeting",
+        "Hello world smart contract",
+        "Make a greeting contract that greets the user",
+        "Contract that returns Hello, name",
+    ],
+    vocabulary="hello world greet greeter greeting greetings say name return string message hi hey welcome "
+               "person user caller count many number",
+    extract=_greeter_params,
+    contract=_greeter_contract,
+    tests=_greeter_tests,
+)
+
+
+# --- Voting ------------------------------------------------------------------
+
+def _voting_params(prompt: str) -> Dict[str, Any]:
+    text = prompt.lower()
+    count = re.search(
+        r"\b(\d+|" + "|".join(_NUMBER_WORDS) + r")\s+(?:different\s+)?(?:options|choices|candidates|proposals)\b",
+        text,
+    )
+    options = _number(count.group(1)) if count else None
+    if options is None and re.search(r"\byes\s*(?:/|or|and)\s*no\b", text):
+        options = 2
+    return {"options": min(max(options or 2, 2), 8)}
+
+
+def _voting_contract(name: str, p: Dict[str, Any]) -> str:
+    n = p["options"]
+    tallies = "\n".join(
+        f'''    votes_{i} = GlobalStateValue(
+        stack_type=TealType.uint64,
+        default=Int(0),
+        descr="Votes for option {i}",
+    )'''
+        for i in range(n)
+    )
+    add_vote = ",\n".join(
+        f"            [option.get() == Int({i}), app.state.votes_{i}.increment()]" for i in range(n)
+    )
+    get_votes = ",\n".join(
+        f"            [option.get() == Int({i}), output.set(app.state.votes_{i})]" for i in range(n)
+    )
+    return f'''from beaker import Application, Authorize, GlobalStateValue, LocalStateValue
+from pyteal import *
+
+
+class {name}State:
+{tallies}
+    is_open = GlobalStateValue(
+        stack_type=TealType.uint64,
+        default=Int(1),
+        descr="1 while votes are accepted",
+    )
+    has_voted = LocalStateValue(
+        stack_type=TealType.uint64,
+        default=Int(0),
+        descr="1 once the account has voted",
+    )
+
+
+app = Application("{name}", state={name}State())
+
+OPTIONS = Int({n})
+
+
+@app.create(bare=True)
+def create() -> Expr:
+    """Create the poll, open for votes"""
+    return app.initialize_global_state()
+
+
+@app.opt_in(bare=True)
+def opt_in() -> Expr:
+    """Register the caller as a voter"""
+    return app.initialize_local_state()
+
+
+@app.external
+def vote(option: abi.Uint64) -> Expr:
+    """Vote for an option (0 to {n - 1}), once per account"""
+    return Seq(
+        Assert(app.state.is_open == Int(1), comment="voting is closed"),
+        Assert(option.get() < OPTIONS, comment="no such option"),
+        Assert(app.state.has_voted == Int(0), comment="already voted"),
+        app.state.has_voted.set(Int(1)),
+        Cond(
+{add_vote},
+        ),
+    )
+
+
+@app.external(read_only=True)
+def get_votes(option: abi.Uint64, *, output: abi.Uint64) -> Expr:
+    """Return the votes of an option"""
+    return Seq(
+        Assert(option.get() < OPTIONS, comment="no such option"),
+        Cond(
+{get_votes},
+        ),
+    )
+
+
+@app.external(authorize=Authorize.only_creator())
+def close_voting() -> Expr:
+    """Stop accepting votes (creator only)"""
+    return app.state.is_open.set(Int(0))
+'''
+
+
+def _voting_tests(name: str, p: Dict[str, Any]) -> str:
+    return f'''"""
+Tests of the {name} poll.
+"""
+import pytest
+
+
+def test_vote_is_counted(app_client):
+    app_client.opt_in()
+    app_client.call("vote", option=1)
+    assert app_client.call("get_votes", option=1).return_value == 1
+    assert app_client.call("get_votes", option=0).return_value == 0
+
+
+def test_cannot_vote_twice(app_client):
+    app_client.opt_in()
+    app_client.call("vote", option=0)
+    with pytest.raises(Exception):
+        app_client.call("vote", option=0)
+
+
+def test_unknown_option_rejected(app_client):
+    app_client.opt_in()
+    with pytest.raises(Exception):
+        app_client.call("vote", option={p["options"]})
+
+
+def test_closed_poll_rejects_votes(app_client):
+    app_client.opt_in()
+    app_client.call("close_voting")
+    with pytest.raises(Exception):
+        app_client.call("vote", option=0)
+'''
+
+
+VOTING = Archetype(
+    name="voting",
+    description="Poll with numbered options, one vote per opted-in account, closable by the creator",
+    examples=[
+        "Create a voting contract",
+        "Simple voting smart contract where each account can vote once",
+        "A poll contract with yes or no votes",
+        "Voting dapp with three candidates and vote counting",
+        "Contract for a ballot where users cast votes for options",
+        "Make a DAO proposal voting contract that tallies votes",
+    ],
+    vocabulary="vote votes voting voter voters poll ballot election elect candidate candidates option options "
+               "choice choices proposal proposals yes no tally count result results once account close end open "
+               "creator only two three four five",
+    extract=_voting_params,
+    contract=_voting_contract,
+    tests=_voting_tests,
+)
+
+
+# --- Escrow ------------------------------------------------------------------
+
+def _escrow_params(prompt: str) -> Dict[str, Any]:
+    return {}
+
+
+def _escrow_contract(name: str, p: Dict[str, Any]) -> str:
+    return f'''from beaker import Application, Authorize, GlobalStateValue
+from pyteal import *
+
+
+class {name}State:
+    beneficiary = GlobalStateValue(
+        stack_type=TealType.bytes,
+        default=Global.zero_address(),
+        descr="Account the funds are released to",
+    )
+    deposited = GlobalStateValue(
+        stack_type=TealType.uint64,
+        default=Int(0),
+        descr="MicroAlgos held in escrow",
+    )
+
+
+app = Application("{name}", state={name}State())
+
+
+@app.create(bare=True)
+def create() -> Expr:
+    """Create an empty escrow"""
+    return app.initialize_global_state()
+
+
+@app.external(authorize=Authorize.only_creator())
+def set_beneficiary(beneficiary: abi.Address) -> Expr:
+    """Choose who receives the funds on release (creator only)"""
+    return app.state.beneficiary.set(beneficiary.get())
+
+
+@app.external
+def deposit(payment: abi.PaymentTransaction) -> Expr:
+    """Add the funds of a payment to the app to the escrow"""
+    return Seq(
+        Assert(payment.get().receiver() == Global.current_application_address(), comment="pay the app"),
+        app.state.deposited.set(app.state.deposited + payment.get().amount()),
+    )
+
+
+def _pay_out(receiver: Expr) -> Expr:
+    return Seq(
+        Assert(app.state.deposited > Int(0), comment="nothing in escrow"),
+        InnerTxnBuilder.Execute({{
+            TxnField.type_enum: TxnType.Payment,
+            TxnField.receiver: receiver,
+            TxnField.amount: app.state.deposited,
+            TxnField.fee: Int(0),
+        }}),
+        app.state.deposited.set(Int(0)),
+    )
+
+
+@app.external(authorize=Authorize.only_creator())
+def release() -> Expr:
+    """Pay the escrowed funds to the beneficiary (creator only)"""
+    return Seq(
+        Assert(app.state.beneficiary != Global.zero_address(), comment="no beneficiary set"),
+        _pay_out(app.state.beneficiary),
+    )
+
+
+@app.external(authorize=Authorize.only_creator())
+def refund() -> Expr:
+    """Return the escrowed funds to the creator (creator only)"""
+    return _pay_out(Global.creator_address())
+
+
+@app.external(read_only=True)
+def get_deposited(*, output: abi.Uint64) -> Expr:
+    """Return the microAlgos held in escrow"""
+    return output.set(app.state.deposited)
+'''
+
+
+def _escrow_tests(name: str, p: Dict[str, Any]) -> str:
+    return f'''"""
+Tests of the {name} escrow.
+"""
+import pytest
+from algosdk import account
+from algosdk.atomic_transaction_composer import TransactionWithSigner
+from algosdk.transaction import PaymentTxn
+
+DEPOSIT = 1_000_000
+
+
+@pytest.fixture
+def funded_app(app_client, deployer):
+    """The escrow app, funded for its minimum balance, with one deposit made."""
+    app_client.fund(200_000)
+    params = app_client.get_suggested_params()
+    payment = PaymentTxn(deployer.address, params, app_client.app_addr, DEPOSIT)
+    app_client.call("deposit", payment=TransactionWithSigner(payment, deployer.signer))
+    return app_client
+
+
+def _with_inner_fee(app_client):
+    params = app_client.get_suggested_params()
+    params.flat_fee = True
+    params.fee = 2 * params.min_fee
+    return params
+
+
+def test_deposit_is_recorded(funded_app):
+    assert funded_app.call("get_deposited").return_value == DEPOSIT
+
+
+def test_release_pays_beneficiary(funded_app, algod_client):
+    _, beneficiary = account.generate_account()
+    funded_app.call("set_beneficiary", beneficiary=beneficiary)
+    funded_app.call("release", suggested_params=_with_inner_fee(funded_app))
+    assert algod_client.account_info(beneficiary)["amount"] == DEPOSIT
+    assert funded_app.call("get_deposited").return_value == 0
+
+
+def test_release_needs_beneficiary(funded_app):
+    with pytest.raises(Exception):
+        funded_app.call("release", suggested_params=_with_inner_fee(funded_app))
+
+
+def test_refund(funded_app):
+    funded_app.call("refund", suggested_params=_with_inner_fee(funded_app))
+    assert funded_app.call("get_deposited").return_value == 0
+'''
+
+
+ESCROW = Archetype(
+    name="escrow",
+    description="Escrow taking deposits, released to a beneficiary or refunded by the creator",
+    examples=[
+        "Create an escrow contract",
+        "Escrow smart contract that holds funds until the owner releases them to a beneficiary",
+        "A contract where a buyer deposits Algos and the seller gets paid on release",
+        "Simple escrow with deposit, release and refund",
+        "Hold payments in escrow and refund them if the deal is cancelled",
+    ],
+    vocabulary="escrow deposit deposits fund funds hold held release refund pay payment payments beneficiary "
+               "recipient receiver buyer seller owner creator algo algos microalgo amount balance withdraw "
+               "lock locked send transfer deal cancel",
+    extract=_escrow_params,
+    contract=_escrow_contract,
+    tests=_escrow_tests,
+)
+
+
+ARCHETYPES: Dict[str, Archetype] = {a.name: a for a in (COUNTER, GREETER, VOTING, ESCROW)}
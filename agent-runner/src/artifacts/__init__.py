@@ -0,0 +1,21 @@
+"""Content-addressed store of compiled contracts."""
+import threading
+from typing import Optional
+
+from src.core import config
+from .store import ArtifactStore, artifact_key, compiler_version
+
+_store: Optional[ArtifactStore] = None
+_store_lock = threading.Lock()
+
+
+def artifact_store() -> ArtifactStore:
+    """Return the process-wide store at config.ARTIFACT_DIR."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ArtifactStore(config.ARTIFACT_DIR)
+        return _store
+
+
+__all__ = ["ArtifactStore", "artifact_key", "artifact_store", "compiler_version"]
@@ -0,0 +1,241 @@
+"""
+Content-addressed store of compiled contracts.
+
+An entry is keyed by the SHA-256 of the compiler version and the contract
+source, so identical contracts built with the same PyTeal/Beaker versions
+are compiled once and shared by every task that produces them. The store
+lives on a volume shared with the backend, which serves the files.
+
+    <root>/<key[:2]>/<key>/
+        manifest.json       key, compiler, file sizes and hashes
+        contract.py         contract source
+        approval.teal       compiled approval program
+        clear.teal          compiled clear-state program
+        contract.json       ARC-4 ABI description
+        application.json    ARC-32 application spec
+    <root>/tasks/<task_id>/
+        test_results.json   outcome of that task's testing phase
+
+Entries only hold files derived from the source, since every task with the
+same contract shares them; what a task found out about it (its test
+results) is kept per task. Entries are built in a temporary directory and renamed into place, and a
+per-key file lock makes concurrent builds of the same source wait for the
+first one instead of compiling again.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+from src.core import log, span
+
+# Packages whose versions determine the compiled output
+COMPILER_PACKAGES = ("pyteal", "beaker-pyteal")
+
+# Directory in the store holding the per-task files
+TASKS_DIR = "tasks"
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Compiles the Beaker app of a contract file and exports its spec files
+_EXPORT_SCRIPT = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("stored_contract", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.app.build().export(sys.argv[2])
+"""
+
+_VERSION_SCRIPT = """
+import importlib.metadata, sys
+for name in sys.argv[1:]:
+    try:
+        print(f"{name}=={importlib.metadata.version(name)}")
+    except importlib.metadata.PackageNotFoundError:
+        print(f"{name}==missing")
+"""
+
+
+def compiler_version() -> str:
+    """Return the PyTeal/Beaker versions of the interpreter that compiles contracts."""
+    result = subprocess.run(
+        [sys.executable, "-c", _VERSION_SCRIPT, *COMPILER_PACKAGES],
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    return ";".join(result.stdout.split())
+
+
+def artifact_key(source: str, compiler: str) -> str:
+    """
+    Compute the store key of a contract.
+
+    Args:
+        source: Contract source code
+        compiler: Compiler version string (see compiler_version())
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    digest.update(compiler.encode("utf-8"))
+    digest.update(b"\0")
+    digest.update(source.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Compiled-contract store rooted at a (shared) directory."""
+
+    def __init__(self, root: Path):
+        """
+        Initialize the store.
+
+        Args:
+            root: Store directory, typically a volume shared with the backend
+        """
+        self.root = root
+        self._compiler: Optional[str] = None
+
+    def entry_dir(self, key: str) -> Path:
+        """Return the directory of an entry."""
+        return self.root / key[:2] / key
+
+    def manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return an entry's manifest, or None if the entry does not exist."""
+        try:
+            return json.loads((self.entry_dir(key) / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    @contextmanager
+    def _locked(self, key: str) -> Iterator[None]:
+        """Hold the per-key build lock (shared between processes)."""
+        lock_dir = self.root / ".locks"
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        with open(lock_dir / f"{key}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_manifest(self, directory: Path, key: str, compiler: str, created_at: float) -> Dict[str, Any]:
+        manifest = {
+            "key": key,
+            "compiler": compiler,
+            "created_at": created_at,
+            "files": {
+                path.name: {"size": path.stat().st_size, "sha256": _file_digest(path)}
+                for path in sorted(directory.iterdir())
+                if path.is_file() and path.name != "manifest.json" and not path.name.startswith(".")
+            },
+        }
+        tmp = directory / ".manifest.json.tmp"
+        tmp.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp, directory / "manifest.json")
+        return manifest
+
+    def compile(self, contract_path: Path, timeout: int = 120) -> Dict[str, Any]:
+        """
+        Return the artifacts of a contract, compiling it only if needed.
+
+        Args:
+            contract_path: Path to contract.py
+            timeout: Seconds before the compile is abandoned
+
+        Returns:
+            Dict with "key", "reused" (True if the entry already existed),
+            "files" and "compile_s"
+
+        Raises:
+            RuntimeError: If the contract does not compile
+        """
+        if self._compiler is None:
+            self._compiler = compiler_version()
+        source = contract_path.read_text(encoding="utf-8")
+        key = artifact_key(source, self._compiler)
+
+        with span("artifacts.compile", key=key) as s, self._locked(key):
+            manifest = self.manifest(key)
+            reused = manifest is not None
+            start = time.perf_counter()
+            if not reused:
+                manifest = self._build(key, source, timeout)
+            if s:
+                s.set_attribute("reused", reused)
+
+        compile_s = round(time.perf_counter() - start, 3)
+        log(f"Artifacts: {key[:12]} {'reused from store' if reused else f'compiled in {compile_s}s'}")
+        return {"key": key, "reused": reused, "files": sorted(manifest["files"]), "compile_s": compile_s}
+
+    def _build(self, key: str, source: str, timeout: int) -> Dict[str, Any]:
+        """Compile a source into a new entry (caller holds the key's lock)."""
+        target = self.entry_dir(key)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(dir=target.parent, prefix=f".{key[:12]}."))
+        try:
+            (tmp / "contract.py").write_text(source, encoding="utf-8")
+            result = subprocess.run(
+                [sys.executable, "-c", _EXPORT_SCRIPT, str(tmp / "contract.py"), str(tmp)],
+                cwd=str(tmp),
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(f"Contract does not compile:\n{result.stderr[-2000:]}")
+            shutil.rmtree(tmp / "__pycache__", ignore_errors=True)
+            manifest = self._write_manifest(tmp, key, self._compiler, time.time())
+            if target.exists():
+                shutil.rmtree(target)  # incomplete entry without a manifest
+            os.rename(tmp, target)
+            return manifest
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+
+    def task_dir(self, task_id: str) -> Path:
+        """Return the directory of a task's own files."""
+        if not _SAFE_NAME.match(task_id):
+            raise ValueError(f"Invalid task ID: {task_id}")
+        return self.root / TASKS_DIR / task_id
+
+    def save_task_file(self, task_id: str, name: str, content: str) -> Path:
+        """
+        Add or replace a file of one task (e.g. its test results).
+
+        Args:
+            task_id: Task identifier
+            name: File name (no directories)
+            content: File content
+
+        Returns:
+            Path of the written file
+        """
+        if "/" in name or name.startswith("."):
+            raise ValueError(f"Invalid artifact name: {name}")
+        directory = self.task_dir(task_id)
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = directory / f".{name}.tmp"
+        tmp.write_text(content, encoding="utf-8")
+        os.replace(tmp, directory / name)
+        return directory / name
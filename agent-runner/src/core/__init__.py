@@ -1,5 +1,18 @@
 """Core utilities."""
 from .config import config
-from .logger import log
+from .context import TaskContext, current_task, task_context
+from .logger import capture_logs, log
+from .tracing import Tracer, current_tracer, span, start_trace
 
-__all__ = ["config", "log"]
+__all__ = [
+    "config",
+    "log",
+    "capture_logs",
+    "TaskContext",
+    "current_task",
+    "task_context",
+    "Tracer",
+    "current_tracer",
+    "span",
+    "start_trace",
+]
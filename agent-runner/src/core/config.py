@@ -11,6 +11,12 @@ class Config:
     # Workspace
     WORKSPACE_DIR = Path("/workspace")
 
+    # Project templates, and how long finished task projects are kept
+    SCAFFOLD_DIR = Path(os.getenv("SCAFFOLD_DIR", str(Path(__file__).parent.parent.parent / "scaffolds")))
+    SCAFFOLD_TEMPLATE = os.getenv("SCAFFOLD_TEMPLATE", "beaker-default")
+    WORKSPACE_RETENTION_S = float(os.getenv("WORKSPACE_RETENTION_S", "86400"))
+    WORKSPACE_GC_INTERVAL_S = float(os.getenv("WORKSPACE_GC_INTERVAL_S", "600"))
+
     # LLM Configuration
     AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY", "")
     AZURE_OPENAI_ENDPOINT = os.getenv("AZURE_OPENAI_ENDPOINT", "")
@@ -19,12 +25,70 @@ class Config:
 
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 
+    @property
+    def default_model_id(self) -> str:
+        """LiteLLM model id create_model() uses when none is given (read at call time, after .env)."""
+        if os.getenv("AZURE_OPENAI_API_KEY") and os.getenv("AZURE_OPENAI_ENDPOINT"):
+            return f"azure/{os.getenv('AZURE_OPENAI_DEPLOYMENT', 'gpt-4o-mini')}"
+        return "gpt-4o-mini"
+
+    # LLM call retries on transient errors (rate limits, timeouts)
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+    LLM_RETRY_BACKOFF = float(os.getenv("LLM_RETRY_BACKOFF", "1.0"))
+
+    # Speculative coding: run K coding attempts in parallel, first valid wins.
+    # Candidate i uses temperature/model i modulo the list lengths;
+    # an empty model list means every candidate uses the default model.
+    SPECULATIVE_K = int(os.getenv("SPECULATIVE_K", "1"))
+    SPECULATIVE_TEMPERATURES = [
+        float(t) for t in os.getenv("SPECULATIVE_TEMPERATURES", "0.2,0.7,1.0").split(",") if t.strip()
+    ]
+    SPECULATIVE_MODELS = [m.strip() for m in os.getenv("SPECULATIVE_MODELS", "").split(",") if m.strip()]
+    SPECULATIVE_TOKEN_BUDGET = int(os.getenv("SPECULATIVE_TOKEN_BUDGET", "0"))
+    # Let candidate 0 (the single-attempt settings) run on after another candidate won,
+    # to measure the speedup; the coding phase then takes as long as a single attempt
+    SPECULATIVE_MEASURE_BASELINE = os.getenv("SPECULATIVE_MEASURE_BASELINE", "false").lower() == "true"
+
+    # Template fast path: prompts confidently matched to a contract archetype (counter, greeter,
+    # voting, escrow) are filled into its template instead of going through the LLM phases
+    TEMPLATE_FAST_PATH = os.getenv("TEMPLATE_FAST_PATH", "true").lower() == "true"
+    TEMPLATE_MIN_SCORE = float(os.getenv("TEMPLATE_MIN_SCORE", "0.35"))
+    TEMPLATE_MIN_MARGIN = float(os.getenv("TEMPLATE_MIN_MARGIN", "0.15"))
+    TEMPLATE_MIN_COVERAGE = float(os.getenv("TEMPLATE_MIN_COVERAGE", "0.9"))
+
+    # Early exit of the coding and testing agents once the contract compiles / the tests pass:
+    # "on" stops the agent, "shadow" only measures the steps and tokens stopping would save
+    EARLY_EXIT = os.getenv("EARLY_EXIT", "on").lower()
+
+    # Shell tool: timeout and the head/tail of each output stream shown to the agent
+    SHELL_TIMEOUT = float(os.getenv("SHELL_TIMEOUT", "300"))
+    SHELL_OUTPUT_HEAD_CHARS = int(os.getenv("SHELL_OUTPUT_HEAD_CHARS", "4000"))
+    SHELL_OUTPUT_TAIL_CHARS = int(os.getenv("SHELL_OUTPUT_TAIL_CHARS", "4000"))
+
+    # Cold-start budget checked by `main.py --startup-profile`
+    STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1000"))
+
+    # Daemon mode
+    DAEMON_HOST = os.getenv("DAEMON_HOST", "127.0.0.1")
+    DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+    DAEMON_MAX_CONCURRENCY = int(os.getenv("DAEMON_MAX_CONCURRENCY", "2"))
+
     # Algorand Configuration
     ALGOD_SERVER = os.getenv("ALGOD_SERVER", "http://localhost:4001")
     ALGOD_TOKEN = os.getenv("ALGOD_TOKEN", "a" * 64)
 
-    # Documentation path
-    DOCS_DIR = Path(__file__).parent.parent.parent / "docs"
+    # Documentation corpus (markdown, HTML and Python sources) and its search index
+    DOCS_DIR = Path(os.getenv("DOCS_DIR", str(Path(__file__).parent.parent.parent / "docs")))
+    DOCS_INDEX_PATH = Path(os.getenv("DOCS_INDEX_PATH", str(DOCS_DIR / ".index" / "docs.bm25")))
+    DOCS_TOP_K = int(os.getenv("DOCS_TOP_K", "3"))
+    DOCS_TOKEN_BUDGET = int(os.getenv("DOCS_TOKEN_BUDGET", "1500"))
+    DOCS_CHUNK_TOKENS = int(os.getenv("DOCS_CHUNK_TOKENS", "400"))
+
+    # Content-addressed store of compiled contracts (a volume shared with the backend)
+    ARTIFACT_DIR = Path(os.getenv("ARTIFACT_DIR", "/artifacts"))
+
+    # Tracing: OTLP-JSON span files are written here, one per trace
+    TRACE_DIR = Path(os.getenv("TRACE_DIR", "/workspace/.traces"))
 
 
 config = Config()
@@ -0,0 +1,88 @@
+"""
+Per-task execution context.
+
+Several tasks can run in one process (daemon and batch mode), so nothing a
+task does may depend on process-global state such as the current working
+directory. Each task runs inside task_context(); the agent tools, which
+are module-level objects, read the active context to find the task's
+directory, and log lines are labelled with the task's id.
+"""
+import contextvars
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+from .config import config
+
+_current_task: contextvars.ContextVar[Optional["TaskContext"]] = contextvars.ContextVar(
+    "task_context", default=None
+)
+
+
+class TaskContext:
+    """Identity and directories of one task."""
+
+    def __init__(self, task_id: str, workspace: Path, cwd: Optional[Path] = None):
+        """
+        Initialize the context.
+
+        Args:
+            task_id: Identifier shown in the task's log lines
+            workspace: Root the task's files must stay under
+            cwd: Directory relative tool paths and shell commands start from
+                 (defaults to the workspace; set to the project once it exists)
+        """
+        self.task_id = task_id
+        self.workspace = workspace
+        self.cwd = cwd or workspace
+
+    def resolve(self, path: Union[str, Path]) -> Path:
+        """
+        Resolve a tool path against the task's working directory.
+
+        Symlinks are resolved on both sides, so a link inside the workspace
+        cannot lead a tool outside of it.
+
+        Args:
+            path: Relative (to cwd) or absolute path
+
+        Returns:
+            Absolute path with symlinks resolved
+
+        Raises:
+            ValueError: If the path leaves the task's workspace
+        """
+        full = (self.cwd / path).resolve()
+        workspace = self.workspace.resolve()
+        if full != workspace and workspace not in full.parents:
+            raise ValueError(f"Path is outside the task workspace: {path}")
+        return full
+
+
+def current_task() -> TaskContext:
+    """Return the active task context, or one for the shared workspace outside of tasks."""
+    task = _current_task.get()
+    if task is None:
+        return TaskContext("main", config.WORKSPACE_DIR)
+    return task
+
+
+def current_task_id() -> Optional[str]:
+    """Return the id of the active task, if any."""
+    task = _current_task.get()
+    return task.task_id if task is not None else None
+
+
+@contextmanager
+def task_context(task: TaskContext) -> Iterator[TaskContext]:
+    """
+    Make a task context active for the current context (and threads started from copies of it).
+
+    Args:
+        task: Context of the task about to run
+    """
+    token = _current_task.set(task)
+    try:
+        yield task
+    finally:
+        _current_task.reset(token)
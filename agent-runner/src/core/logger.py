@@ -1,15 +1,51 @@
 """
 Logging utilities for agent runner.
 """
+import contextvars
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Callable, Iterator, Optional
+
+from .context import current_task_id
+
+_log_sink: contextvars.ContextVar[Optional[Callable[[str], None]]] = contextvars.ContextVar(
+    "log_sink", default=None
+)
 
 
 def log(message: str) -> None:
     """
     Print a timestamped log message.
 
+    Inside a task context the line is labelled with the task id, so that
+    interleaved output of concurrent tasks can be told apart. The line is
+    also passed to the sink installed with capture_logs(), if any.
+
     Args:
         message: Log message to print
     """
     timestamp = datetime.utcnow().isoformat(timespec='seconds') + 'Z'
-    print(f"[{timestamp}] {message}", flush=True)
+    task_id = current_task_id()
+    line = f"[{timestamp}] [{task_id}] {message}" if task_id else f"[{timestamp}] {message}"
+    print(line, flush=True)
+
+    sink = _log_sink.get()
+    if sink is not None:
+        sink(line)
+
+
+@contextmanager
+def capture_logs(sink: Callable[[str], None]) -> Iterator[None]:
+    """
+    Forward log lines emitted in the current context to a sink.
+
+    Used by daemon mode to stream each task's logs back to its client.
+
+    Args:
+        sink: Called with every formatted log line
+    """
+    token = _log_sink.set(sink)
+    try:
+        yield
+    finally:
+        _log_sink.reset(token)
@@ -0,0 +1,113 @@
+"""
+Cold-startup profiling for the agent runner CLI.
+
+Startup is measured in fresh interpreters with `python -X importtime`, so
+the numbers reflect a real cold start and not modules already imported by
+the profiling process.
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Agent-runner root (the directory containing src/ and runner.py)
+ROOT = Path(__file__).parent.parent.parent
+
+# `import time: self [us] | cumulative | imported package`
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# Modules a task pays for once its first phase creates a model or agent
+PHASE_IMPORTS = ["smolagents", "litellm"]
+
+
+def parse_importtime(output: str) -> List[Dict[str, Any]]:
+    """
+    Parse `-X importtime` output.
+
+    Args:
+        output: stderr of an interpreter run with -X importtime
+
+    Returns:
+        One entry per imported module with self/cumulative time in ms and
+        nesting depth (0 for modules imported directly)
+    """
+    entries = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        entries.append({
+            "module": module,
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            "depth": (len(indent) - 1) // 2,
+        })
+    return entries
+
+
+def _measure(args: List[str]) -> Dict[str, Any]:
+    """Run a fresh interpreter with -X importtime and time it."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(ROOT),
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    imports = parse_importtime(proc.stderr)
+    top_level = sorted((e for e in imports if e["depth"] == 0), key=lambda e: e["cumulative_ms"], reverse=True)
+    return {
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(e["cumulative_ms"] for e in imports if e["depth"] == 0), 1),
+        "modules": len(imports),
+        "top_imports": top_level[:25],
+        "exit_code": proc.returncode,
+    }
+
+
+def profile_startup(budget_ms: float) -> Dict[str, Any]:
+    """
+    Profile cold startup of the CLI and the imports deferred to the phases.
+
+    The CLI is measured on its empty-prompt error path, which must not load
+    any heavy module.
+
+    Args:
+        budget_ms: Allowed wall time for a cold CLI start
+
+    Returns:
+        Profile report
+    """
+    cli = _measure([str(ROOT / "src" / "main.py"), "--prompt", " "])
+    phases = _measure(["-c", "; ".join(f"import {m}" for m in PHASE_IMPORTS)])
+    return {
+        "python": sys.version.split()[0],
+        "budget_ms": budget_ms,
+        "within_budget": cli["wall_ms"] <= budget_ms,
+        "cli": cli,
+        "phase_imports": {**phases, "packages": PHASE_IMPORTS},
+    }
+
+
+def write_profile(path: Path, report: Dict[str, Any]) -> Path:
+    """
+    Write a startup profile to disk as JSON.
+
+    Args:
+        path: Output file
+        report: Report from profile_startup()
+
+    Returns:
+        The written path
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+    return path
@@ -0,0 +1,242 @@
+"""
+Lightweight tracing for the agent runner.
+
+Spans are timed with the monotonic high-resolution clock and exported as
+OTLP-JSON, so the file can be loaded into any OpenTelemetry-compatible
+viewer. The active tracer and span live in context variables, which keeps
+concurrent tasks from mixing their spans.
+"""
+import contextvars
+import json
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar("tracer", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+class Span:
+    """A single timed operation."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        """
+        Start a span.
+
+        Args:
+            name: Span name (e.g. "phase.coding_agent")
+            trace_id: 32-hex-digit trace identifier
+            parent_id: Span ID of the parent span, if any
+            attributes: Initial span attributes
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+        self.start_unix_ns = time.time_ns()
+        self._start_ns = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a span attribute."""
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        """End the span (idempotent)."""
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._start_ns
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (so far, if still open)."""
+        duration = self.duration_ns if self.duration_ns is not None else time.perf_counter_ns() - self._start_ns
+        return duration / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to its OTLP-JSON representation."""
+        duration = self.duration_ns if self.duration_ns is not None else time.perf_counter_ns() - self._start_ns
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self.start_unix_ns + duration),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Tracer:
+    """Collects the spans of one task."""
+
+    def __init__(self, service_name: str, trace_id: Optional[str] = None, parent_id: Optional[str] = None):
+        """
+        Initialize a tracer.
+
+        Args:
+            service_name: Service name recorded in the exported resource
+            trace_id: Trace to join (a new one is generated if omitted)
+            parent_id: Span ID in another process to attach root spans to
+        """
+        self.service_name = service_name
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.parent_id = parent_id
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """
+        Start a span without making it current.
+
+        Args:
+            name: Span name
+            parent: Parent span (defaults to the tracer's remote parent)
+            **attributes: Span attributes
+
+        Returns:
+            The started span
+        """
+        parent_id = parent.span_id if parent else self.parent_id
+        span = Span(name, self.trace_id, parent_id, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """
+        Record a span around a block of code.
+
+        Args:
+            name: Span name
+            **attributes: Span attributes
+
+        Yields:
+            The active span
+        """
+        span = self.start_span(name, parent=_current_span.get(), **attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end()
+            _current_span.reset(token)
+
+    def activate(self) -> contextvars.Token:
+        """Make this tracer the current one for module-level span() calls."""
+        return _current_tracer.set(self)
+
+    def export(self, path: Path) -> Path:
+        """
+        Write all spans to an OTLP-JSON file.
+
+        Args:
+            path: Output file
+
+        Returns:
+            The written path
+        """
+        with self._lock:
+            spans = [s.to_otlp() for s in self.spans]
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", self.service_name)]},
+                "scopeSpans": [{"scope": {"name": self.service_name}, "spans": spans}],
+            }]
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload))
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate span durations by name.
+
+        Returns:
+            Trace ID and per-name count, total and max duration in ms
+        """
+        by_name: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            entry = by_name.setdefault(s.name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "errors": 0})
+            entry["count"] += 1
+            entry["total_ms"] += s.duration_ms
+            entry["max_ms"] = max(entry["max_ms"], s.duration_ms)
+            entry["errors"] += 1 if s.error else 0
+        for entry in by_name.values():
+            entry["total_ms"] = round(entry["total_ms"], 3)
+            entry["max_ms"] = round(entry["max_ms"], 3)
+        return {"trace_id": self.trace_id, "spans": by_name}
+
+
+def start_trace(service_name: str = "agent-runner") -> Tracer:
+    """
+    Create a tracer for the current task and make it current.
+
+    Joins the backend's trace when TRACE_ID / TRACE_PARENT_SPAN_ID are set.
+
+    Args:
+        service_name: Service name recorded in the exported resource
+
+    Returns:
+        The active tracer
+    """
+    tracer = Tracer(
+        service_name,
+        trace_id=os.getenv("TRACE_ID") or None,
+        parent_id=os.getenv("TRACE_PARENT_SPAN_ID") or None,
+    )
+    tracer.activate()
+    return tracer
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Return the tracer of the current context, if any."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Record a span on the current tracer (no-op without one).
+
+    Args:
+        name: Span name
+        **attributes: Span attributes
+
+    Yields:
+        The active span, or None when tracing is off
+    """
+    tracer = _current_tracer.get()
+    if tracer is None:
+        yield None
+        return
+    with tracer.span(name, **attributes) as s:
+        yield s
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    """Encode a key/value pair as an OTLP attribute."""
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
@@ -0,0 +1,20 @@
+"""LLM client wrappers."""
+from .metrics import LLMMetrics, active_metrics, collect_llm_metrics, current_phase, llm_phase
+
+__all__ = [
+    "AccountedLiteLLMModel",
+    "LLMMetrics",
+    "active_metrics",
+    "collect_llm_metrics",
+    "current_phase",
+    "llm_phase",
+]
+
+
+def __getattr__(name):
+    # The model wrapper subclasses smolagents' LiteLLMModel; import it (and
+    # smolagents/litellm with it) only when it is actually used
+    if name == "AccountedLiteLLMModel":
+        from .model import AccountedLiteLLMModel
+        return AccountedLiteLLMModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,184 @@
+"""
+Per-call LLM metrics aggregated by agent phase.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+_current_phase: contextvars.ContextVar[str] = contextvars.ContextVar("llm_phase", default="unscoped")
+_current_metrics: contextvars.ContextVar[Optional["LLMMetrics"]] = contextvars.ContextVar(
+    "llm_metrics", default=None
+)
+
+
+@contextmanager
+def llm_phase(name: str) -> Iterator[None]:
+    """
+    Attribute LLM calls made inside the block to a phase.
+
+    Args:
+        name: Phase name (e.g. "coding_agent")
+    """
+    token = _current_phase.set(name)
+    try:
+        yield
+    finally:
+        _current_phase.reset(token)
+
+
+def current_phase() -> str:
+    """Return the phase LLM calls are currently attributed to."""
+    return _current_phase.get()
+
+
+@contextmanager
+def collect_llm_metrics(metrics: "LLMMetrics") -> Iterator["LLMMetrics"]:
+    """
+    Record LLM calls made inside the block into a task's own collector.
+
+    Lets one model client be shared by many tasks while each task still
+    reports only its own calls.
+
+    Args:
+        metrics: Collector of the current task
+    """
+    token = _current_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_metrics.reset(token)
+
+
+def active_metrics() -> Optional["LLMMetrics"]:
+    """Return the collector of the current task, if any."""
+    return _current_metrics.get()
+
+
+class LLMMetrics:
+    """Thread-safe collector of LLM call records."""
+
+    def __init__(self):
+        """Initialize an empty collector."""
+        self.calls: List[Dict[str, Any]] = []
+        self.steps: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record_call(
+        self,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int,
+        latency_s: float,
+        ttft_s: Optional[float],
+        retries: int,
+        error: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Record one completion call.
+
+        Args:
+            model: Model identifier
+            prompt_tokens: Input tokens billed
+            completion_tokens: Output tokens billed
+            cached_tokens: Input tokens served from the prompt cache
+            latency_s: Wall time of the call including retries
+            ttft_s: Time to first token (None when not streaming)
+            retries: Number of retried attempts
+            error: Error message if the call ultimately failed
+
+        Returns:
+            The stored record
+        """
+        record = {
+            "phase": current_phase(),
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "cached_tokens": cached_tokens,
+            "latency_s": round(latency_s, 4),
+            "ttft_s": round(ttft_s, 4) if ttft_s is not None else None,
+            "retries": retries,
+            "error": error,
+        }
+        with self._lock:
+            self.calls.append(record)
+        return record
+
+    def record_steps(self, used: int, max_steps: int) -> None:
+        """
+        Record how many agent steps the current phase used.
+
+        Args:
+            used: Steps actually taken
+            max_steps: Step limit the agent ran with
+        """
+        with self._lock:
+            entry = self.steps.setdefault(current_phase(), {"steps": 0, "max_steps": 0})
+            entry["steps"] += used
+            entry["max_steps"] += max_steps
+
+    def record_early_exit(self, steps_saved: int, tokens_saved: int) -> None:
+        """
+        Record the agent steps and tokens the current phase saved by exiting early.
+
+        Args:
+            steps_saved: Steps not taken (or, in shadow mode, taken after the phase was done)
+            tokens_saved: Tokens of those steps
+        """
+        with self._lock:
+            entry = self.steps.setdefault(current_phase(), {"steps": 0, "max_steps": 0})
+            entry["early_exits"] = entry.get("early_exits", 0) + 1
+            entry["steps_saved"] = entry.get("steps_saved", 0) + steps_saved
+            entry["tokens_saved"] = entry.get("tokens_saved", 0) + tokens_saved
+
+    def total_tokens(self, phase: Optional[str] = None) -> int:
+        """Return prompt plus completion tokens over all recorded calls, or those of one phase."""
+        with self._lock:
+            return sum(
+                c["prompt_tokens"] + c["completion_tokens"]
+                for c in self.calls
+                if phase is None or c["phase"] == phase
+            )
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Aggregate the recorded calls per phase and overall.
+
+        Returns:
+            Dictionary with "phases" and "totals"
+        """
+        with self._lock:
+            calls = list(self.calls)
+            steps = {k: dict(v) for k, v in self.steps.items()}
+
+        phases: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            phases.setdefault(call["phase"], []).append(call)
+
+        result = {name: _aggregate(records) for name, records in phases.items()}
+        for name, entry in steps.items():
+            result.setdefault(name, _aggregate([])).update(entry)
+
+        return {"phases": result, "totals": _aggregate(calls)}
+
+
+def _aggregate(calls: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum tokens, latency and retries over a list of call records."""
+    prompt_tokens = sum(c["prompt_tokens"] for c in calls)
+    cached_tokens = sum(c["cached_tokens"] for c in calls)
+    latencies = [c["latency_s"] for c in calls]
+    ttfts = [c["ttft_s"] for c in calls if c["ttft_s"] is not None]
+    return {
+        "calls": len(calls),
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": sum(c["completion_tokens"] for c in calls),
+        "cached_tokens": cached_tokens,
+        "cached_ratio": round(cached_tokens / prompt_tokens, 4) if prompt_tokens else 0.0,
+        "latency_s": round(sum(latencies), 4),
+        "max_latency_s": round(max(latencies), 4) if latencies else 0.0,
+        "avg_ttft_s": round(sum(ttfts) / len(ttfts), 4) if ttfts else None,
+        "retries": sum(c["retries"] for c in calls),
+        "errors": sum(1 for c in calls if c["error"]),
+    }
@@ -0,0 +1,157 @@
+"""
+LiteLLM model wrapper with prompt-cache accounting and call metrics.
+"""
+import time
+from typing import Any, Optional
+
+from smolagents import LiteLLMModel
+
+from src.core import config, log, span
+from .metrics import LLMMetrics, active_metrics
+
+# litellm exception types worth retrying; matched by name so litellm is not
+# imported just to reference them
+RETRYABLE_ERRORS = {
+    "RateLimitError",
+    "APIConnectionError",
+    "Timeout",
+    "APITimeoutError",
+    "ServiceUnavailableError",
+    "InternalServerError",
+}
+
+
+class AccountedLiteLLMModel(LiteLLMModel):
+    """LiteLLMModel that records latency, token usage and retries for every call."""
+
+    def __init__(self, *args, max_retries: Optional[int] = None, **kwargs):
+        """
+        Initialize the model.
+
+        Calls are recorded into the collector activated with
+        collect_llm_metrics(), or into the model's own collector outside
+        of one.
+
+        Args:
+            *args: Passed to LiteLLMModel
+            max_retries: Retries on transient errors (default LLM_MAX_RETRIES)
+            **kwargs: Passed to LiteLLMModel
+        """
+        super().__init__(*args, **kwargs)
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.metrics = LLMMetrics()
+
+    def generate(self, *args, **kwargs):
+        """Run a completion, retrying transient errors, and record its metrics."""
+        start = time.perf_counter()
+        retries = 0
+        with span("llm.generate", model=self.model_id) as s:
+            while True:
+                try:
+                    message = super().generate(*args, **kwargs)
+                    break
+                except Exception as e:
+                    if type(e).__name__ not in RETRYABLE_ERRORS or retries >= self.max_retries:
+                        self._record(None, time.perf_counter() - start, None, retries, str(e))
+                        raise
+                    retries += 1
+                    delay = config.LLM_RETRY_BACKOFF * 2 ** (retries - 1)
+                    log(f"LLM call failed ({type(e).__name__}), retry {retries}/{self.max_retries} in {delay:.1f}s")
+                    time.sleep(delay)
+            if s:
+                s.set_attribute("retries", retries)
+
+        # Without streaming there is no time to first token; only generate_stream() measures it
+        self._record(getattr(message, "raw", None), time.perf_counter() - start, None, retries)
+        return message
+
+    def generate_stream(self, *args, **kwargs):
+        """Stream a completion and record its time to first token."""
+        start = time.perf_counter()
+        ttft: Optional[float] = None
+        input_tokens = output_tokens = 0
+        with span("llm.generate_stream", model=self.model_id):
+            try:
+                for delta in super().generate_stream(*args, **kwargs):
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    usage = getattr(delta, "token_usage", None)
+                    if usage is not None:
+                        input_tokens += usage.input_tokens
+                        output_tokens += usage.output_tokens
+                    yield delta
+            except Exception as e:
+                self._record(None, time.perf_counter() - start, ttft, 0, str(e))
+                raise
+
+        usage = {"prompt_tokens": input_tokens, "completion_tokens": output_tokens}
+        self._record({"usage": usage}, time.perf_counter() - start, ttft, 0)
+
+    def _record(
+        self,
+        response: Any,
+        latency: float,
+        ttft: Optional[float],
+        retries: int,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Record a call from its raw response.
+
+        Args:
+            response: Raw litellm completion response (None on failure)
+            latency: Total wall time in seconds
+            ttft: Time to first token in seconds (None unless streamed)
+            retries: Number of retried attempts
+            error: Error message if the call failed
+        """
+        usage = _get(response, "usage")
+        prompt_tokens = _get(usage, "prompt_tokens") or 0
+        completion_tokens = _get(usage, "completion_tokens") or 0
+        cached_tokens = cached_prompt_tokens(usage) if usage is not None else 0
+
+        record = (active_metrics() or self.metrics).record_call(
+            model=self.model_id,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cached_tokens=cached_tokens,
+            latency_s=latency,
+            ttft_s=ttft,
+            retries=retries,
+            error=error,
+        )
+        ratio = cached_tokens / prompt_tokens if prompt_tokens else 0.0
+        log(
+            f"LLM call [{record['phase']}]: {latency:.2f}s, {prompt_tokens} prompt tokens "
+            f"({cached_tokens} cached, {ratio:.0%}), {completion_tokens} completion tokens, "
+            f"{retries} retries"
+        )
+
+
+def cached_prompt_tokens(usage: Any) -> int:
+    """
+    Number of prompt tokens served from the provider's prompt cache.
+
+    OpenAI and Azure report them in prompt_tokens_details.cached_tokens,
+    Anthropic (through litellm) in cache_read_input_tokens.
+
+    Args:
+        usage: Usage object or dict from a completion response
+
+    Returns:
+        Cached prompt tokens (0 if not reported)
+    """
+    details = _get(usage, "prompt_tokens_details")
+    cached = _get(details, "cached_tokens") if details is not None else None
+    if cached is None:
+        cached = _get(usage, "cache_read_input_tokens")
+    return int(cached or 0)
+
+
+def _get(obj: Any, name: str) -> Optional[Any]:
+    """Read a field from an object or a dict."""
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
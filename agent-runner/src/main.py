@@ -7,34 +7,89 @@ import argparse
 import json
 from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent))
+# Add the agent-runner root to path so the src.* packages (also used by runner.py) resolve
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from core import config, log
-from runner import runner
+from src.core import config, log
+from src.runner import runner, BatchRunner, read_prompts
 
 
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(description="Algorand AI Agent Runner")
-    parser.add_argument("--prompt", required=True, help="Natural language prompt for smart contract")
+    mode = parser.add_mutually_exclusive_group(required=True)
+    mode.add_argument("--prompt", help="Natural language prompt for smart contract")
+    mode.add_argument("--batch", type=Path, help="JSONL file of prompts to process in one process")
+    mode.add_argument("--daemon", action="store_true", help="Serve tasks over local HTTP from a warm process")
+    mode.add_argument("--startup-profile", type=Path, help="Write a cold-startup import-time breakdown to this file")
+    mode.add_argument("--index-docs", action="store_true", help="Ingest DOCS_DIR into the documentation search index")
+    parser.add_argument("--full", action="store_true", help="With --index-docs, re-parse every file")
+    parser.add_argument("--task-id", help="With --prompt, identifier of the task (names its checkpoint)")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="With --prompt and --task-id, continue a failed task from its last completed phase",
+    )
+    parser.add_argument(
+        "--revise-of",
+        metavar="TASK_ID",
+        help="With --prompt, change the contract of this earlier task as the prompt describes",
+    )
+    parser.add_argument("--concurrency", type=int, default=None, help="Prompts processed in parallel (batch/daemon)")
+    parser.add_argument("--output", type=Path, help="Write batch results as JSONL to this file")
+    parser.add_argument("--host", default=config.DAEMON_HOST, help="Daemon listen address")
+    parser.add_argument("--port", type=int, default=config.DAEMON_PORT, help="Daemon listen port")
+    parser.add_argument("--socket", help="Serve the daemon on this Unix socket instead of TCP")
+    parser.add_argument(
+        "--startup-budget-ms",
+        type=float,
+        default=config.STARTUP_BUDGET_MS,
+        help="Fail --startup-profile when a cold CLI start takes longer than this",
+    )
     args = parser.parse_args()
 
-    prompt = args.prompt.strip()
-    if not prompt:
-        log("ERROR: No prompt provided")
-        return 2
+    if args.startup_profile:
+        return run_startup_profile(args.startup_profile, args.startup_budget_ms)
 
-    log(f"Received prompt: {prompt}")
+    if args.index_docs:
+        from src.retrieval import build_index
+        stats = build_index(force=args.full)
+        print("INDEX_SUMMARY: " + json.dumps(stats), flush=True)
+        return 0
 
     # Verify environment
     if not config.AZURE_OPENAI_API_KEY and not config.OPENAI_API_KEY:
         log("WARNING: No LLM API keys found.")
         log("Set AZURE_OPENAI_API_KEY or OPENAI_API_KEY environment variable")
 
+    if args.batch:
+        return run_batch(args.batch, args.concurrency or 1, args.output)
+
+    if args.daemon:
+        from src.runner.daemon import serve
+        serve(
+            runner,
+            host=args.host,
+            port=args.port,
+            socket_path=args.socket,
+            max_concurrency=args.concurrency or config.DAEMON_MAX_CONCURRENCY,
+        )
+        return 0
+
+    prompt = args.prompt.strip()
+    if not prompt:
+        log("ERROR: No prompt provided")
+        return 2
+
+    if args.resume and not args.task_id:
+        log("ERROR: --resume needs the --task-id of the task to continue")
+        return 2
+
+    log(f"Received prompt: {prompt}")
+
     try:
         # Run the agent system
-        result = runner.run(prompt)
+        result = runner.run(prompt, task_id=args.task_id, resume=args.resume, revise_of=args.revise_of)
 
         # Print final result for backend to capture
         print("RESULT: " + json.dumps(result), flush=True)
@@ -48,5 +103,73 @@ def main():
         return 1
 
 
+def run_batch(path: Path, concurrency: int, output: Path = None) -> int:
+    """
+    Run every prompt of a JSONL file.
+
+    Args:
+        path: JSONL file of prompts
+        concurrency: Prompts processed in parallel
+        output: Optional JSONL results file
+
+    Returns:
+        Exit code (0 if every prompt succeeded)
+    """
+    try:
+        items = read_prompts(path)
+    except (OSError, ValueError) as e:
+        log(f"ERROR: Cannot read batch file: {e}")
+        return 2
+
+    if not items:
+        log("ERROR: Batch file contains no prompts")
+        return 2
+
+    try:
+        if output:
+            with open(output, "w") as out:
+                summary = BatchRunner(runner, concurrency, out).run(items)
+        else:
+            summary = BatchRunner(runner, concurrency).run(items)
+    except Exception as e:
+        log(f"FATAL ERROR: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+
+    print("BATCH_SUMMARY: " + json.dumps(summary), flush=True)
+    return 0 if summary["failed"] == 0 else 1
+
+
+def run_startup_profile(path: Path, budget_ms: float) -> int:
+    """
+    Profile cold startup and check it against the budget.
+
+    Args:
+        path: Output file for the import-time breakdown
+        budget_ms: Allowed wall time for a cold CLI start
+
+    Returns:
+        Exit code (1 if startup is over budget, for use as a CI regression check)
+    """
+    from src.core.startup import profile_startup, write_profile
+
+    report = profile_startup(budget_ms)
+    write_profile(path, report)
+
+    cli = report["cli"]
+    log(f"Cold CLI start: {cli['wall_ms']:.0f} ms ({cli['modules']} modules), budget {budget_ms:.0f} ms")
+    for entry in cli["top_imports"][:5]:
+        log(f"  {entry['module']}: {entry['cumulative_ms']:.1f} ms")
+    log(f"Deferred phase imports ({', '.join(report['phase_imports']['packages'])}): "
+        f"{report['phase_imports']['wall_ms']:.0f} ms")
+    log(f"Startup profile written to {path}")
+
+    if not report["within_budget"]:
+        log("ERROR: Cold startup exceeds the budget")
+        return 1
+    return 0
+
+
 if __name__ == "__main__":
     sys.exit(main())
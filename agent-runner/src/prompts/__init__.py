@@ -0,0 +1,13 @@
+"""Prompt templates and token accounting."""
+from .template import PromptTemplate, RenderedPrompt, get_template, register, render
+from .tokens import count_tokens
+from . import library  # noqa: F401  (registers the built-in templates)
+
+__all__ = [
+    "PromptTemplate",
+    "RenderedPrompt",
+    "get_template",
+    "register",
+    "render",
+    "count_tokens",
+]
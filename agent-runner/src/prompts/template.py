@@ -0,0 +1,174 @@
+"""
+Versioned prompt templates with a cacheable static prefix.
+
+Every template is split into a static prefix (rules, examples, instructions
+that never change between tasks) and a variable suffix (the user's request,
+project and contract names). The prefix is rendered first and byte-for-byte
+identical across calls, so provider-side prompt-prefix caching can reuse it.
+
+A template's text is changed in place together with the tools and project
+layout it describes, so the library only holds the current version of each
+template. The version (name@vN) records which text a prompt was rendered
+from.
+"""
+import hashlib
+import string
+from typing import Dict, Optional
+
+from .tokens import count_tokens
+
+
+class RenderedPrompt:
+    """A template rendered with concrete variables."""
+
+    def __init__(self, template: "PromptTemplate", suffix: str):
+        """
+        Initialize a rendered prompt.
+
+        Args:
+            template: Template the prompt was rendered from
+            suffix: Variable part with all placeholders filled in
+        """
+        self.template = template
+        self.prefix = template.prefix
+        self.suffix = suffix
+        self.text = self.prefix + self.suffix
+
+    @property
+    def key(self) -> str:
+        """Template identifier in the form name@vN."""
+        return self.template.key
+
+    def token_counts(self, model_id: Optional[str] = None) -> Dict[str, int]:
+        """
+        Count tokens of the prefix, suffix and full prompt.
+
+        Args:
+            model_id: Model used for tokenization (heuristic if unknown)
+
+        Returns:
+            Dictionary with prefix, suffix and total token counts
+        """
+        prefix_tokens = count_tokens(self.prefix, model_id)
+        suffix_tokens = count_tokens(self.suffix, model_id)
+        return {
+            "prefix": prefix_tokens,
+            "suffix": suffix_tokens,
+            "total": prefix_tokens + suffix_tokens,
+        }
+
+
+class PromptTemplate:
+    """A named, versioned prompt template."""
+
+    def __init__(self, name: str, version: int, prefix: str, suffix: str):
+        """
+        Initialize a prompt template.
+
+        Args:
+            name: Template name (e.g. "coding")
+            version: Template version, bumped whenever the text changes
+            prefix: Static text; must not contain any placeholders
+            suffix: Variable text with str.format placeholders
+
+        Raises:
+            ValueError: If the prefix contains placeholders
+        """
+        if _placeholders(prefix):
+            raise ValueError(f"Static prefix of {name}@v{version} must not contain placeholders")
+
+        self.name = name
+        self.version = version
+        self.prefix = prefix
+        self.suffix = suffix
+        self.variables = _placeholders(suffix)
+        self.prefix_hash = hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def key(self) -> str:
+        """Template identifier in the form name@vN."""
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **variables: str) -> RenderedPrompt:
+        """
+        Fill in the variable suffix.
+
+        Args:
+            **variables: Values for the suffix placeholders
+
+        Returns:
+            Rendered prompt
+
+        Raises:
+            KeyError: If a placeholder has no value
+        """
+        missing = self.variables - variables.keys()
+        if missing:
+            raise KeyError(f"Missing variables for {self.key}: {', '.join(sorted(missing))}")
+        return RenderedPrompt(self, self.suffix.format(**variables))
+
+
+_REGISTRY: Dict[str, Dict[int, PromptTemplate]] = {}
+
+
+def register(template: PromptTemplate) -> PromptTemplate:
+    """
+    Register a template version.
+
+    Args:
+        template: Template to register
+
+    Returns:
+        The registered template
+    """
+    versions = _REGISTRY.setdefault(template.name, {})
+    if template.version in versions:
+        raise ValueError(f"Template {template.key} is already registered")
+    versions[template.version] = template
+    return template
+
+
+def get_template(name: str, version: Optional[int] = None) -> PromptTemplate:
+    """
+    Look up a template.
+
+    Args:
+        name: Template name
+        version: Explicit version (defaults to the latest)
+
+    Returns:
+        Prompt template
+
+    Raises:
+        KeyError: If the template or version does not exist
+    """
+    versions = _REGISTRY.get(name)
+    if not versions:
+        raise KeyError(f"Unknown prompt template: {name}")
+
+    if version is None:
+        version = max(versions)
+
+    if version not in versions:
+        raise KeyError(f"Unknown version {version} for prompt template {name}")
+    return versions[version]
+
+
+def render(name: str, version: Optional[int] = None, **variables: str) -> RenderedPrompt:
+    """
+    Look up and render a template.
+
+    Args:
+        name: Template name
+        version: Explicit version (optional)
+        **variables: Values for the suffix placeholders
+
+    Returns:
+        Rendered prompt
+    """
+    return get_template(name, version).render(**variables)
+
+
+def _placeholders(text: str) -> set:
+    """Return the set of str.format field names used in text."""
+    return {field for _, field, _, _ in string.Formatter().parse(text) if field}
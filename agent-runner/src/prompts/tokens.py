@@ -0,0 +1,34 @@
+"""
+Token counting for prompts.
+"""
+from typing import Optional
+
+# Rough average for English text and code with BPE tokenizers
+CHARS_PER_TOKEN = 4
+
+
+def count_tokens(text: str, model_id: Optional[str] = None) -> int:
+    """
+    Count the tokens in a piece of text.
+
+    Uses litellm's tokenizer for the given model when it is available and
+    falls back to a character-based estimate otherwise.
+
+    Args:
+        text: Text to count
+        model_id: LiteLLM model identifier (e.g. "azure/gpt-4o-mini")
+
+    Returns:
+        Number of tokens
+    """
+    if not text:
+        return 0
+
+    if model_id:
+        try:
+            import litellm
+            return int(litellm.token_counter(model=model_id, text=text))
+        except Exception:
+            pass
+
+    return max(1, (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN)
@@ -0,0 +1,98 @@
+"""Documentation retrieval: section-aware BM25 index over the docs corpus."""
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.core import config, log
+from .bm25 import BM25Index, source_matches, tokenize, write_index
+from .ingest import ingest, is_stale
+from .sections import split_html, split_markdown, split_python
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def build_index(force: bool = False) -> Dict[str, Any]:
+    """
+    Ingest config.DOCS_DIR into config.DOCS_INDEX_PATH.
+
+    Only files changed since the last build are parsed again; the next
+    get_index() call in this process maps the new index.
+
+    Args:
+        force: Re-parse every file
+
+    Returns:
+        Ingestion statistics (see ingest())
+    """
+    global _index
+    stats = ingest(config.DOCS_DIR, config.DOCS_INDEX_PATH, chunk_tokens=config.DOCS_CHUNK_TOKENS, force=force)
+    with _index_lock:
+        _index = None
+    return stats
+
+
+def get_index() -> BM25Index:
+    """
+    Return the documentation index, loading or rebuilding it on first use.
+
+    The persisted index is reused as long as the docs it was built from are
+    unchanged; the result is cached for the life of the process.
+    """
+    global _index
+    with _index_lock:
+        if _index is not None:
+            return _index
+
+        if is_stale(config.DOCS_DIR, config.DOCS_INDEX_PATH):
+            log("Docs index: missing or out of date, updating")
+            ingest(config.DOCS_DIR, config.DOCS_INDEX_PATH, chunk_tokens=config.DOCS_CHUNK_TOKENS)
+        try:
+            _index = BM25Index(config.DOCS_INDEX_PATH)
+        except ValueError as e:
+            log(f"Docs index: cannot load {config.DOCS_INDEX_PATH} ({e}), rebuilding")
+            ingest(config.DOCS_DIR, config.DOCS_INDEX_PATH, chunk_tokens=config.DOCS_CHUNK_TOKENS, force=True)
+            _index = BM25Index(config.DOCS_INDEX_PATH)
+        return _index
+
+
+def search(
+    query: str,
+    k: Optional[int] = None,
+    token_budget: Optional[int] = None,
+    source: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Search the documentation.
+
+    Args:
+        query: Free-text query
+        k: Maximum number of sections (default config.DOCS_TOP_K)
+        token_budget: Token budget for all sections together
+            (default config.DOCS_TOKEN_BUDGET)
+        source: Only search sources matching this glob, directory or file name
+
+    Returns:
+        Hits, best first (see BM25Index.search)
+    """
+    return get_index().search(
+        query,
+        k=k or config.DOCS_TOP_K,
+        token_budget=token_budget or config.DOCS_TOKEN_BUDGET,
+        source=source,
+    )
+
+
+__all__ = [
+    "BM25Index",
+    "build_index",
+    "get_index",
+    "ingest",
+    "is_stale",
+    "search",
+    "source_matches",
+    "split_html",
+    "split_markdown",
+    "split_python",
+    "tokenize",
+    "write_index",
+]
@@ -0,0 +1,276 @@
+"""
+BM25 inverted index persisted as a single memory-mapped file.
+
+Layout (native byte order, recorded in the header):
+
+    magic            8 bytes
+    header length    uint32
+    header           JSON: parameters, vocabulary, source table, section metadata
+    padding          to a 4-byte boundary
+    doc ids          uint32[postings]
+    weights          float32[postings]
+    texts            UTF-8 section texts
+
+BM25 term weights are precomputed at build time (k1 and b are fixed), so a
+query only sums the posting weights of its terms. Postings and section
+texts stay in the mapped file; only the vocabulary is parsed on load.
+"""
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+from array import array
+from collections import Counter
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.prompts.tokens import CHARS_PER_TOKEN, count_tokens
+
+MAGIC = b"ALGBM25\x01"
+
+# Standard BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Heading terms count this many times towards a section's term frequencies
+TITLE_BOOST = 2
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i if in into is it its of on or so that the "
+    "then this to use using what when where which with you your".split()
+)
+
+
+def _stem(token: str) -> str:
+    """Strip the most common English plural endings."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized index terms.
+
+    Identifiers are split at underscores and punctuation, so "deploy_config"
+    matches a query for "deploy config".
+
+    Args:
+        text: Text to tokenize
+
+    Returns:
+        Lower-cased, lightly stemmed terms without stopwords
+    """
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def source_matches(source: str, pattern: str) -> bool:
+    """
+    Check a source name against a filter.
+
+    Args:
+        source: Source file name relative to the docs directory
+        pattern: Glob ("beaker/*.md"), directory ("pyteal") or file name
+
+    Returns:
+        True if the source is selected by the filter
+    """
+    pattern = pattern.strip("/")
+    return source == pattern or source.startswith(pattern + "/") or fnmatchcase(source, pattern)
+
+
+def write_index(sections: List[Dict[str, str]], path: Path) -> Path:
+    """
+    Build a BM25 index over sections and write it to disk.
+
+    The file is written next to its destination and renamed into place, so
+    readers that already mapped the previous index are not affected.
+
+    Args:
+        sections: Dicts with "source", "title" and "text" keys
+        path: Output file
+
+    Returns:
+        The written path
+    """
+    term_freqs = []
+    for section in sections:
+        terms = Counter(tokenize(section["text"]))
+        for term in tokenize(section["title"]):
+            terms[term] += TITLE_BOOST
+        term_freqs.append(terms)
+
+    num_docs = len(sections)
+    lengths = [sum(tf.values()) for tf in term_freqs]
+    avgdl = (sum(lengths) / num_docs) if num_docs else 0.0
+
+    postings: Dict[str, List[int]] = {}
+    for doc_id, terms in enumerate(term_freqs):
+        for term in terms:
+            postings.setdefault(term, []).append(doc_id)
+
+    doc_ids = array("I")
+    weights = array("f")
+    vocabulary = {}
+    for term in sorted(postings):
+        docs = postings[term]
+        idf = math.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+        vocabulary[term] = [len(doc_ids), len(docs)]
+        for doc_id in docs:
+            tf = term_freqs[doc_id][term]
+            norm = K1 * (1 - B + B * lengths[doc_id] / avgdl)
+            doc_ids.append(doc_id)
+            weights.append(idf * tf * (K1 + 1) / (tf + norm))
+
+    texts = bytearray()
+    sources: Dict[str, int] = {}
+    section_meta = []
+    for section in sections:
+        encoded = section["text"].encode("utf-8")
+        section_meta.append([
+            sources.setdefault(section["source"], len(sources)),
+            section["title"],
+            len(texts),
+            len(encoded),
+            count_tokens(section["text"]),
+        ])
+        texts += encoded
+
+    header = json.dumps({
+        "byteorder": sys.byteorder,
+        "k1": K1,
+        "b": B,
+        "num_docs": num_docs,
+        "avgdl": avgdl,
+        "postings": len(doc_ids),
+        "sources": list(sources),
+        "terms": vocabulary,
+        "sections": section_meta,
+    }, separators=(",", ":")).encode("utf-8")
+    prefix = MAGIC + struct.pack("<I", len(header)) + header
+    prefix += b"\0" * (-len(prefix) % 4)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(prefix)
+        f.write(doc_ids.tobytes())
+        f.write(weights.tobytes())
+        f.write(texts)
+    os.replace(tmp, path)
+    return path
+
+
+class BM25Index:
+    """Read-only view over an index file written by write_index()."""
+
+    def __init__(self, path: Path):
+        """
+        Map an index file.
+
+        Args:
+            path: Index file
+
+        Raises:
+            ValueError: If the file is not a compatible index
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a documentation index")
+        (header_len,) = struct.unpack_from("<I", self._mm, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mm[start:start + header_len])
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(f"{path} was built on a {header['byteorder']}-endian machine")
+
+        self.num_docs: int = header["num_docs"]
+        self.sources: List[str] = header["sources"]
+        self._terms: Dict[str, List[int]] = header["terms"]
+        self._sections: List[List[Any]] = header["sections"]
+
+        data = start + header_len
+        data += -data % 4
+        count = header["postings"]
+        self._view = memoryview(self._mm)
+        self._doc_ids = self._view[data:data + 4 * count].cast("I")
+        self._weights = self._view[data + 4 * count:data + 8 * count].cast("f")
+        self._texts = data + 8 * count
+        self._filters: Dict[str, frozenset] = {}
+
+    def _allowed(self, pattern: str) -> frozenset:
+        """Section ids whose source matches a filter (cached per filter)."""
+        allowed = self._filters.get(pattern)
+        if allowed is None:
+            selected = {i for i, name in enumerate(self.sources) if source_matches(name, pattern)}
+            allowed = frozenset(doc_id for doc_id, meta in enumerate(self._sections) if meta[0] in selected)
+            self._filters[pattern] = allowed
+        return allowed
+
+    def search(
+        self,
+        query: str,
+        k: int = 3,
+        token_budget: Optional[int] = None,
+        source: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank sections against a query.
+
+        Args:
+            query: Free-text query
+            k: Maximum number of sections to return
+            token_budget: Stop adding sections once their combined size would
+                exceed this many tokens (the best hit is always returned,
+                truncated to the budget if needed)
+            source: Only search sources matching this filter (see source_matches)
+
+        Returns:
+            Hits, best first, as dicts with "source", "title", "text",
+            "score" and "tokens" keys
+        """
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query)):
+            entry = self._terms.get(term)
+            if entry is None:
+                continue
+            start, count = entry
+            for doc_id, weight in zip(self._doc_ids[start:start + count], self._weights[start:start + count]):
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        candidates = scores.items()
+        if source:
+            allowed = self._allowed(source)
+            candidates = [item for item in candidates if item[0] in allowed]
+
+        hits = []
+        used = 0
+        for doc_id, score in heapq.nlargest(k, candidates, key=lambda item: item[1]):
+            source_id, title, offset, length, tokens = self._sections[doc_id]
+            text = self._mm[self._texts + offset:self._texts + offset + length].decode("utf-8")
+            if token_budget is not None and used + tokens > token_budget:
+                if hits:
+                    break
+                text = text[:token_budget * CHARS_PER_TOKEN]
+                tokens = count_tokens(text)
+            hits.append({"source": self.sources[source_id], "title": title, "text": text, "score": score, "tokens": tokens})
+            used += tokens
+        return hits
+
+    def close(self) -> None:
+        """Release the mapping."""
+        self._doc_ids.release()
+        self._weights.release()
+        self._view.release()
+        self._mm.close()
@@ -0,0 +1,269 @@
+"""
+Documentation ingestion: sources -> chunks -> BM25 index.
+
+A docs directory may hold markdown, HTML and Python files (for their
+docstrings). Each file is split into sections, long sections are chunked
+to a token limit, and chunks repeated across the corpus are indexed once.
+
+Rebuilds are incremental: a manifest next to the index keeps every file's
+content hash and chunks, and only files whose hash changed are parsed
+again. A file's hash is only recomputed when its size or mtime changed.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from src.core import log
+from src.prompts.tokens import count_tokens
+from .bm25 import write_index
+from .sections import split_html, split_markdown, split_python
+
+MANIFEST_VERSION = 1
+
+SPLITTERS: Dict[str, Callable[[str, str], List[Dict[str, str]]]] = {
+    ".md": split_markdown,
+    ".markdown": split_markdown,
+    ".html": split_html,
+    ".htm": split_html,
+    ".py": split_python,
+}
+
+# Directories never indexed
+_SKIPPED_DIRS = {".git", ".index", "__pycache__", "node_modules", ".venv", "venv"}
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def manifest_path(index_path: Path) -> Path:
+    """Return the manifest file belonging to an index."""
+    return index_path.with_name(index_path.name + ".manifest.json")
+
+
+def discover(docs_dir: Path) -> Dict[str, os.stat_result]:
+    """
+    List the supported source files of a docs directory.
+
+    Args:
+        docs_dir: Root of the corpus
+
+    Returns:
+        Stat results keyed by POSIX path relative to docs_dir, sorted
+    """
+    found = {}
+    for root, dirs, files in os.walk(docs_dir):
+        dirs[:] = sorted(d for d in dirs if d not in _SKIPPED_DIRS and not d.startswith("."))
+        for name in files:
+            if os.path.splitext(name)[1].lower() in SPLITTERS:
+                path = Path(root) / name
+                found[path.relative_to(docs_dir).as_posix()] = path.stat()
+    return dict(sorted(found.items()))
+
+
+def _blocks(text: str) -> List[str]:
+    """Split text at blank lines, keeping fenced code blocks whole."""
+    blocks, current, in_fence = [], [], False
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        if not line.strip() and not in_fence:
+            if current:
+                blocks.append("\n".join(current))
+                current = []
+        else:
+            current.append(line)
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def chunk_section(section: Dict[str, str], max_tokens: int) -> List[Dict[str, str]]:
+    """
+    Split a section into chunks of at most max_tokens.
+
+    Paragraphs and code blocks are packed greedily; a single block over the
+    limit is split by lines.
+
+    Args:
+        section: Section dict
+        max_tokens: Chunk size limit
+
+    Returns:
+        One or more section dicts; parts after the first get "(part N)"
+        appended to the title
+    """
+    if count_tokens(section["text"]) <= max_tokens:
+        return [section]
+
+    pieces: List[str] = []
+    for block in _blocks(section["text"]):
+        if count_tokens(block) <= max_tokens:
+            pieces.append(block)
+            continue
+        lines: List[str] = []
+        for line in block.splitlines():
+            if lines and count_tokens("\n".join(lines + [line])) > max_tokens:
+                pieces.append("\n".join(lines))
+                lines = []
+            lines.append(line)
+        if lines:
+            pieces.append("\n".join(lines))
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for piece in pieces:
+        tokens = count_tokens(piece)
+        if current and size + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += tokens
+    if current:
+        chunks.append("\n\n".join(current))
+
+    return [
+        {
+            "source": section["source"],
+            "title": section["title"] if i == 0 else f"{section['title']} (part {i + 1})",
+            "text": text,
+        }
+        for i, text in enumerate(chunks)
+    ]
+
+
+def _content_key(text: str) -> bytes:
+    """Hash of a chunk's text, insensitive to case and whitespace."""
+    return hashlib.blake2b(" ".join(text.lower().split()).encode("utf-8"), digest_size=16).digest()
+
+
+def _hash_file(path: Path) -> str:
+    return hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+
+
+def _load_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        manifest = json.loads(path.read_text())
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "chunk_tokens": None, "files": {}}
+
+
+def is_stale(docs_dir: Path, index_path: Path) -> bool:
+    """
+    Check whether the index is missing or older than its sources.
+
+    Only file names, sizes and mtimes are compared, so the check is cheap
+    enough to run on every process start.
+
+    Args:
+        docs_dir: Root of the corpus
+        index_path: Index file
+
+    Returns:
+        True if ingest() would change the index
+    """
+    if not index_path.exists():
+        return True
+    files = _load_manifest(manifest_path(index_path))["files"]
+    current = discover(docs_dir)
+    if current.keys() != files.keys():
+        return True
+    return any(
+        files[name]["size"] != st.st_size or files[name]["mtime_ns"] != st.st_mtime_ns
+        for name, st in current.items()
+    )
+
+
+def ingest(docs_dir: Path, index_path: Path, chunk_tokens: int = 400, force: bool = False) -> Dict[str, Any]:
+    """
+    Build or incrementally update the documentation index.
+
+    Args:
+        docs_dir: Root of the corpus
+        index_path: Index file to write
+        chunk_tokens: Maximum chunk size in tokens
+        force: Re-parse every file even if its hash is unchanged
+
+    Returns:
+        Ingestion statistics
+    """
+    start = time.perf_counter()
+    mpath = manifest_path(index_path)
+    manifest = _load_manifest(mpath)
+    if force or manifest["chunk_tokens"] != chunk_tokens:
+        manifest["files"] = {}
+    previous = manifest["files"]
+
+    files: Dict[str, Dict[str, Any]] = {}
+    parsed = failed = 0
+    for name, st in discover(docs_dir).items():
+        entry: Optional[Dict[str, Any]] = previous.get(name)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            files[name] = entry
+            continue
+
+        path = docs_dir / name
+        digest = _hash_file(path)
+        if entry and entry["hash"] == digest:
+            files[name] = dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns)
+            continue
+
+        splitter = SPLITTERS[os.path.splitext(name)[1].lower()]
+        try:
+            sections = splitter(path.read_text(encoding="utf-8", errors="replace"), name)
+        except (SyntaxError, ValueError) as e:
+            log(f"Docs ingest: skipping {name}: {e}")
+            sections = []
+            failed += 1
+        chunks = [c for s in sections for c in chunk_section(s, chunk_tokens)]
+        files[name] = {
+            "hash": digest,
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "chunks": [[c["title"], c["text"]] for c in chunks],
+        }
+        parsed += 1
+
+    changed = parsed > 0 or files.keys() != previous.keys() or not index_path.exists()
+
+    seen = set()
+    sections = []
+    duplicates = 0
+    for name, entry in files.items():
+        for title, text in entry["chunks"]:
+            key = _content_key(text)
+            if key in seen:
+                duplicates += 1
+                continue
+            seen.add(key)
+            sections.append({"source": name, "title": title, "text": text})
+
+    if changed:
+        write_index(sections, index_path)
+
+    manifest = {"version": MANIFEST_VERSION, "chunk_tokens": chunk_tokens, "files": files}
+    tmp = mpath.with_name(f".{mpath.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, separators=(",", ":")))
+    os.replace(tmp, mpath)
+
+    stats = {
+        "files": len(files),
+        "parsed": parsed,
+        "reused": len(files) - parsed,
+        "failed": failed,
+        "chunks": len(sections),
+        "duplicates": duplicates,
+        "rebuilt": changed,
+        "seconds": round(time.perf_counter() - start, 3),
+    }
+    log(
+        f"Docs ingest: {stats['files']} files ({parsed} parsed, {stats['reused']} unchanged), "
+        f"{len(sections)} chunks, {duplicates} duplicates dropped, {stats['seconds']}s"
+    )
+    return stats
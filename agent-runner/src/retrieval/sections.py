@@ -0,0 +1,206 @@
+"""
+Section splitting for documentation sources.
+
+Every splitter returns sections as dicts with "source", "title" and "text"
+keys, where the title is the path of headings (or the qualified name, for
+Python) above the text.
+"""
+import ast
+import re
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FENCE = re.compile(r"^\s*(```|~~~)")
+
+
+def split_markdown(text: str, source: str) -> List[Dict[str, str]]:
+    """
+    Split a markdown document into sections at its headings.
+
+    Each section keeps the path of headings above it as its title, so a
+    hit on "LocalNet" under "Deployment" reads "Deployment > LocalNet".
+    Lines inside fenced code blocks are never treated as headings.
+
+    Args:
+        text: Markdown source
+        source: Name of the document (stored with every section)
+
+    Returns:
+        Sections as dicts with "source", "title" and "text" keys
+    """
+    sections = []
+    path: List[str] = []
+    lines: List[str] = []
+    in_fence = False
+
+    def flush() -> None:
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append({"source": source, "title": " > ".join(path) or source, "text": body})
+
+    for line in text.splitlines():
+        if _FENCE.match(line):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            path = path[:level - 1] + [match.group(2)]
+            lines = [line]
+        else:
+            lines.append(line)
+    flush()
+
+    # A heading directly followed by a sub-heading yields a heading-only
+    # section; it carries no content of its own
+    return [s for s in sections if "\n" in s["text"] or not _HEADING.match(s["text"])]
+
+
+class _HTMLSectionParser(HTMLParser):
+    """Collects the text of an HTML page, split at its h1-h6 headings."""
+
+    HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+    BLOCKS = {"p", "div", "li", "tr", "br", "pre", "blockquote", "section", "article", "table", "dd", "dt"}
+    SKIPPED = {"script", "style", "nav", "header", "footer", "noscript", "svg"}
+
+    def __init__(self, source: str):
+        super().__init__(convert_charrefs=True)
+        self.source = source
+        self.sections: List[Dict[str, str]] = []
+        self.page_title = ""
+        self._path: List[str] = []
+        self._parts: List[str] = []
+        self._heading: Optional[List[str]] = None
+        self._heading_level = 0
+        self._skip_depth = 0
+        self._pre_depth = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIPPED:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag in self.HEADINGS:
+            self._flush()
+            self._heading = []
+            self._heading_level = self.HEADINGS[tag]
+        elif tag == "pre":
+            self._pre_depth += 1
+            self._parts.append("\n```\n")
+        elif tag in self.BLOCKS:
+            self._parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIPPED:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag in self.HEADINGS and self._heading is not None:
+            title = " ".join("".join(self._heading).split())
+            self._path = self._path[:self._heading_level - 1] + [title]
+            self._parts = [f"{'#' * self._heading_level} {title}\n"]
+            self._heading = None
+        elif tag == "pre":
+            self._pre_depth = max(0, self._pre_depth - 1)
+            self._parts.append("\n```\n")
+        elif tag in self.BLOCKS:
+            self._parts.append("\n")
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.page_title += data
+        elif self._heading is not None:
+            self._heading.append(data)
+        elif self._pre_depth:
+            self._parts.append(data)
+        else:
+            # Collapse whitespace but keep the word break at either end
+            text = " ".join(data.split())
+            lead = " " if data[:1].isspace() else ""
+            trail = " " if data[-1:].isspace() and text else ""
+            self._parts.append(lead + text + trail)
+
+    def close(self):
+        super().close()
+        self._flush()
+
+    def _flush(self) -> None:
+        text = re.sub(r"\n{3,}", "\n\n", "".join(self._parts)).strip()
+        if text and not _HEADING.fullmatch(text):
+            title = " > ".join(self._path) or self.page_title.strip() or self.source
+            self.sections.append({"source": self.source, "title": title, "text": text})
+        self._parts = []
+
+
+def split_html(text: str, source: str) -> List[Dict[str, str]]:
+    """
+    Split an HTML page into sections at its headings.
+
+    Scripts, styles and page chrome (nav, header, footer) are dropped and
+    <pre> blocks are kept verbatim as fenced code.
+
+    Args:
+        text: HTML source
+        source: Name of the page
+
+    Returns:
+        Sections as dicts with "source", "title" and "text" keys
+    """
+    parser = _HTMLSectionParser(source)
+    parser.feed(text)
+    parser.close()
+    return parser.sections
+
+
+def split_python(text: str, source: str) -> List[Dict[str, str]]:
+    """
+    Extract the docstrings of a Python module.
+
+    The module docstring and the docstrings of public classes, functions
+    and methods become one section each, titled by qualified name and
+    prefixed with the signature.
+
+    Args:
+        text: Python source
+        source: Name of the file (e.g. "beaker/application.py")
+
+    Returns:
+        Sections as dicts with "source", "title" and "text" keys
+
+    Raises:
+        SyntaxError: If the module cannot be parsed
+    """
+    module = source[:-3] if source.endswith(".py") else source
+    module = module.replace("/", ".").removesuffix(".__init__")
+    tree = ast.parse(text)
+    sections = []
+
+    doc = ast.get_docstring(tree)
+    if doc:
+        sections.append({"source": source, "title": module, "text": doc})
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                continue
+            if child.name.startswith("_") and child.name != "__init__":
+                continue
+            name = f"{prefix}.{child.name}"
+            doc = ast.get_docstring(child)
+            if isinstance(child, ast.ClassDef):
+                bases = ", ".join(ast.unparse(b) for b in child.bases)
+                signature = f"class {child.name}({bases})" if bases else f"class {child.name}"
+                visit(child, name)
+            else:
+                signature = f"def {child.name}({ast.unparse(child.args)})"
+                if child.returns is not None:
+                    signature += f" -> {ast.unparse(child.returns)}"
+            if doc:
+                sections.append({"source": source, "title": name, "text": f"{signature}\n\n{doc}"})
+
+    visit(tree, module)
+    return sections
@@ -1,6 +1,7 @@
 """Agent runner module."""
 from .engine import AgentRunner
+from .batch import BatchRunner, read_prompts
 
 runner = AgentRunner()
 
-__all__ = ["runner", "AgentRunner"]
+__all__ = ["runner", "AgentRunner", "BatchRunner", "read_prompts"]
@@ -0,0 +1,142 @@
+"""
+Batch mode: run many prompts from a JSONL file in one process.
+
+The runner module, the LLM client, the LocalNet check and the installed
+contract dependencies are shared by all prompts, so the startup cost is
+paid once per batch instead of once per prompt.
+"""
+import contextvars
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, TextIO
+
+from src.core import log
+from .engine import AgentRunner
+
+
+def read_prompts(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read prompts from a JSONL file.
+
+    Each line is either a JSON object with a "prompt" field (and an
+    optional "id") or a bare JSON string. Blank lines are skipped.
+
+    Args:
+        path: JSONL file
+
+    Returns:
+        List of {"id", "prompt"} dictionaries
+
+    Raises:
+        ValueError: If a line is not valid JSON or has no prompt
+    """
+    items = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON: {e}") from e
+
+            if isinstance(entry, str):
+                entry = {"prompt": entry}
+            prompt = str(entry.get("prompt", "")).strip() if isinstance(entry, dict) else ""
+            if not prompt:
+                raise ValueError(f"{path}:{line_no}: missing prompt")
+            items.append({"id": entry.get("id", line_no), "prompt": prompt})
+    return items
+
+
+class BatchRunner:
+    """Runs a list of prompts with bounded concurrency."""
+
+    def __init__(self, runner: AgentRunner, concurrency: int = 1, output: Optional[TextIO] = None):
+        """
+        Initialize the batch runner.
+
+        Args:
+            runner: Agent runner (its loaded module is reused for every prompt)
+            concurrency: Number of prompts processed at the same time
+            output: Stream for JSONL results (printed as RESULT lines if omitted)
+        """
+        self.runner = runner
+        self.concurrency = max(1, concurrency)
+        self.output = output
+        self._write_lock = threading.Lock()
+
+    def run(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Process all prompts and stream one result line per prompt.
+
+        Args:
+            items: Prompts as returned by read_prompts()
+
+        Returns:
+            Batch summary with counts, elapsed time and throughput
+        """
+        start = time.perf_counter()
+        log(f"Batch: {len(items)} prompts, concurrency {self.concurrency}")
+
+        # Shared by every prompt in the batch
+        model = self.runner.create_model()
+        batch_id = uuid.uuid4().hex[:12]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._run_one, item, f"{index}-{batch_id}", model)
+                for index, item in enumerate(items)
+            ]
+            records = [future.result() for future in futures]
+
+        elapsed = time.perf_counter() - start
+        succeeded = sum(1 for r in records if r["ok"])
+        summary = {
+            "prompts": len(records),
+            "succeeded": succeeded,
+            "failed": len(records) - succeeded,
+            "elapsed_s": round(elapsed, 3),
+            "throughput_per_min": round(len(records) / elapsed * 60, 3) if elapsed else 0.0,
+        }
+        log(
+            f"Batch finished: {summary['prompts']} prompts ({succeeded} ok, {summary['failed']} failed) "
+            f"in {elapsed:.1f}s, throughput {summary['throughput_per_min']:.2f} prompts/min"
+        )
+        return summary
+
+    def _run_one(self, item: Dict[str, Any], task_id: str, model: Any) -> Dict[str, Any]:
+        """
+        Run a single prompt and emit its result line.
+
+        The item's own id is only echoed in the result; the task runs under
+        task_id (item index plus batch id), which is unique across batches
+        and safe as a checkpoint and artifact name.
+        """
+        start = time.perf_counter()
+        record: Dict[str, Any] = {"id": item["id"], "task_id": task_id, "prompt": item["prompt"]}
+        try:
+            record["result"] = self.runner.run(item["prompt"], model=model, task_id=task_id)
+            record["ok"] = True
+        except Exception as e:
+            log(f"Batch item {item['id']} failed: {e}")
+            record["error"] = str(e)
+            record["ok"] = False
+        record["elapsed_s"] = round(time.perf_counter() - start, 3)
+        self._emit(record)
+        return record
+
+    def _emit(self, record: Dict[str, Any]) -> None:
+        """Write one result line as soon as the prompt finishes."""
+        line = json.dumps(record)
+        with self._write_lock:
+            if self.output is not None:
+                self.output.write(line + "\n")
+                self.output.flush()
+            else:
+                print("RESULT: " + line, flush=True)
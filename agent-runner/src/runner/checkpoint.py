@@ -0,0 +1,106 @@
+"""
+Per-task checkpoints of the pipeline phases.
+
+After each phase the runner records what the phase produced (project
+location, plan, contract hash, test outcome, artifacts, deployment) in
+config.WORKSPACE_DIR/.checkpoints/<task_id>.json. A retry of a failed
+task restores these outputs and continues with the first phase that did
+not complete, so a deployment that failed because LocalNet was down does
+not plan, code and test the contract again.
+
+The file is replaced atomically (temporary file and rename), so a task
+killed mid-write leaves the previous checkpoint intact. The workspace GC
+removes checkpoints together with expired task projects.
+"""
+import hashlib
+import json
+import os
+import re
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core import config
+
+# Directory in the workspace holding the checkpoint files
+CHECKPOINT_DIR = ".checkpoints"
+
+# Pipeline phases in order
+PHASES = ("setup", "plan", "code", "test", "artifacts", "deploy")
+
+_SAFE_NAME = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def file_sha256(path: Path) -> Optional[str]:
+    """Return the SHA-256 of a file, or None if it does not exist."""
+    try:
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+
+class Checkpoint:
+    """Completed phases of one task and their outputs."""
+
+    def __init__(self, task_id: str, root: Optional[Path] = None):
+        """
+        Open the checkpoint of a task (empty until loaded or recorded).
+
+        Args:
+            task_id: Task identifier; IDs that are not safe file names are hashed
+            root: Workspace holding the checkpoint directory (defaults to config.WORKSPACE_DIR)
+        """
+        self.task_id = task_id
+        name = task_id if _SAFE_NAME.match(task_id) else hashlib.sha256(task_id.encode("utf-8")).hexdigest()[:32]
+        self.path = (root or config.WORKSPACE_DIR) / CHECKPOINT_DIR / f"{name}.json"
+        self.phases: Dict[str, Dict[str, Any]] = {}
+
+    def load(self) -> bool:
+        """
+        Read the saved checkpoint.
+
+        Returns:
+            True if a checkpoint was found
+        """
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return False
+        self.phases = {name: outputs for name, outputs in data.get("phases", {}).items() if name in PHASES}
+        return True
+
+    def done(self, name: str) -> bool:
+        return name in self.phases
+
+    def get(self, name: str) -> Dict[str, Any]:
+        """Return the outputs recorded for a completed phase (empty if not completed)."""
+        return self.phases.get(name, {})
+
+    def completed(self) -> List[str]:
+        """Return the completed phases in pipeline order."""
+        return [name for name in PHASES if name in self.phases]
+
+    def record(self, name: str, **outputs: Any) -> None:
+        """
+        Mark a phase as completed and save the checkpoint.
+
+        Args:
+            name: Phase from PHASES
+            **outputs: JSON-serializable outputs of the phase
+        """
+        self.phases[name] = {**outputs, "completed_at": time.time()}
+        self.save()
+
+    def invalidate(self, name: str) -> None:
+        """Forget a phase and every phase after it, so they run again."""
+        for later in PHASES[PHASES.index(name):]:
+            self.phases.pop(later, None)
+        self.save()
+
+    def save(self) -> None:
+        """Write the checkpoint atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}")
+        tmp.write_text(json.dumps({"task_id": self.task_id, "phases": self.phases}, indent=2))
+        os.replace(tmp, self.path)
@@ -0,0 +1,226 @@
+"""
+Daemon mode: a long-lived runner serving tasks over local HTTP.
+
+The runner module, the LLM client and the per-process setup (AlgoKit
+check, LocalNet start, installed dependencies) are loaded once and reused
+by every task. Each task streams its events back as newline-delimited
+JSON while it runs.
+
+    POST /tasks   {"prompt": "..."}  -> NDJSON stream of events
+    GET  /health                     -> daemon status
+
+Events: accepted, started, log, result, error.
+"""
+import contextvars
+import json
+import os
+import queue
+import socketserver
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from src.core import capture_logs, log
+from .engine import AgentRunner
+
+# Largest accepted request body
+MAX_BODY_BYTES = 64 * 1024
+
+
+class RunnerDaemon:
+    """Keeps a warm runner and executes tasks with a concurrency limit."""
+
+    def __init__(self, runner: AgentRunner, max_concurrency: int = 2):
+        """
+        Initialize the daemon.
+
+        Args:
+            runner: Agent runner whose loaded module is reused
+            max_concurrency: Tasks executed at the same time; others wait
+        """
+        self.runner = runner
+        self.max_concurrency = max(1, max_concurrency)
+        self.model: Any = None
+        self.active = 0
+        self.completed = 0
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._lock = threading.Lock()
+
+    def warm_up(self) -> None:
+        """Load runner.py and create the shared LLM client."""
+        log("Daemon: loading runner module and model client...")
+        self.runner.load_module()
+        self.model = self.runner.create_model()
+        log("Daemon: warm")
+
+    def submit(self, prompt: str, events: "queue.Queue[Optional[Dict[str, Any]]]") -> str:
+        """
+        Start a task in the background.
+
+        Events are put on the queue as they happen; None marks the end.
+
+        Args:
+            prompt: User's prompt
+            events: Queue receiving the task's events
+
+        Returns:
+            Task identifier
+        """
+        task_id = uuid.uuid4().hex
+        events.put({"event": "accepted", "task_id": task_id})
+        thread = threading.Thread(
+            target=contextvars.Context().run,
+            args=(self._execute, task_id, prompt, events),
+            name=f"task-{task_id[:8]}",
+            daemon=True,
+        )
+        thread.start()
+        return task_id
+
+    def _execute(self, task_id: str, prompt: str, events: "queue.Queue[Optional[Dict[str, Any]]]") -> None:
+        """Run one task once a concurrency slot is free."""
+        with self._slots:
+            with self._lock:
+                self.active += 1
+            events.put({"event": "started", "task_id": task_id})
+            try:
+                with capture_logs(lambda line: events.put({"event": "log", "line": line})):
+                    result = self.runner.run(prompt, model=self.model, task_id=task_id)
+                events.put({"event": "result", "task_id": task_id, "result": result})
+            except Exception as e:
+                events.put({"event": "error", "task_id": task_id, "error": str(e)})
+            finally:
+                with self._lock:
+                    self.active -= 1
+                    self.completed += 1
+                events.put(None)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the daemon's current load."""
+        with self._lock:
+            return {
+                "status": "ok",
+                "warm": self.model is not None,
+                "active": self.active,
+                "completed": self.completed,
+                "max_concurrency": self.max_concurrency,
+            }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """HTTP handler; the daemon instance is attached to the server."""
+
+    server_version = "AgentRunnerDaemon/1.0"
+
+    @property
+    def daemon(self) -> RunnerDaemon:
+        return self.server.runner_daemon
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.daemon.status())
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/tasks":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        if length <= 0 or length > MAX_BODY_BYTES:
+            self._send_json(400, {"error": "request body missing or too large"})
+            return
+        try:
+            body = json.loads(self.rfile.read(length))
+            prompt = str(body.get("prompt", "")).strip()
+        except (ValueError, AttributeError):
+            self._send_json(400, {"error": "invalid JSON body"})
+            return
+        if not prompt:
+            self._send_json(400, {"error": "prompt cannot be empty"})
+            return
+
+        events: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue()
+        self.daemon.submit(prompt, events)
+
+        # Close-delimited stream of NDJSON events (HTTP/1.0 semantics)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        client_connected = True
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            if not client_connected:
+                continue  # keep draining; the task runs to completion regardless
+            try:
+                self.wfile.write((json.dumps(event) + "\n").encode("utf-8"))
+                self.wfile.flush()
+            except OSError:
+                client_connected = False
+
+    def _send_json(self, code: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self) -> str:
+        # Unix sockets have no (host, port) client address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else "unix"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Route access logs through the runner's logger
+        log(f"Daemon: {self.address_string()} {format % args}")
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Threading HTTP server listening on a Unix domain socket."""
+
+    daemon_threads = True
+
+
+def serve(
+    runner: AgentRunner,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    socket_path: Optional[str] = None,
+    max_concurrency: int = 2,
+) -> None:
+    """
+    Warm up and serve tasks until interrupted.
+
+    Args:
+        runner: Agent runner to keep loaded
+        host: Interface for local HTTP (ignored with socket_path)
+        port: Port for local HTTP (ignored with socket_path)
+        socket_path: Serve on this Unix socket instead of TCP
+        max_concurrency: Tasks executed at the same time
+    """
+    runner_daemon = RunnerDaemon(runner, max_concurrency)
+    runner_daemon.warm_up()
+
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = _UnixHTTPServer(socket_path, _Handler)
+        where = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), _Handler)
+        where = f"http://{host}:{port}"
+
+    server.runner_daemon = runner_daemon
+    log(f"Daemon: serving on {where} (max concurrency {runner_daemon.max_concurrency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        log("Daemon: shutting down")
+    finally:
+        server.server_close()
+        if socket_path and os.path.exists(socket_path):
+            os.unlink(socket_path)
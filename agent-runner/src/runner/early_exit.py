@@ -0,0 +1,107 @@
+"""
+Early exit of agent phases.
+
+A CodeAgent keeps going until it decides to answer, often spending steps
+on re-checks and summaries after its work is already done. EarlyExit is a
+step callback that checks the phase's success criterion (the contract
+compiles, the tests pass) after every step that changed the watched files
+and interrupts the agent as soon as it holds.
+
+Interrupted agents cannot report what they would still have done, so the
+savings of a stopped phase are a lower bound: at least the one step the
+agent needed to answer, as large as its last step. In shadow mode the
+agent is not stopped and the steps and tokens it spends after the
+criterion first held are measured instead.
+"""
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core import log
+
+
+class EarlyExit:
+    """Step callback ending an agent's phase once its success criterion holds."""
+
+    def __init__(self, reason: str, criterion: Callable[[], Tuple[bool, str]], watch: List[Path], stop: bool = True):
+        """
+        Initialize the controller.
+
+        Args:
+            reason: What the criterion establishes, e.g. "contract compiles"
+            criterion: Returns (met, output); checked only after steps that changed the watched files
+            watch: Files the criterion depends on; all must exist before it is checked
+            stop: Interrupt the agent when the criterion holds (False measures only)
+        """
+        self.reason = reason
+        self.criterion = criterion
+        self.watch = watch
+        self.stop = stop
+        self.met_at_step: Optional[int] = None
+        self.output = ""
+        self.stopped = False
+        self.checks = 0
+        self._checked_state: Optional[Tuple[int, ...]] = None
+        self._last_step_tokens = 0
+        self._steps_after = 0
+        self._tokens_after = 0
+
+    def __call__(self, step: Any, agent: Any = None) -> None:
+        usage = getattr(step, "token_usage", None)
+        tokens = usage.input_tokens + usage.output_tokens if usage is not None else 0
+        if self.met_at_step is not None:
+            # Shadow mode: what the agent does from here on would have been saved
+            self._steps_after += 1
+            self._tokens_after += tokens
+            return
+        self._last_step_tokens = tokens
+        if getattr(step, "is_final_answer", False):
+            return
+
+        try:
+            state = tuple(path.stat().st_mtime_ns for path in self.watch)
+        except OSError:
+            return
+        if state == self._checked_state:
+            return
+        self._checked_state = state
+
+        self.checks += 1
+        met, self.output = self.criterion()
+        if not met:
+            return
+        self.met_at_step = getattr(step, "step_number", None)
+        if self.stop and agent is not None:
+            log(f"Early exit: {self.reason} after step {self.met_at_step}, stopping the agent")
+            self.stopped = True
+            agent.interrupt()
+        else:
+            log(f"Early exit (shadow): {self.reason} after step {self.met_at_step}")
+
+    def report(self, steps_used: int, max_steps: int) -> Dict[str, Any]:
+        """
+        Summarize the phase.
+
+        Args:
+            steps_used: Steps the agent took
+            max_steps: Step limit the agent ran with
+
+        Returns:
+            Report with the steps and tokens saved; "exact" is False when
+            they are a lower bound (the agent was stopped)
+        """
+        if self.stopped:
+            steps_saved, tokens_saved = 1, self._last_step_tokens
+        else:
+            steps_saved, tokens_saved = self._steps_after, self._tokens_after
+        return {
+            "mode": "on" if self.stop else "shadow",
+            "reason": self.reason,
+            "criterion_met_at_step": self.met_at_step,
+            "stopped": self.stopped,
+            "checks": self.checks,
+            "steps_used": steps_used,
+            "max_steps": max_steps,
+            "steps_saved": steps_saved,
+            "tokens_saved": tokens_saved,
+            "exact": not self.stopped,
+        }
@@ -3,38 +3,88 @@ Agent runner engine - wraps the main AlgorandAgentSystem.
 """
 import sys
 import importlib.util
+import threading
 from pathlib import Path
+from types import ModuleType
+from typing import Any, Optional
 
 
 class AgentRunner:
     """Wrapper for the Algorand Agent System."""
 
-    def run(self, prompt: str) -> dict:
+    def __init__(self):
+        """Initialize the runner; runner.py is loaded on first use."""
+        self._module: Optional[ModuleType] = None
+        self._lock = threading.Lock()
+
+    def load_module(self) -> ModuleType:
+        """
+        Load runner.py once and reuse it for every task.
+
+        Returns:
+            The loaded runner module
+        """
+        with self._lock:
+            if self._module is not None:
+                return self._module
+
+            # Import runner.py directly to avoid naming conflicts
+            # In Docker: runner.py is at /app/runner.py
+            runner_file = Path("/app/runner.py")
+
+            # If running locally, adjust path
+            if not runner_file.exists():
+                runner_file = Path(__file__).parent.parent.parent / "runner.py"
+
+            # Load the module directly from file
+            spec = importlib.util.spec_from_file_location("algorand_runner", runner_file)
+            if spec is None or spec.loader is None:
+                raise ImportError(f"Could not load runner from {runner_file}")
+
+            algorand_runner = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(algorand_runner)
+            self._module = algorand_runner
+            return algorand_runner
+
+    def create_model(self) -> Any:
+        """
+        Create an LLM client that can be shared between tasks.
+
+        Returns:
+            Model instance for AlgorandAgentSystem
+        """
+        module = self.load_module()
+        return module.create_model()
+
+    def run(
+        self,
+        prompt: str,
+        model: Optional[Any] = None,
+        task_id: Optional[str] = None,
+        resume: bool = False,
+        revise_of: Optional[str] = None,
+    ) -> dict:
         """
         Execute the agent workflow.
 
+        Tasks are isolated from each other (own project directory, no
+        process-wide working directory), so run() may be called from several
+        threads at once.
+
         Args:
             prompt: User's natural language prompt
+            model: Shared LLM client (a new one is created if omitted)
+            task_id: Task identifier, labelling its log lines and naming its checkpoint (generated if omitted)
+            resume: Skip the phases a failed earlier run of task_id completed
+            revise_of: Treat the prompt as a change to the contract of this earlier task
 
         Returns:
             Result dictionary with app_id, message, etc.
         """
-        # Import runner.py directly to avoid naming conflicts
-        # In Docker: runner.py is at /app/runner.py
-        runner_file = Path("/app/runner.py")
-
-        # If running locally, adjust path
-        if not runner_file.exists():
-            runner_file = Path(__file__).parent.parent.parent / "runner.py"
-
-        # Load the module directly from file
-        spec = importlib.util.spec_from_file_location("algorand_runner", runner_file)
-        if spec is None or spec.loader is None:
-            raise ImportError(f"Could not load runner from {runner_file}")
-
-        algorand_runner = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(algorand_runner)
+        algorand_runner = self.load_module()
 
         # Create and run the system
-        system = algorand_runner.AlgorandAgentSystem(prompt)
+        system = algorand_runner.AlgorandAgentSystem(
+            prompt, model=model, task_id=task_id, resume=resume, revise_of=revise_of
+        )
         return system.run()
@@ -0,0 +1,149 @@
+"""
+Test selection for contract revisions.
+
+A revision edits a contract that was already tested. Only the tests that
+can be affected are run again: tests that are new or were changed, and
+tests referring to a top-level definition of the contract (an ABI method,
+a state class, a helper) that was added, changed or removed. A definition
+that uses a changed one (a method calling a changed helper) counts as
+changed too, transitively. References are found by name in the code,
+including strings, since clients call ABI methods by name. If anything
+else at module level changed (imports, the Application, global state),
+every test is run.
+"""
+import ast
+from typing import Dict, List, Optional, Set
+
+
+def _definitions(source: str) -> Optional[Dict[str, str]]:
+    """
+    Map the top-level functions and classes of a module to a dump of their code.
+
+    Other top-level statements are collected under the empty name. Returns
+    None if the source does not parse.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return None
+    definitions: Dict[str, str] = {}
+    rest: List[str] = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions[node.name] = ast.dump(node)
+        elif not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+            # Module docstrings and other bare constants change nothing
+            rest.append(ast.dump(node))
+    definitions[""] = "\n".join(rest)
+    return definitions
+
+
+def changed_definitions(old: str, new: str) -> Optional[Set[str]]:
+    """
+    Find the top-level definitions a revision added, changed or removed.
+
+    Definitions of the revised source that refer to a changed definition
+    are included, until no more are added.
+
+    Args:
+        old: Source before the revision
+        new: Source after the revision
+
+    Returns:
+        Names of the definitions, or None if other module-level code
+        changed (or either version does not parse)
+    """
+    before, after = _definitions(old), _definitions(new)
+    if before is None or after is None or before.pop("") != after.pop(""):
+        return None
+    changed = {name for name in before.keys() | after.keys() if before.get(name) != after.get(name)}
+
+    references = {
+        node.name: _references(node)
+        for node in ast.parse(new).body
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef))
+    }
+    while True:
+        users = {name for name, used in references.items() if name not in changed and used & changed}
+        if not users:
+            return changed
+        changed |= users
+
+
+def _tests(tree: ast.Module) -> Dict[str, ast.AST]:
+    """Map the pytest node IDs of a module's tests (functions and Test* class methods) to their code."""
+    tests: Dict[str, ast.AST] = {}
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)) and node.name.startswith("test"):
+            tests[node.name] = node
+        elif isinstance(node, ast.ClassDef) and node.name.startswith("Test"):
+            for item in node.body:
+                if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test"):
+                    tests[f"{node.name}::{item.name}"] = item
+    return tests
+
+
+def _signatures(tree: ast.Module) -> Dict[str, str]:
+    """Map test node IDs to a dump of their code, including the rest of their class (fixtures, setup)."""
+    shared = {
+        node.name: ast.dump(ast.Module(
+            body=[item for item in node.body if not (
+                isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)) and item.name.startswith("test")
+            )],
+            type_ignores=[],
+        ))
+        for node in tree.body
+        if isinstance(node, ast.ClassDef)
+    }
+    return {
+        node_id: ast.dump(node) + shared.get(node_id.split("::")[0], "")
+        for node_id, node in _tests(tree).items()
+    }
+
+
+def _references(node: ast.AST) -> Set[str]:
+    """Return the names, attributes and string constants used in a node."""
+    names: Set[str] = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name):
+            names.add(child.id)
+        elif isinstance(child, ast.Attribute):
+            names.add(child.attr)
+        elif isinstance(child, ast.Constant) and isinstance(child.value, str):
+            names.add(child.value)
+    return names
+
+
+def select_tests(old_tests: str, new_tests: str, changed: Set[str]) -> Optional[List[str]]:
+    """
+    Select the tests of a module a revision can affect.
+
+    Args:
+        old_tests: Test module before the revision
+        new_tests: Test module after the revision
+        changed: Contract definitions the revision changed (see changed_definitions())
+
+    Returns:
+        Node IDs within the module (e.g. "test_increment" or
+        "TestCounter::test_reset"), or None if every test should run
+        because code shared by the tests (imports, fixtures) changed
+    """
+    try:
+        old_tree, new_tree = ast.parse(old_tests), ast.parse(new_tests)
+    except SyntaxError:
+        return None
+    old_shared, new_shared = _definitions(old_tests), _definitions(new_tests)
+    if old_shared[""] != new_shared[""]:
+        return None
+    # Fixtures and helpers defined in the module are used by the tests by name
+    helpers = {
+        name for name in old_shared.keys() | new_shared.keys()
+        if name and not name.startswith(("test", "Test")) and old_shared.get(name) != new_shared.get(name)
+    }
+    affected = changed | helpers
+    old_signatures = _signatures(old_tree)
+    new_signatures = _signatures(new_tree)
+    return [
+        node_id for node_id, node in _tests(new_tree).items()
+        if old_signatures.get(node_id) != new_signatures[node_id] or _references(node) & affected
+    ]
@@ -0,0 +1,244 @@
+"""
+Speculative parallel code generation.
+
+K coding agents run side by side, each with its own model settings and its
+own contract file. Candidates are compile-checked after every agent step;
+the first one that compiles wins and the others are interrupted.
+
+Candidate 0 runs with the single-attempt settings. Interrupting it when
+another candidate wins would make its latency equal the winner's, so the
+speedup is only measured in measurement mode, where candidate 0 runs on
+until it compiles or finishes (the phase then takes as long as a single
+attempt would).
+"""
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.core import log, span
+
+
+class SpeculativeCandidate:
+    """One coding attempt."""
+
+    def __init__(self, index: int, model: Any, contract_path: Path, relative_path: str, temperature: float):
+        """
+        Initialize a candidate.
+
+        Args:
+            index: Candidate number (0 runs with the single-attempt settings)
+            model: LLM model used by this candidate's agent
+            contract_path: Absolute path of the candidate's contract file
+            relative_path: Contract path relative to the project directory (given to the agent)
+            temperature: Sampling temperature
+        """
+        self.index = index
+        self.model = model
+        self.contract_path = contract_path
+        self.relative_path = relative_path
+        self.temperature = temperature
+        self.agent: Any = None
+        self.valid = False
+        self.cancelled = False
+        self.error: Optional[str] = None
+        self.elapsed_s: Optional[float] = None
+        self.valid_at_s: Optional[float] = None
+        self._checked_mtime: Optional[int] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the candidate's outcome to a dictionary."""
+        return {
+            "index": self.index,
+            "model": getattr(self.model, "model_id", None),
+            "temperature": self.temperature,
+            "elapsed_s": round(self.elapsed_s, 3) if self.elapsed_s is not None else None,
+            "valid": self.valid,
+            "valid_at_s": round(self.valid_at_s, 3) if self.valid_at_s is not None else None,
+            "cancelled": self.cancelled,
+            "error": self.error,
+        }
+
+
+class SpeculativeCoder:
+    """Runs coding candidates in parallel and keeps the first valid one."""
+
+    def __init__(
+        self,
+        candidates: List[SpeculativeCandidate],
+        build_agent: Callable[[SpeculativeCandidate, Callable], Any],
+        build_task: Callable[[SpeculativeCandidate], str],
+        run_agent: Callable[[Any, str], Any],
+        validate: Callable[[Path], Tuple[bool, str]],
+        tokens_used: Callable[[], int],
+        token_budget: int = 0,
+        measure_baseline: bool = False,
+    ):
+        """
+        Initialize the coder.
+
+        Args:
+            candidates: Candidates to run
+            build_agent: Creates a candidate's agent, given a step callback
+            build_task: Renders a candidate's task prompt
+            run_agent: Runs an agent on a task
+            validate: Compile check for a contract file
+            tokens_used: Returns the tokens consumed so far by all candidates
+            token_budget: Interrupt all candidates above this many tokens (0 = unlimited)
+            measure_baseline: Let candidate 0 run until it compiles or finishes
+                even after another candidate won, to measure the speedup
+        """
+        self.candidates = candidates
+        self.build_agent = build_agent
+        self.build_task = build_task
+        self.run_agent = run_agent
+        self.validate = validate
+        self.tokens_used = tokens_used
+        self.token_budget = token_budget
+        self.measure_baseline = measure_baseline
+        self.winner: Optional[SpeculativeCandidate] = None
+        self.time_to_valid_s: Optional[float] = None
+        self.budget_exhausted = False
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._start = 0.0
+
+    def run(self) -> Optional[SpeculativeCandidate]:
+        """
+        Run all candidates until one is valid or all have finished.
+
+        Returns:
+            The winning candidate, or None if no candidate compiled
+        """
+        self._start = time.perf_counter()
+        log(f"Speculative coding: launching {len(self.candidates)} candidates")
+
+        with ThreadPoolExecutor(max_workers=len(self.candidates), thread_name_prefix="candidate") as pool:
+            futures = [
+                pool.submit(contextvars.copy_context().run, self._run_candidate, candidate)
+                for candidate in self.candidates
+            ]
+            for future in futures:
+                future.result()
+
+        return self.winner
+
+    def _run_candidate(self, candidate: SpeculativeCandidate) -> None:
+        """Run one candidate's agent and validate its final output."""
+        with span("speculative.candidate", index=candidate.index, temperature=candidate.temperature):
+            try:
+                candidate.agent = self.build_agent(candidate, self._step_callback(candidate))
+                if not self._stop.is_set() or self._measuring(candidate):
+                    self.run_agent(candidate.agent, self.build_task(candidate))
+            except Exception as e:
+                # Candidates interrupted after compiling and cancelled candidates are not errors
+                if not candidate.cancelled and not candidate.valid:
+                    candidate.error = str(e)
+            finally:
+                candidate.elapsed_s = time.perf_counter() - self._start
+
+            if not candidate.cancelled:
+                self._check(candidate)
+
+    def _step_callback(self, candidate: SpeculativeCandidate) -> Callable:
+        """Create the step callback that checks a candidate after each agent step."""
+        def on_step(step: Any, agent: Any = None) -> None:
+            if self._stop.is_set() and not self._measuring(candidate):
+                self._cancel(candidate)
+                return
+            if self.token_budget and self.tokens_used() > self.token_budget:
+                log(f"Speculative coding: token budget of {self.token_budget} exhausted")
+                self.budget_exhausted = True
+                self._stop_all()
+                return
+            self._check(candidate)
+        return on_step
+
+    def _measuring(self, candidate: SpeculativeCandidate) -> bool:
+        """Whether a candidate is the baseline being measured and must not be stopped by the winner."""
+        return (
+            self.measure_baseline and candidate.index == 0
+            and not candidate.valid and not self.budget_exhausted
+        )
+
+    def _check(self, candidate: SpeculativeCandidate) -> None:
+        """Compile-check a candidate's contract if it changed since the last check."""
+        try:
+            mtime = candidate.contract_path.stat().st_mtime_ns
+        except OSError:
+            return
+        if mtime == candidate._checked_mtime or candidate.valid:
+            return
+        if self.winner is not None and not self._measuring(candidate):
+            return
+        candidate._checked_mtime = mtime
+
+        ok, _ = self.validate(candidate.contract_path)
+        if not ok:
+            return
+        candidate.valid = True
+        candidate.valid_at_s = time.perf_counter() - self._start
+
+        with self._lock:
+            if self.winner is not None:
+                winner = None
+            else:
+                winner = self.winner = candidate
+                self.time_to_valid_s = candidate.valid_at_s
+        if winner is None:
+            # The measured baseline compiled after the winner; it is done now
+            log(f"Speculative coding: baseline compiled after {candidate.valid_at_s:.1f}s")
+            self._cancel(candidate)
+            return
+        log(f"Speculative coding: candidate {candidate.index} compiled first after {self.time_to_valid_s:.1f}s")
+        self._stop_all()
+
+    def _stop_all(self) -> None:
+        """Interrupt every running candidate, including the winner's remaining steps."""
+        self._stop.set()
+        for candidate in self.candidates:
+            if not self._measuring(candidate):
+                self._cancel(candidate)
+
+    def _cancel(self, candidate: SpeculativeCandidate) -> None:
+        """Interrupt a candidate's agent at its next step."""
+        if candidate.elapsed_s is not None:
+            return
+        if candidate is not self.winner and not candidate.valid:
+            candidate.cancelled = True
+        if candidate.agent is not None and hasattr(candidate.agent, "interrupt"):
+            candidate.agent.interrupt()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Summarize the run, including the latency gain over a single attempt.
+
+        Candidate 0 runs with the single-attempt settings, so the time it
+        took to compile is the single-attempt baseline. Without measurement
+        mode it is only known when candidate 0 won; otherwise it was
+        interrupted and the baseline and speedup are None.
+
+        Returns:
+            Report dictionary
+        """
+        baseline = self.candidates[0] if self.candidates else None
+        baseline_s = baseline.valid_at_s if baseline else None
+        speedup = None
+        if baseline_s and self.time_to_valid_s:
+            speedup = round(baseline_s / self.time_to_valid_s, 2)
+
+        return {
+            "mode": "speculative",
+            "k": len(self.candidates),
+            "winner": self.winner.index if self.winner else None,
+            "time_to_valid_s": round(self.time_to_valid_s, 3) if self.time_to_valid_s else None,
+            "baseline_s": round(baseline_s, 3) if baseline_s else None,
+            "baseline_measured": self.measure_baseline,
+            "speedup": speedup,
+            "token_budget": self.token_budget,
+            "tokens_used": self.tokens_used(),
+            "budget_exhausted": self.budget_exhausted,
+            "candidates": [c.to_dict() for c in self.candidates],
+        }
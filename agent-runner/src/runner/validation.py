@@ -0,0 +1,55 @@
+"""
+Contract validation checks.
+"""
+import subprocess
+import sys
+from pathlib import Path
+from typing import Tuple
+
+from src.core import log, span
+
+# Loads the contract module from its path and compiles the Beaker app to
+# TEAL without needing an algod connection
+_COMPILE_SCRIPT = """
+import importlib.util, sys
+spec = importlib.util.spec_from_file_location("candidate_contract", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+module.app.build()
+"""
+
+
+def check_contract_compiles(contract_path: Path, timeout: int = 120) -> Tuple[bool, str]:
+    """
+    Check that a Beaker contract file imports and compiles.
+
+    The check runs in a separate interpreter so PyTeal's global state and
+    half-written candidate modules never leak into the runner process.
+
+    Args:
+        contract_path: Path to contract.py
+        timeout: Seconds before the check is abandoned
+
+    Returns:
+        Tuple of (compiled successfully, error output)
+    """
+    if not contract_path.exists():
+        return False, f"{contract_path} does not exist"
+
+    try:
+        with span("subprocess", command="compile-check", path=str(contract_path)):
+            result = subprocess.run(
+                [sys.executable, "-c", _COMPILE_SCRIPT, str(contract_path)],
+                cwd=str(contract_path.parent),
+                capture_output=True,
+                text=True,
+                timeout=timeout,
+            )
+    except subprocess.TimeoutExpired:
+        return False, "Compile check timed out"
+
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1:] or ["unknown error"]
+        log(f"Compile check failed for {contract_path}: {error[0]}")
+        return False, result.stderr
+    return True, ""
@@ -0,0 +1,15 @@
+"""Project scaffolding: prebuilt templates and workspace garbage collection."""
+from .cleanup import WorkspaceGC, workspace_gc
+from .templates import MARKER, clone_file, copy_project, instantiate, new_project_dir, stage, template_dir
+
+__all__ = [
+    "MARKER",
+    "WorkspaceGC",
+    "clone_file",
+    "copy_project",
+    "instantiate",
+    "new_project_dir",
+    "stage",
+    "template_dir",
+    "workspace_gc",
+]
@@ -0,0 +1,134 @@
+"""
+Background garbage collection of old task workspaces.
+
+Tasks never delete directories themselves: discard() renames a directory
+into the workspace's trash (a cheap metadata operation) and a daemon
+thread deletes the trash and expired task projects later, together with
+the checkpoints of tasks that old.
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from src.core import config, log
+from .templates import MARKER
+
+TRASH_DIR = ".trash"
+# Phase checkpoints of the tasks (see src/runner/checkpoint.py)
+CHECKPOINT_DIR = ".checkpoints"
+
+
+class WorkspaceGC:
+    """Deletes discarded and expired task directories off the task path."""
+
+    def __init__(self, root: Path, retention_s: float, interval_s: float):
+        """
+        Initialize the collector.
+
+        Args:
+            root: Workspace root holding the task projects
+            retention_s: Age after which a task project is removed
+            interval_s: Seconds between sweeps
+        """
+        self.root = root
+        self.retention_s = retention_s
+        self.interval_s = interval_s
+        self.removed = 0
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    @property
+    def trash(self) -> Path:
+        return self.root / TRASH_DIR
+
+    def start(self) -> None:
+        """Start the background thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._loop, name="workspace-gc", daemon=True)
+            self._thread.start()
+
+    def discard(self, path: Path) -> None:
+        """
+        Remove a directory from the workspace without waiting for the delete.
+
+        Args:
+            path: Directory to remove
+        """
+        if not path.exists():
+            return
+        self.trash.mkdir(parents=True, exist_ok=True)
+        os.rename(path, self.trash / f"{path.name}-{uuid.uuid4().hex[:8]}")
+        self._wake.set()
+
+    def sweep(self) -> int:
+        """
+        Move expired task projects to the trash, empty it and delete expired checkpoints.
+
+        Returns:
+            Number of directories deleted
+        """
+        cutoff = time.time() - self.retention_s
+        if self.root.is_dir():
+            for entry in self.root.iterdir():
+                marker = entry / MARKER
+                if entry.name.startswith(".") or not marker.is_file():
+                    continue
+                try:
+                    created_at = json.loads(marker.read_text()).get("created_at", 0)
+                except (OSError, ValueError):
+                    continue
+                if created_at < cutoff:
+                    try:
+                        self.discard(entry)
+                    except OSError as e:
+                        log(f"Workspace GC: cannot discard {entry.name}: {e}")
+
+        checkpoints = self.root / CHECKPOINT_DIR
+        if checkpoints.is_dir():
+            for entry in checkpoints.iterdir():
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        entry.unlink()
+                except OSError:
+                    continue
+
+        deleted = 0
+        if self.trash.is_dir():
+            for entry in self.trash.iterdir():
+                shutil.rmtree(entry, ignore_errors=True)
+                deleted += 1
+        if deleted:
+            self.removed += deleted
+            log(f"Workspace GC: removed {deleted} old workspaces")
+        return deleted
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                log(f"Workspace GC: sweep failed: {e}")
+            self._wake.wait(self.interval_s)
+            self._wake.clear()
+
+
+_gc: Optional[WorkspaceGC] = None
+_gc_lock = threading.Lock()
+
+
+def workspace_gc() -> WorkspaceGC:
+    """Return the process-wide collector, starting it on first use."""
+    global _gc
+    with _gc_lock:
+        if _gc is None:
+            _gc = WorkspaceGC(config.WORKSPACE_DIR, config.WORKSPACE_RETENTION_S, config.WORKSPACE_GC_INTERVAL_S)
+            _gc.start()
+        return _gc
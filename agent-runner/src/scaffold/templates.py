@@ -0,0 +1,216 @@
+"""
+Project templates instantiated with copy-on-write file clones.
+
+Templates live in config.SCAFFOLD_DIR (one directory per template). On
+first use a template is staged into the workspace volume, so that task
+projects can be created from it with reflinks (copy-on-write clones)
+instead of copying every file. Where the filesystem has no reflinks the
+files are copied: hardlinks would share their inode with the staged
+template, and any in-place write in a task (a shell redirect, open(...,
+"w")) would then change the template for every later task.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict
+
+from src.core import config, log, span
+
+# Marker written into every task project; the workspace GC only removes
+# directories that carry it
+MARKER = ".scaffold.json"
+
+# Path component replaced by the contract name
+CONTRACT_PLACEHOLDER = "__contract__"
+
+# Directory inside the workspace holding staged templates
+STAGING_DIR = ".scaffolds"
+
+# Build byproducts never staged from a template
+_IGNORED = shutil.ignore_patterns("__pycache__", "*.pyc")
+
+# ioctl request to clone a file's extents (Linux FICLONE)
+_FICLONE = 0x40049409
+
+_staged: Dict[str, Path] = {}
+_stage_lock = threading.Lock()
+
+
+def template_dir(name: str) -> Path:
+    """
+    Return the source directory of a template.
+
+    Raises:
+        ValueError: If there is no such template
+    """
+    path = config.SCAFFOLD_DIR / name
+    if not path.is_dir():
+        raise ValueError(f"Unknown scaffold template: {name}")
+    return path
+
+
+def _fingerprint(root: Path) -> str:
+    """Hash a template's relative paths, modes and contents."""
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(p for p in root.rglob("*") if p.is_file() and "__pycache__" not in p.parts):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(oct(path.stat().st_mode & 0o777).encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def stage(name: str) -> Path:
+    """
+    Stage a template on the workspace filesystem (once per template version).
+
+    The copy is made under a temporary name and renamed into place, so
+    concurrent processes sharing the volume never see a partial template.
+
+    Args:
+        name: Template name
+
+    Returns:
+        Directory of the staged template
+    """
+    with _stage_lock:
+        if name in _staged and _staged[name].is_dir():
+            return _staged[name]
+
+        source = template_dir(name)
+        target = config.WORKSPACE_DIR / STAGING_DIR / f"{name}-{_fingerprint(source)}"
+        if not target.is_dir():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+            shutil.copytree(source, tmp, ignore=_IGNORED)
+            try:
+                os.rename(tmp, target)
+            except OSError:
+                shutil.rmtree(tmp, ignore_errors=True)  # staged concurrently by another process
+                if not target.is_dir():
+                    raise
+            log(f"Scaffold: staged template {name} at {target}")
+        _staged[name] = target
+        return target
+
+
+def clone_file(source: Path, dest: Path) -> str:
+    """
+    Create dest as a reflink of source, or a copy where reflinks are not supported.
+
+    Both leave dest independent of source: writing to one never changes the other.
+
+    Returns:
+        The method used: "reflink" or "copy"
+    """
+    try:
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        shutil.copymode(source, dest)
+        return "reflink"
+    except OSError:
+        dest.unlink(missing_ok=True)
+    shutil.copy2(source, dest)
+    return "copy"
+
+
+def new_project_dir(project_name: str) -> Path:
+    """
+    Reserve a unique project directory for a task.
+
+    Args:
+        project_name: Human-readable project name (used as the prefix)
+
+    Returns:
+        A newly created, empty directory in the workspace
+    """
+    config.WORKSPACE_DIR.mkdir(parents=True, exist_ok=True)
+    while True:
+        path = config.WORKSPACE_DIR / f"{project_name}-{uuid.uuid4().hex[:8]}"
+        try:
+            path.mkdir()
+            return path
+        except FileExistsError:
+            continue
+
+
+def instantiate(name: str, dest: Path, contract_name: str) -> Dict[str, Any]:
+    """
+    Create a project from a template.
+
+    Args:
+        name: Template name
+        dest: Empty project directory (see new_project_dir())
+        contract_name: Replaces the __contract__ path component
+
+    Returns:
+        Statistics: files cloned per method and the time taken
+    """
+    start = time.perf_counter()
+    methods: Counter = Counter()
+    with span("scaffold.instantiate", template=name) as s:
+        staged = stage(name)
+        for root, dirs, files in os.walk(staged):
+            relative = Path(root).relative_to(staged)
+            target = dest / Path(*[contract_name if part == CONTRACT_PLACEHOLDER else part for part in relative.parts])
+            target.mkdir(parents=True, exist_ok=True)
+            for filename in files:
+                methods[clone_file(Path(root) / filename, target / filename)] += 1
+        if s:
+            for method, count in methods.items():
+                s.set_attribute(f"files.{method}", count)
+
+    (dest / MARKER).write_text(json.dumps({
+        "template": name,
+        "staged": staged.name,
+        "contract_name": contract_name,
+        "created_at": time.time(),
+    }))
+    stats = {"template": name, "files": dict(methods), "seconds": round(time.perf_counter() - start, 4)}
+    log(
+        f"Scaffold: {dest.name} from {name} in {stats['seconds'] * 1000:.1f} ms "
+        f"({', '.join(f'{n} {m}' for m, n in sorted(methods.items()))})"
+    )
+    return stats
+
+
+def copy_project(source: Path, dest: Path, revision_of: str) -> Dict[str, Any]:
+    """
+    Create a project from another task's project, for a revision of it.
+
+    Files are copied, except build and test caches. The copy shares no
+    data with the revised project, which stays exactly as it was
+    delivered and can itself be revised again.
+
+    Args:
+        source: Project directory of the revised task
+        dest: Empty project directory (see new_project_dir())
+        revision_of: ID of the revised task, recorded in the marker
+
+    Returns:
+        Statistics: files copied and the time taken
+    """
+    start = time.perf_counter()
+    copied = 0
+    with span("scaffold.copy_project", source=source.name):
+        for root, dirs, files in os.walk(source):
+            dirs[:] = [d for d in dirs if d not in ("__pycache__", ".pytest_cache")]
+            target = dest / Path(root).relative_to(source)
+            target.mkdir(parents=True, exist_ok=True)
+            for filename in files:
+                if filename == MARKER or filename.endswith(".pyc"):
+                    continue
+                shutil.copy2(Path(root) / filename, target / filename)
+                copied += 1
+
+    marker = json.loads((source / MARKER).read_text())
+    (dest / MARKER).write_text(json.dumps({**marker, "revision_of": revision_of, "created_at": time.time()}))
+    stats = {"source": source.name, "files": copied, "seconds": round(time.perf_counter() - start, 4)}
+    log(f"Scaffold: {dest.name} from {source.name} in {stats['seconds'] * 1000:.1f} ms ({copied} files copied)")
+    return stats
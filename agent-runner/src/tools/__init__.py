@@ -1,19 +1,32 @@
 """Tools for AI agents."""
 from .shell import execute_shell_command
-from .file_ops import read_file, write_file
+from .file_ops import apply_patch, read_file, replace_in_file, write_file
 from .documentation import search_documentation
+from .cache import ToolCache, active_tool_cache, memoize, use_tool_cache
 
+# Memoized in place, so the module-level names above use the cache too
 ALL_TOOLS = [
-    execute_shell_command,
-    read_file,
-    write_file,
-    search_documentation,
+    memoize(tool)
+    for tool in [
+        execute_shell_command,
+        read_file,
+        write_file,
+        replace_in_file,
+        apply_patch,
+        search_documentation,
+    ]
 ]
 
 __all__ = [
     "execute_shell_command",
     "read_file",
     "write_file",
+    "replace_in_file",
+    "apply_patch",
     "search_documentation",
     "ALL_TOOLS",
+    "ToolCache",
+    "active_tool_cache",
+    "memoize",
+    "use_tool_cache",
 ]
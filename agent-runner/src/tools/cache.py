@@ -0,0 +1,204 @@
+"""
+Per-run memoization of agent tool calls.
+
+Agents often read the same file or search the same query several times in
+one phase. With a ToolCache installed for a run (use_tool_cache()), such
+repeated calls are answered from memory:
+
+- read_file results are keyed by resolved path and arguments and are only
+  reused while the file's mtime and size are unchanged;
+- search_documentation results are keyed by the normalized query.
+
+Any call that can change the workspace (write_file, replace_in_file,
+apply_patch, execute_shell_command) drops every cached read. Hits always
+return the full result: CodeAgent tool calls return values into the
+agent's code (e.g. `c = read_file(p)`), so the result must be the content
+itself even when the agent has seen it before.
+"""
+import contextvars
+import inspect
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.core import current_task, log
+from src.llm.metrics import current_phase
+
+_current_cache: contextvars.ContextVar[Optional["ToolCache"]] = contextvars.ContextVar("tool_cache", default=None)
+
+# Tools whose results are cached
+CACHED_TOOLS = {"read_file", "search_documentation"}
+
+# Tools after which cached reads may be stale
+INVALIDATING_TOOLS = {"write_file", "replace_in_file", "apply_patch", "execute_shell_command"}
+
+
+@contextmanager
+def use_tool_cache(cache: "ToolCache") -> Iterator["ToolCache"]:
+    """
+    Serve tool calls made inside the block from a run's cache.
+
+    Args:
+        cache: Cache of the current run
+    """
+    token = _current_cache.set(cache)
+    try:
+        yield cache
+    finally:
+        _current_cache.reset(token)
+
+
+def active_tool_cache() -> Optional["ToolCache"]:
+    """Return the cache of the current run, if any."""
+    return _current_cache.get()
+
+
+def _normalize_query(query: str) -> str:
+    return " ".join(str(query).lower().split())
+
+
+class ToolCache:
+    """Thread-safe cache of tool results for one run."""
+
+    def __init__(self):
+        """Initialize an empty cache."""
+        self._entries: Dict[Tuple, Dict[str, Any]] = {}
+        self._stats: Dict[str, Dict[str, Dict[str, int]]] = {}
+        self._lock = threading.Lock()
+
+    def key(self, tool_name: str, arguments: Dict[str, Any]) -> Tuple[Tuple, Optional[Tuple[int, int]]]:
+        """
+        Build the cache key of a call and the file version it depends on.
+
+        Args:
+            tool_name: Name of a cached tool
+            arguments: Bound call arguments
+
+        Returns:
+            (key, version), where version is (mtime_ns, size) for reads and
+            None for searches. A read of a missing file has no valid key.
+        """
+        if tool_name == "read_file":
+            path = current_task().resolve(str(arguments["filepath"]))
+            st = os.stat(path)
+            rest = tuple(arguments[name] for name in ("start_line", "end_line", "max_bytes") if name in arguments)
+            return ("read_file", str(path)) + rest, (st.st_mtime_ns, st.st_size)
+        return (tool_name, _normalize_query(arguments.get("query", "")), arguments.get("source")), None
+
+    def lookup(self, tool_name: str, key: Tuple, version: Optional[Tuple[int, int]]) -> Tuple[bool, Any]:
+        """
+        Look up a call and count it.
+
+        Returns:
+            (hit, result)
+        """
+        with self._lock:
+            stats = self._stats.setdefault(current_phase(), {}).setdefault(tool_name, {"calls": 0, "hits": 0})
+            stats["calls"] += 1
+            entry = self._entries.get(key)
+            if entry is None or entry["version"] != version:
+                return False, None
+            stats["hits"] += 1
+            return True, entry["result"]
+
+    def store(self, key: Tuple, version: Optional[Tuple[int, int]], result: Any) -> None:
+        """Remember a result."""
+        with self._lock:
+            self._entries[key] = {"version": version, "result": result}
+
+    def invalidate_reads(self) -> None:
+        """Drop every cached read_file result."""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == "read_file"]:
+                del self._entries[key]
+
+    def summary(self, phase: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-tool call counts and hit rates.
+
+        Args:
+            phase: Only this phase (default: all phases together)
+
+        Returns:
+            {tool: {"calls", "hits", "hit_rate"}}
+        """
+        with self._lock:
+            phases = [self._stats.get(phase, {})] if phase else list(self._stats.values())
+            totals: Dict[str, Dict[str, Any]] = {}
+            for tools in phases:
+                for name, stats in tools.items():
+                    entry = totals.setdefault(name, {"calls": 0, "hits": 0})
+                    entry["calls"] += stats["calls"]
+                    entry["hits"] += stats["hits"]
+        for entry in totals.values():
+            entry["hit_rate"] = round(entry["hits"] / entry["calls"], 4) if entry["calls"] else 0.0
+        return totals
+
+    def log_summary(self, phase: Optional[str] = None) -> None:
+        """Log per-tool hit rates (of one phase, or of the whole run)."""
+        summary = self.summary(phase)
+        if summary:
+            rates = ", ".join(
+                f"{name} {s['hits']}/{s['calls']} ({s['hit_rate']:.0%})" for name, s in sorted(summary.items())
+            )
+            log(f"Tool cache{f' [{phase}]' if phase else ''}: {rates}")
+
+
+def memoize(tool: Any) -> Any:
+    """
+    Route a smolagents tool's calls through the active ToolCache.
+
+    The tool is changed in place (its forward method is wrapped), so every
+    reference to it, including ALL_TOOLS, uses the cache. Without an active
+    cache the tool behaves exactly as before.
+
+    Args:
+        tool: Tool created with @tool
+
+    Returns:
+        The same tool
+    """
+    name = tool.name
+    if name not in CACHED_TOOLS and name not in INVALIDATING_TOOLS:
+        return tool
+
+    forward: Callable[..., Any] = tool.forward
+    signature = inspect.signature(forward)
+    # @tool advertises forward with a leading "self" parameter (for its generated source),
+    # but the function is a staticmethod called with the tool's arguments only
+    parameters = list(signature.parameters.values())
+    if parameters and parameters[0].name == "self":
+        signature = signature.replace(parameters=parameters[1:])
+
+    def cached_forward(*args: Any, **kwargs: Any) -> Any:
+        cache = active_tool_cache()
+        if cache is None:
+            return forward(*args, **kwargs)
+
+        if name in INVALIDATING_TOOLS:
+            try:
+                return forward(*args, **kwargs)
+            finally:
+                cache.invalidate_reads()
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        arguments = dict(bound.arguments)
+        try:
+            key, version = cache.key(name, arguments)
+        except (OSError, ValueError):
+            return forward(*args, **kwargs)  # let the tool report the error
+
+        hit, result = cache.lookup(name, key, version)
+        if hit:
+            log(f"Tool cache hit: {name} {key[1]!r}")
+            return result
+
+        result = forward(*args, **kwargs)
+        if not (isinstance(result, str) and result.startswith("Error")):
+            cache.store(key, version, result)
+        return result
+
+    tool.forward = cached_forward
+    return tool
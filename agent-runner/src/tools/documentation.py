@@ -1,45 +1,36 @@
 """
 Documentation search tool for RAG.
 """
-from pathlib import Path
+from typing import Optional
+
 from smolagents import tool
-from src.core import config, log
+from src.core import log, span
+from src.retrieval import search
 
 
 @tool
-def search_documentation(query: str) -> str:
+def search_documentation(query: str, source: Optional[str] = None) -> str:
     """
-    Search the AlgoKit documentation for information.
+    Search the Algorand documentation (AlgoKit, Beaker, PyTeal, ABI) for information.
 
     Args:
         query: The search query
+        source: Optional filter on the documentation source, as a directory
+            (e.g. "beaker"), file name or glob (e.g. "pyteal/*.md")
 
     Returns:
         Relevant documentation content
     """
     log(f"Tool: Searching documentation for: {query}")
     try:
-        doc_path = config.DOCS_DIR / "algokit_guide.md"
-        with open(doc_path, 'r') as f:
-            docs = f.read()
-
-        # Simple keyword search - return relevant sections
-        lines = docs.split('\n')
-        relevant_lines = []
-        query_lower = query.lower()
-
-        for i, line in enumerate(lines):
-            if query_lower in line.lower():
-                # Include context (5 lines before and after)
-                start = max(0, i - 5)
-                end = min(len(lines), i + 6)
-                relevant_lines.extend(lines[start:end])
-                relevant_lines.append("---")
+        with span("tool.search_documentation", query=query, source=source or "") as s:
+            hits = search(query, source=source)
+            if s:
+                s.set_attribute("hits", len(hits))
 
-        if relevant_lines:
-            result = '\n'.join(relevant_lines[:500])  # Limit size
-            log(f"Found {len(relevant_lines)} relevant lines")
-            return result
+        if hits:
+            log(f"Found {len(hits)} relevant sections: " + "; ".join(h["title"] for h in hits))
+            return "\n\n---\n\n".join(f"[{h['source']}] {h['title']}\n\n{h['text']}" for h in hits)
         else:
             return "No specific documentation found. Please refer to general AlgoKit commands: algokit init, algokit project run build, algokit project deploy localnet"
     except Exception as e:
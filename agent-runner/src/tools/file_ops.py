@@ -1,28 +1,126 @@
 """
 File operation tools for agents.
+
+Reads can be limited to a line range or a byte budget, and edits can be
+sent as search/replace pairs or unified diffs, so fixing a contract does
+not resend the whole file in both directions. Every call logs how many
+bytes it moved compared to a full-file transfer.
 """
+import mmap
+import os
+import re
+import tempfile
 from pathlib import Path
+from typing import List, Optional, Tuple
+
 from smolagents import tool
-from src.core import config, log
+from src.core import current_task, log, span
+
+# Files at least this large are read through mmap instead of into memory
+MMAP_THRESHOLD = 1024 * 1024
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+def atomic_write(path: Path, data: str) -> None:
+    """
+    Replace a file's content atomically.
+
+    The data is written to a temporary file in the same directory and
+    renamed over the target, so readers never see a partial file. The
+    target's permissions are kept.
+
+    Args:
+        path: File to write
+        data: New content
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        if path.exists():
+            os.chmod(tmp, path.stat().st_mode & 0o7777)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _log_transfer(action: str, filepath: str, moved: int, file_size: int) -> None:
+    """Log bytes moved by a tool call against a full-file transfer."""
+    saved = file_size - moved
+    note = f", {saved} saved vs. full file" if saved > 0 else ""
+    log(f"{action} {filepath}: {moved} of {file_size} bytes{note}")
+
+
+def _read_range(path: Path, start_line: int, end_line: Optional[int], max_bytes: Optional[int]) -> bytes:
+    """Return lines start_line..end_line (1-based, inclusive) of a file, capped at max_bytes."""
+    size = path.stat().st_size
+    with open(path, "rb") as f:
+        if size == 0:
+            return b""
+        if size < MMAP_THRESHOLD:
+            data = f.read()
+        else:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            # Walk newlines up to the range instead of splitting the whole file
+            begin = 0
+            for _ in range(start_line - 1):
+                begin = data.find(b"\n", begin) + 1
+                if begin == 0:
+                    return b""
+            end = len(data)
+            if end_line is not None:
+                end = begin
+                for _ in range(end_line - start_line + 1):
+                    end = data.find(b"\n", end) + 1
+                    if end == 0:
+                        end = len(data)
+                        break
+            if max_bytes is not None:
+                end = min(end, begin + max_bytes)
+            return data[begin:end]
+        finally:
+            if isinstance(data, mmap.mmap):
+                data.close()
 
 
 @tool
-def read_file(filepath: str) -> str:
+def read_file(
+    filepath: str,
+    start_line: Optional[int] = None,
+    end_line: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> str:
     """
-    Read the contents of a file.
+    Read the contents of a file, optionally only a range of lines.
 
     Args:
-        filepath: Path to the file to read
+        filepath: Path to the file to read, relative to the project directory
+        start_line: First line to return (1-based, default 1)
+        end_line: Last line to return, inclusive (default: end of file)
+        max_bytes: Return at most this many bytes
 
     Returns:
         The file contents or error message
     """
     log(f"Tool: Reading file: {filepath}")
     try:
-        full_path = config.WORKSPACE_DIR / filepath
-        with open(full_path, 'r') as f:
-            content = f.read()
-        log(f"Read {len(content)} characters from {filepath}")
+        full_path = current_task().resolve(filepath)
+        with span("tool.read_file", path=filepath) as s:
+            size = full_path.stat().st_size
+            if start_line is None and end_line is None and max_bytes is None:
+                data = full_path.read_bytes()
+            else:
+                data = _read_range(full_path, max(1, start_line or 1), end_line, max_bytes)
+            content = data.decode("utf-8", errors="replace")
+            if s:
+                s.set_attribute("bytes", len(data))
+                s.set_attribute("file_bytes", size)
+        _log_transfer("Read", filepath, len(data), size)
         return content
     except Exception as e:
         error_msg = f"Error reading file: {str(e)}"
@@ -36,7 +134,7 @@ def write_file(filepath: str, content: str) -> str:
     Write content to a file.
 
     Args:
-        filepath: Path to the file to write
+        filepath: Path to the file to write, relative to the project directory
         content: Content to write to the file
 
     Returns:
@@ -44,13 +142,144 @@ def write_file(filepath: str, content: str) -> str:
     """
     log(f"Tool: Writing to file: {filepath}")
     try:
-        full_path = config.WORKSPACE_DIR / filepath
-        full_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(full_path, 'w') as f:
-            f.write(content)
-        log(f"Wrote {len(content)} characters to {filepath}")
+        full_path = current_task().resolve(filepath)
+        with span("tool.write_file", path=filepath):
+            atomic_write(full_path, content)
+        log(f"Wrote {len(content.encode('utf-8'))} bytes to {filepath}")
         return f"Successfully wrote to {filepath}"
     except Exception as e:
         error_msg = f"Error writing file: {str(e)}"
         log(error_msg)
         return error_msg
+
+
+@tool
+def replace_in_file(filepath: str, search: str, replace: str) -> str:
+    """
+    Replace an exact piece of text in a file, without resending the whole file.
+
+    Args:
+        filepath: Path to the file to edit, relative to the project directory
+        search: Exact text to find; it must occur exactly once in the file
+        replace: Text to put in its place
+
+    Returns:
+        Success or error message
+    """
+    log(f"Tool: Replacing text in file: {filepath}")
+    try:
+        full_path = current_task().resolve(filepath)
+        with span("tool.replace_in_file", path=filepath):
+            original = full_path.read_text(encoding="utf-8")
+            count = original.count(search) if search else 0
+            if count != 1:
+                where = "not found" if count == 0 else f"found {count} times"
+                error_msg = f"Error: search text {where} in {filepath}; include more surrounding lines to make it unique"
+                log(error_msg)
+                return error_msg
+            atomic_write(full_path, original.replace(search, replace, 1))
+        moved = len(search.encode("utf-8")) + len(replace.encode("utf-8"))
+        _log_transfer("Patched", filepath, moved, 2 * len(original.encode("utf-8")))
+        return f"Successfully replaced 1 occurrence in {filepath}"
+    except Exception as e:
+        error_msg = f"Error editing file: {str(e)}"
+        log(error_msg)
+        return error_msg
+
+
+def _parse_hunks(diff: str) -> List[Tuple[int, List[str], List[str]]]:
+    """Parse a unified diff into (old start line, old lines, new lines) hunks."""
+    hunks = []
+    current = None
+    for line in diff.splitlines():
+        header = _HUNK_HEADER.match(line)
+        if header:
+            current = (int(header.group(1)), [], [])
+            hunks.append(current)
+        elif current is None or line.startswith(("---", "+++")) and not current[1] and not current[2]:
+            continue
+        elif line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        elif line.startswith("+"):
+            current[2].append(line[1:])
+        elif line.startswith("-"):
+            current[1].append(line[1:])
+        else:
+            # Context line; tolerate context lines whose leading space was stripped
+            text = line[1:] if line.startswith(" ") else line
+            current[1].append(text)
+            current[2].append(text)
+    if not hunks:
+        raise ValueError("no @@ hunks found in the diff")
+    return hunks
+
+
+def _find_block(lines: List[str], block: List[str], expected: int) -> int:
+    """Find block in lines, trying the expected index first and then moving outwards."""
+    if not block:
+        return min(max(expected, 0), len(lines))
+    limit = len(lines) - len(block)
+    if limit < 0:
+        return -1
+    # Hunk headers can be far off; start from the nearest possible position
+    expected = min(max(expected, 0), limit)
+    for offset in range(0, limit + 1):
+        for index in (expected - offset, expected + offset):
+            if 0 <= index <= limit and lines[index:index + len(block)] == block:
+                return index
+    return -1
+
+
+def apply_unified_diff(original: str, diff: str) -> str:
+    """
+    Apply a unified diff to a text.
+
+    Hunks are located by their context, so line numbers that are off (a
+    common LLM mistake) are tolerated.
+
+    Args:
+        original: Text to patch
+        diff: Unified diff
+
+    Returns:
+        The patched text
+
+    Raises:
+        ValueError: If the diff is malformed or a hunk does not match
+    """
+    lines = original.splitlines()
+    shift = 0
+    for number, (old_start, old, new) in enumerate(_parse_hunks(diff), 1):
+        index = _find_block(lines, old, old_start - 1 + shift)
+        if index < 0:
+            raise ValueError(f"hunk {number} does not match the file (starting with {old[:1]!r})")
+        lines[index:index + len(old)] = new
+        shift += len(new) - len(old)
+    trailing = "\n" if original.endswith("\n") or not original else ""
+    return "\n".join(lines) + trailing
+
+
+@tool
+def apply_patch(filepath: str, diff: str) -> str:
+    """
+    Apply a unified diff (as produced by `diff -u` or `git diff`) to a file.
+
+    Args:
+        filepath: Path to the file to patch, relative to the project directory
+        diff: Unified diff with @@ hunks; context lines must match the file
+
+    Returns:
+        Success or error message
+    """
+    log(f"Tool: Applying patch to file: {filepath}")
+    try:
+        full_path = current_task().resolve(filepath)
+        with span("tool.apply_patch", path=filepath):
+            original = full_path.read_text(encoding="utf-8")
+            atomic_write(full_path, apply_unified_diff(original, diff))
+        _log_transfer("Patched", filepath, len(diff.encode("utf-8")), 2 * len(original.encode("utf-8")))
+        return f"Successfully patched {filepath}"
+    except Exception as e:
+        error_msg = f"Error applying patch: {str(e)}"
+        log(error_msg)
+        return error_msg
@@ -1,36 +1,181 @@
 """
 Shell execution tool for agents.
+
+Commands run with their output streamed: every line is forwarded to the
+task log as it arrives, while the agent gets a bounded head+tail excerpt
+of each stream, so a multi-megabyte pip or pytest log neither grows the
+runner's memory nor floods the LLM context.
 """
+import collections
+import contextvars
+import os
+import signal
 import subprocess
+import threading
+import time
+from typing import Any, Deque, Dict, IO, List
+
 from smolagents import tool
-from src.core import config, log
+from src.core import config, current_task, log, span
+
+# Longest line kept in one piece (longer lines are split)
+MAX_LINE_CHARS = 2000
+
+
+class OutputBuffer:
+    """Keeps the first and last part of a stream and counts what it dropped."""
+
+    def __init__(self, head_chars: int, tail_chars: int):
+        """
+        Initialize the buffer.
+
+        Args:
+            head_chars: Characters kept from the start of the stream
+            tail_chars: Characters kept from the end of the stream
+        """
+        self.head_chars = head_chars
+        self.tail_chars = tail_chars
+        self.head: List[str] = []
+        self.tail: Deque[str] = collections.deque()
+        self.total_chars = 0
+        self.total_lines = 0
+        self._head_size = 0
+        self._tail_size = 0
+        self._dropped_chars = 0
+        self._dropped_lines = 0
+
+    def append(self, line: str) -> None:
+        """Add one line (including its newline, if any)."""
+        self.total_chars += len(line)
+        self.total_lines += 1
+        if self._head_size + len(line) <= self.head_chars and not self.tail:
+            self.head.append(line)
+            self._head_size += len(line)
+            return
+        self.tail.append(line)
+        self._tail_size += len(line)
+        while self._tail_size > self.tail_chars and len(self.tail) > 1:
+            dropped = self.tail.popleft()
+            self._tail_size -= len(dropped)
+            self._dropped_chars += len(dropped)
+            self._dropped_lines += 1
+
+    @property
+    def truncated(self) -> bool:
+        return self._dropped_lines > 0
+
+    def render(self) -> str:
+        """Return the kept output, with a marker where lines were dropped."""
+        text = "".join(self.head)
+        if self._dropped_lines:
+            text += f"\n... [{self._dropped_lines} lines ({self._dropped_chars} chars) omitted] ...\n"
+        return text + "".join(self.tail)
+
+
+def _pump(stream: IO[bytes], buffer: OutputBuffer, prefix: str) -> None:
+    """Read a pipe line by line into a buffer and the task log."""
+    with stream:
+        for raw in iter(lambda: stream.readline(MAX_LINE_CHARS), b""):
+            line = raw.decode("utf-8", errors="replace")
+            buffer.append(line)
+            log(f"{prefix} {line.rstrip()}")
+
+
+def run_streaming(command: str, timeout: float, head_chars: int, tail_chars: int) -> Dict[str, Any]:
+    """
+    Run a shell command, streaming its output to the task log.
+
+    Args:
+        command: Shell command
+        timeout: Seconds before the command's process group is killed
+        head_chars: Characters kept from the start of each stream
+        tail_chars: Characters kept from the end of each stream
+
+    Returns:
+        Dict with returncode, stdout, stderr, timed_out, truncated and
+        the full stream sizes (stdout_chars, stderr_chars) and duration
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        cwd=str(current_task().cwd),
+        start_new_session=True,
+    )
+    stdout = OutputBuffer(head_chars, tail_chars)
+    stderr = OutputBuffer(head_chars, tail_chars)
+    # Readers run in copies of this context so their log lines reach the
+    # task's log sink (daemon mode)
+    readers = [
+        threading.Thread(target=contextvars.copy_context().run, args=(_pump, proc.stdout, stdout, "  |"), daemon=True),
+        threading.Thread(target=contextvars.copy_context().run, args=(_pump, proc.stderr, stderr, "  !"), daemon=True),
+    ]
+    for reader in readers:
+        reader.start()
+
+    timed_out = False
+    try:
+        proc.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        log(f"Command timed out after {timeout:.0f}s, killing it")
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        proc.wait()
+    for reader in readers:
+        reader.join(timeout=5)
+
+    return {
+        "returncode": proc.returncode,
+        "stdout": stdout.render(),
+        "stderr": stderr.render(),
+        "timed_out": timed_out,
+        "truncated": stdout.truncated or stderr.truncated,
+        "stdout_chars": stdout.total_chars,
+        "stderr_chars": stderr.total_chars,
+        "duration_s": round(time.perf_counter() - start, 3),
+    }
 
 
 @tool
-def execute_shell_command(command: str) -> str:
+def execute_shell_command(command: str) -> dict:
     """
-    Execute a shell command and return the output.
+    Execute a shell command in the project directory.
+
+    Long outputs are shortened to their beginning and end.
 
     Args:
         command: The shell command to execute
 
     Returns:
-        The command output or error message
+        A dict with "returncode" (int, 0 on success), "stdout" and "stderr"
+        (str), and "timed_out" / "truncated" flags
     """
     log(f"Tool: Executing shell command: {command}")
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=300,
-            cwd=str(config.WORKSPACE_DIR)
+        with span("tool.execute_shell_command"), span("subprocess", command=command) as s:
+            result = run_streaming(
+                command,
+                timeout=config.SHELL_TIMEOUT,
+                head_chars=config.SHELL_OUTPUT_HEAD_CHARS,
+                tail_chars=config.SHELL_OUTPUT_TAIL_CHARS,
+            )
+            if s:
+                s.set_attribute("returncode", result["returncode"])
+                s.set_attribute("stdout_chars", result["stdout_chars"])
+                s.set_attribute("stderr_chars", result["stderr_chars"])
+        log(
+            f"Command exited with {result['returncode']} after {result['duration_s']}s "
+            f"({result['stdout_chars']} chars stdout, {result['stderr_chars']} chars stderr"
+            f"{', truncated for the agent' if result['truncated'] else ''})"
         )
-        output = result.stdout if result.returncode == 0 else result.stderr
-        log(f"Command output: {output[:200]}...")
-        return output
+        return result
     except Exception as e:
         error_msg = f"Error executing command: {str(e)}"
         log(error_msg)
-        return error_msg
+        return {"returncode": None, "stdout": "", "stderr": error_msg, "timed_out": False, "truncated": False}
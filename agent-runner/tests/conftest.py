@@ -0,0 +1,10 @@
+"""
+Shared pytest setup for the agent runner tests.
+
+Run from agent-runner/: `python -m pytest tests`
+"""
+import sys
+from pathlib import Path
+
+# Make `src` importable however pytest is invoked
+sys.path.insert(0, str(Path(__file__).parent.parent))
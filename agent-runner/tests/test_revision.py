@@ -0,0 +1,83 @@
+"""
+Test selection for contract revisions.
+"""
+from src.runner.revision import changed_definitions, select_tests
+
+CONTRACT = '''
+from beaker import Application
+from pyteal import *
+
+app = Application("Counter")
+
+
+def helper(value: Expr) -> Expr:
+    return value + Int(1)
+
+
+@app.external
+def increment(*, output: abi.Uint64) -> Expr:
+    return output.set(helper(App.globalGet(Bytes("count"))))
+
+
+@app.external
+def reset() -> Expr:
+    return App.globalPut(Bytes("count"), Int(0))
+'''
+
+TESTS = '''
+def test_increment(app_client):
+    assert app_client.call("increment").return_value == 1
+
+
+def test_reset(app_client):
+    app_client.call("reset")
+'''
+
+
+def test_unchanged_contract_selects_nothing():
+    assert changed_definitions(CONTRACT, CONTRACT) == set()
+    assert select_tests(TESTS, TESTS, set()) == []
+
+
+def test_changed_method_selects_its_tests():
+    revised = CONTRACT.replace('Bytes("count"), Int(0)', 'Bytes("count"), Int(10)')
+
+    changed = changed_definitions(CONTRACT, revised)
+
+    assert changed == {"reset"}
+    assert select_tests(TESTS, TESTS, changed) == ["test_reset"]
+
+
+def test_changed_helper_selects_tests_of_methods_calling_it():
+    revised = CONTRACT.replace("value + Int(1)", "value + Int(2)") + '''
+
+@app.external
+def decrement(*, output: abi.Uint64) -> Expr:
+    return output.set(App.globalGet(Bytes("count")) - Int(1))
+'''
+    new_tests = TESTS + '''
+
+def test_decrement(app_client):
+    app_client.call("decrement")
+'''
+
+    changed = changed_definitions(CONTRACT, revised)
+
+    assert changed == {"helper", "increment", "decrement"}
+    assert select_tests(TESTS, new_tests, changed) == ["test_increment", "test_decrement"]
+
+
+def test_helpers_are_followed_transitively():
+    revised = CONTRACT.replace(
+        "def helper(value: Expr) -> Expr:\n    return value + Int(1)",
+        "def step() -> Expr:\n    return Int(2)\n\n\ndef helper(value: Expr) -> Expr:\n    return value + step()",
+    )
+    revised_again = revised.replace("return Int(2)", "return Int(3)")
+
+    assert changed_definitions(revised, revised_again) == {"step", "helper", "increment"}
+
+
+def test_module_level_change_runs_everything():
+    revised = CONTRACT.replace('Application("Counter")', 'Application("Counter2")')
+
+    assert changed_definitions(CONTRACT, revised) is None
@@ -0,0 +1,48 @@
+"""
+Cold-start regression checks.
+
+The import check always runs: the CLI must not load smolagents or litellm,
+directly or through any module it imports. The wall-clock check depends on
+the machine, so it only runs with STARTUP_BUDGET_CHECK=1 (budget from
+STARTUP_BUDGET_MS).
+"""
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from src.core import config
+from src.core.startup import PHASE_IMPORTS, ROOT, parse_importtime
+from src.main import run_startup_profile
+
+
+def test_cli_start_loads_no_phase_imports():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [str(ROOT), os.getenv("PYTHONPATH")])))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", str(ROOT / "src" / "main.py"), "--prompt", " "],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=str(ROOT),
+    )
+
+    # The empty prompt is rejected with exit code 2 once the CLI is up; anything else means it crashed
+    assert proc.returncode == 2, proc.stderr[-2000:]
+    loaded = {entry["module"] for entry in parse_importtime(proc.stderr)}
+    assert loaded, "no -X importtime output"
+    heavy = sorted(m for m in loaded if m.split(".")[0] in PHASE_IMPORTS)
+    assert not heavy, f"loaded at startup: {', '.join(heavy)}"
+
+
+@pytest.mark.skipif(os.getenv("STARTUP_BUDGET_CHECK") != "1", reason="set STARTUP_BUDGET_CHECK=1 to time startup")
+def test_cold_start_within_budget(tmp_path):
+    path = tmp_path / "startup.json"
+
+    exit_code = run_startup_profile(path, config.STARTUP_BUDGET_MS)
+
+    report = json.loads(path.read_text())
+    assert report["cli"]["exit_code"] == 2
+    assert report["cli"]["wall_ms"] <= config.STARTUP_BUDGET_MS, f"cold start took {report['cli']['wall_ms']} ms"
+    assert exit_code == 0
@@ -1,16 +1,32 @@
 """
 API endpoints for smart contract generation.
 """
-from fastapi import APIRouter, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
 from app.schemas import (
     GenerateRequest,
     GenerateResponse,
+    ReviseRequest,
     TaskStatusResponse,
+    BulkStatusRequest,
+    BulkStatusResponse,
     HealthResponse,
 )
-from app.services import task_manager, agent_executor
-from app.services.payment_verifier import payment_verifier
+from app.models import TaskStatus
+from app.services import (
+    task_manager,
+    agent_executor,
+    llm_metrics,
+    artifact_repository,
+    payment_verifier,
+    PaymentLookupError,
+    generation_coalescer,
+    IdempotencyKeyReused,
+)
 from app.core.config import settings
+from app.core.responses import etag_matches, json_response, not_modified
 from app.core.logging import get_logger
 
 logger = get_logger(__name__)
@@ -32,7 +48,12 @@ async def health_check():
 
 
 @router.post("/generate", response_model=GenerateResponse, tags=["tasks"])
-async def generate_contract(request: GenerateRequest):
+async def generate_contract(
+    request: GenerateRequest,
+    idempotency_key: Optional[str] = Header(
+        None, description="Client-chosen key; retries with the same key return the same task"
+    ),
+):
     """
     Generate and deploy a smart contract from a natural language prompt.
 
@@ -42,8 +63,13 @@ async def generate_contract(request: GenerateRequest):
     3. Create tests
     4. Deploy to Algorand LocalNet
 
+    If the same prompt is already being generated, the new task shares
+    that execution and mirrors its logs and result. Requests carrying an
+    Idempotency-Key already seen return the task created for that key.
+
     Args:
         request: Generation request with prompt
+        idempotency_key: Optional Idempotency-Key header
 
     Returns:
         Task ID for tracking progress
@@ -59,18 +85,58 @@ async def generate_contract(request: GenerateRequest):
             detail="Prompt cannot be empty"
         )
 
-    # Verify payment if transaction ID provided
-    if hasattr(request, 'payment_txn_id') and request.payment_txn_id:
-        if not hasattr(request, 'wallet_address') or not request.wallet_address:
+    if not idempotency_key:
+        return GenerateResponse(task_id=await _start_generation(request, prompt))
+
+    fingerprint = generation_coalescer.fingerprint(prompt, request.payment_txn_id, request.wallet_address)
+    try:
+        task_id = await generation_coalescer.once(
+            idempotency_key, fingerprint, lambda: _start_generation(request, prompt)
+        )
+    except IdempotencyKeyReused as e:
+        raise HTTPException(
+            status_code=422,  # Unprocessable Content
+            detail=str(e)
+        )
+
+    return GenerateResponse(task_id=task_id)
+
+
+async def _start_generation(request: GenerateRequest, prompt: str) -> str:
+    """
+    Verify the payment (if any), then create and start a generation task.
+
+    Args:
+        request: Generation request
+        prompt: Stripped prompt
+
+    Returns:
+        ID of the created task
+
+    Raises:
+        HTTPException: If the payment is invalid or task creation fails
+    """
+    # Verify payment if transaction ID provided; a verified payment is
+    # marked as spent so it pays for this task only
+    claimed_txn_id = None
+    if request.payment_txn_id:
+        if not request.wallet_address:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="wallet_address required when payment_txn_id is provided"
             )
 
-        verification = payment_verifier.verify_payment(
-            request.payment_txn_id,
-            request.wallet_address
-        )
+        try:
+            verification = await payment_verifier.claim_payment(
+                request.payment_txn_id,
+                request.wallet_address
+            )
+        except PaymentLookupError as e:
+            logger.error(f"Payment lookup failed for {request.payment_txn_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Payment could not be verified right now, please retry"
+            )
 
         if not verification["verified"]:
             raise HTTPException(
@@ -78,34 +144,75 @@ async def generate_contract(request: GenerateRequest):
                 detail=f"Payment verification failed: {verification.get('message', 'Unknown error')}"
             )
 
+        claimed_txn_id = request.payment_txn_id
         logger.info(f"Payment verified: {request.payment_txn_id} from {request.wallet_address}")
 
     try:
         # Create task
         task = task_manager.create_task(prompt)
 
-        # Start agent execution in background
-        agent_executor.execute_task(task.id, prompt)
+        # Start agent execution in background, or share a running one
+        generation_coalescer.start(task.id, prompt, paid=claimed_txn_id is not None)
 
         logger.info(f"Created and started task {task.id} for prompt: {prompt[:50]}...")
 
-        return GenerateResponse(task_id=task.id)
+        return task.id
 
     except Exception as e:
         logger.error(f"Failed to create task: {e}")
+        if claimed_txn_id:
+            await payment_verifier.release_payment(claimed_txn_id)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to create task: {str(e)}"
         )
 
 
+@router.post("/status/bulk", response_model=BulkStatusResponse, tags=["tasks"])
+async def get_bulk_status(body: BulkStatusRequest, request: Request):
+    """
+    Get the status of many tasks in one request.
+
+    Meant for dashboards following many tasks: all tasks are read in one
+    consistent pass over the task store, only the requested fields are
+    returned, and logs can be fetched incrementally with per-task cursors.
+
+    Args:
+        body: Task IDs, log cursors and field mask
+        request: Incoming request
+
+    Returns:
+        The requested fields of every known task, and the unknown task IDs
+    """
+    snapshots, missing = task_manager.get_snapshots(
+        dict.fromkeys(body.task_ids), body.fields, body.log_cursors
+    )
+
+    return json_response(request, {"tasks": snapshots, "missing": missing})
+
+
 @router.get("/status/{task_id}", response_model=TaskStatusResponse, tags=["tasks"])
-async def get_task_status(task_id: str):
+async def get_task_status(
+    task_id: str,
+    request: Request,
+    wait: float = Query(0, ge=0, description="Seconds to wait for a change of the version named in If-None-Match"),
+):
     """
     Get the status and results of a task.
 
+    The payload is built from the task directly (no re-validation against
+    the response model) and compressed when the client accepts it.
+
+    Every response carries an ETag naming the task's version. A request
+    whose If-None-Match names the current version gets an empty 304. With
+    ``wait``, such a request is instead held open (up to STATUS_MAX_WAIT_S)
+    until the task changes, so clients see updates as they happen without
+    polling in a tight loop; it ends with a 304 if nothing changed.
+
     Args:
         task_id: Unique task identifier
+        request: Incoming request
+        wait: Seconds to wait for a change (long polling)
 
     Returns:
         Task status, logs, and results
@@ -121,12 +228,34 @@ async def get_task_status(task_id: str):
             detail=f"Task {task_id} not found"
         )
 
-    return TaskStatusResponse(
-        status=task.status.value,
-        logs=task.logs,
-        result=task.result,
-        error=task.error,
-    )
+    if_none_match = request.headers.get("if-none-match")
+    version = task.version
+    finished = task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED)
+    if wait > 0 and not finished and etag_matches(if_none_match, _task_etag(version)):
+        task = await task_manager.wait_for_change(task_id, version, min(wait, settings.STATUS_MAX_WAIT_S))
+        if not task:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task {task_id} not found"
+            )
+        version = task.version
+
+    # no-cache: browsers keep the body but revalidate it with If-None-Match
+    headers = {"ETag": _task_etag(version), "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+
+    return json_response(request, {
+        "status": task.status.value,
+        "logs": task.logs,
+        "result": task.result,
+        "error": task.error,
+    }, headers=headers)
+
+
+def _task_etag(version: int) -> str:
+    """ETag of a task version (weak, since the body's encoding is negotiated)."""
+    return f'W/"{version}"'
 
 
 @router.delete("/tasks/{task_id}", tags=["tasks"])
@@ -156,17 +285,215 @@ async def delete_task(task_id: str):
     return {"message": f"Task {task_id} deleted successfully"}
 
 
+@router.post("/tasks/{task_id}/retry", response_model=GenerateResponse, tags=["tasks"])
+async def retry_task(task_id: str):
+    """
+    Retry a failed task from its last completed phase.
+
+    The agent reuses what the failed run produced (project, plan, contract,
+    test results, artifacts) and runs only the phases that did not
+    complete, e.g. just the deployment after LocalNet was unreachable.
+    A task that shared the execution of another (identical) request
+    retries that execution, together with every task sharing it.
+
+    Args:
+        task_id: Unique task identifier
+
+    Returns:
+        The retried task's ID
+
+    Raises:
+        HTTPException: If task not found or has not failed
+    """
+    task = task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    # The checkpoint belongs to the execution that ran, which a coalesced task shares
+    execution_id = task_manager.restart_task(task_id)
+    if execution_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} has not failed, only failed tasks can be retried"
+        )
+
+    agent_executor.execute_task(execution_id, task.prompt, resume=True, revise_of=task.revision_of)
+    logger.info(f"Retrying task {task_id} (execution {execution_id})")
+
+    return GenerateResponse(task_id=task_id)
+
+
+@router.post("/tasks/{task_id}/revise", response_model=GenerateResponse, tags=["tasks"])
+async def revise_task(task_id: str, body: ReviseRequest):
+    """
+    Change the contract of a completed task.
+
+    A new task copies the task's project (contract, plan and tests) and has
+    the agent edit only what the instruction asks for; only the tests the
+    change can affect are run before the contract is deployed again.
+
+    Args:
+        task_id: Task whose contract to change
+        body: Revision request
+
+    Returns:
+        ID of the revision task
+
+    Raises:
+        HTTPException: If the instruction is empty, the task is not found or has not completed
+    """
+    instruction = body.instruction.strip()
+
+    if not instruction:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Instruction cannot be empty"
+        )
+
+    task = task_manager.get_task(task_id)
+
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    if task.status != TaskStatus.COMPLETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Task {task_id} has not completed, only completed tasks can be revised"
+        )
+
+    # The project belongs to the execution that produced it, which a coalesced task shares
+    execution_id = task_manager.execution_of(task_id)
+    revision = task_manager.create_task(instruction, revision_of=execution_id)
+    task_manager.add_task_log(revision.id, f"Revising the contract of task {task_id}")
+    agent_executor.execute_task(revision.id, instruction, revise_of=execution_id)
+    logger.info(f"Created revision task {revision.id} of task {task_id}")
+
+    return GenerateResponse(task_id=revision.id)
+
+
 @router.get("/tasks", tags=["tasks"])
-async def list_tasks():
+async def list_tasks(request: Request):
     """
     List all tasks.
 
+    Args:
+        request: Incoming request
+
     Returns:
         List of all tasks with their details
     """
     tasks = task_manager.get_all_tasks()
 
-    return {
+    return json_response(request, {
         "count": len(tasks),
         "tasks": [task.to_dict() for task in tasks.values()]
-    }
+    })
+
+
+@router.get("/metrics/llm", tags=["metrics"])
+async def get_llm_metrics():
+    """
+    Get LLM metrics aggregated per agent phase.
+
+    Returns:
+        Call counts, token usage, latency, retries and step usage per phase
+        across all completed tasks, plus phases ordered by average latency
+    """
+    return llm_metrics.snapshot()
+
+
+@router.get("/artifacts/{key}", tags=["artifacts"])
+async def get_artifact_manifest(key: str):
+    """
+    Get the manifest of a compiled contract in the artifact store.
+
+    Args:
+        key: Artifact key (the "artifacts.key" of a task result)
+
+    Returns:
+        Compiler version and the size and SHA-256 of every stored file
+
+    Raises:
+        HTTPException: If there is no such artifact
+    """
+    manifest = artifact_repository.manifest(key)
+
+    if manifest is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact {key} not found"
+        )
+
+    return manifest
+
+
+@router.get("/artifacts/{key}/{name}", tags=["artifacts"])
+async def download_artifact(key: str, name: str):
+    """
+    Download a file of a compiled contract.
+
+    The file is streamed from the artifact volume in chunks, never read
+    into memory as a whole.
+
+    Args:
+        key: Artifact key
+        name: File name from the manifest (e.g. approval.teal, application.json)
+
+    Returns:
+        The file contents
+
+    Raises:
+        HTTPException: If there is no such file
+    """
+    path = artifact_repository.file_path(key, name)
+
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact file {key}/{name} not found"
+        )
+
+    return FileResponse(path, filename=name)
+
+
+@router.get("/tasks/{task_id}/artifacts/{name}", tags=["artifacts"])
+async def download_task_artifact(task_id: str, name: str):
+    """
+    Download a file stored for one task, such as test_results.json.
+
+    Compiled contracts are shared by every task with the same source; what
+    a task found out about its contract is stored for that task only.
+
+    Args:
+        task_id: Unique task identifier
+        name: File name from the result's "artifacts.task_files"
+
+    Returns:
+        The file contents
+
+    Raises:
+        HTTPException: If task or file not found
+    """
+    if task_manager.get_task(task_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task {task_id} not found"
+        )
+
+    # Files are written by the execution, which a coalesced task shares
+    path = artifact_repository.task_file_path(task_manager.execution_of(task_id), name)
+
+    if path is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Artifact file {name} of task {task_id} not found"
+        )
+
+    return FileResponse(path, filename=name)
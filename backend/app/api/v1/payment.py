@@ -0,0 +1,59 @@
+"""
+API endpoints for deployment payments.
+"""
+from decimal import Decimal
+
+from fastapi import APIRouter, HTTPException, status
+from app.schemas import PaymentVerifyRequest, PaymentVerificationResponse, PaymentConfigResponse
+from app.services import payment_verifier, PaymentLookupError
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+router = APIRouter()
+
+
+@router.post("/verify-payment", response_model=PaymentVerificationResponse)
+async def verify_payment(request: PaymentVerifyRequest):
+    """
+    Verify a deployment payment on-chain.
+
+    The payment is only checked, not used up; it is redeemed by /generate.
+
+    Args:
+        request: Transaction ID and the wallet that sent it
+
+    Returns:
+        Whether the payment is valid and unused, and the amount paid
+
+    Raises:
+        HTTPException: If the indexer and algod cannot be reached
+    """
+    try:
+        verification = await payment_verifier.verify_payment(
+            request.transaction_id,
+            request.wallet_address
+        )
+    except PaymentLookupError as e:
+        logger.error(f"Payment lookup failed for {request.transaction_id}: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Payment could not be verified right now, please retry"
+        )
+
+    return PaymentVerificationResponse(**verification)
+
+
+@router.get("/payment-config", response_model=PaymentConfigResponse)
+async def get_payment_config():
+    """
+    Get the payment configuration used by the frontend.
+
+    Returns:
+        Receiver address and deployment cost in ALGO
+    """
+    return PaymentConfigResponse(
+        receiver_address=settings.PAYMENT_RECEIVER_ADDRESS,
+        deployment_cost=float(Decimal(settings.DEPLOYMENT_COST_ALGO)),
+    )
@@ -52,9 +52,49 @@ class Settings(BaseSettings):
     PAYMENT_RECEIVER_ADDRESS: str = os.getenv("PAYMENT_RECEIVER_ADDRESS", "")
     DEPLOYMENT_COST_ALGO: str = os.getenv("DEPLOYMENT_COST_ALGO", "0.5")
 
+    # Payment verification: spent-txid database, cache of confirmed payments
+    # and the pooled indexer/algod HTTP client
+    PAYMENT_SPENT_DB: str = os.getenv("PAYMENT_SPENT_DB", "data/payments.sqlite3")
+    PAYMENT_CACHE_SIZE: int = int(os.getenv("PAYMENT_CACHE_SIZE", "10000"))
+    PAYMENT_CACHE_TTL_S: float = float(os.getenv("PAYMENT_CACHE_TTL_S", "3600"))
+    PAYMENT_HTTP_TIMEOUT_S: float = float(os.getenv("PAYMENT_HTTP_TIMEOUT_S", "5"))
+    PAYMENT_HTTP_MAX_CONNECTIONS: int = int(os.getenv("PAYMENT_HTTP_MAX_CONNECTIONS", "20"))
+
+    # Payment watcher: follows algod's blocks and indexes incoming payments locally
+    PAYMENT_WATCHER_ENABLED: bool = os.getenv("PAYMENT_WATCHER_ENABLED", "true").lower() == "true"
+    PAYMENT_INDEX_DB: str = os.getenv("PAYMENT_INDEX_DB", "data/payment_index.sqlite3")
+    PAYMENT_WATCHER_LOOKBACK_ROUNDS: int = int(os.getenv("PAYMENT_WATCHER_LOOKBACK_ROUNDS", "1000"))
+    PAYMENT_WATCHER_CATCHUP_CONCURRENCY: int = int(os.getenv("PAYMENT_WATCHER_CATCHUP_CONCURRENCY", "8"))
+
+    # Responses: bodies from this size on are compressed (brotli or gzip, as negotiated);
+    # low levels keep most of the size reduction of log-heavy payloads at a fraction of the CPU
+    RESPONSE_COMPRESSION_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+    RESPONSE_GZIP_LEVEL: int = int(os.getenv("RESPONSE_GZIP_LEVEL", "1"))
+    RESPONSE_BROTLI_QUALITY: int = int(os.getenv("RESPONSE_BROTLI_QUALITY", "1"))
+
+    # Longest a /status request with ?wait= is held open waiting for the task to change
+    STATUS_MAX_WAIT_S: float = float(os.getenv("STATUS_MAX_WAIT_S", "30"))
+
+    # /generate: identical prompts arriving while one is running share its execution;
+    # Idempotency-Key headers are remembered this long
+    GENERATE_COALESCING_ENABLED: bool = os.getenv("GENERATE_COALESCING_ENABLED", "true").lower() == "true"
+    IDEMPOTENCY_KEY_TTL_S: float = float(os.getenv("IDEMPOTENCY_KEY_TTL_S", "86400"))
+    IDEMPOTENCY_MAX_KEYS: int = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+
     # Logging
     LOG_LEVEL: str = "INFO"
 
+    # Tracing: OTLP-JSON span files are written here, one per task
+    TRACE_DIR: str = os.getenv("TRACE_DIR", "/tmp/algorand-agent-traces")
+
+    # Artifact store: a named volume shared with the agent containers
+    ARTIFACT_DIR: str = os.getenv("ARTIFACT_DIR", "/artifacts")
+    ARTIFACT_VOLUME: str = os.getenv("ARTIFACT_VOLUME", "algorand-agent-artifacts")
+
+    # Agent workspace: a named volume keeping task projects and phase
+    # checkpoints between containers, so failed tasks can be retried
+    WORKSPACE_VOLUME: str = os.getenv("WORKSPACE_VOLUME", "algorand-agent-workspace")
+
     class Config:
         case_sensitive = True
         env_file = ".env"
@@ -0,0 +1,138 @@
+"""
+Fast JSON responses with negotiated compression.
+
+Task payloads are built by the backend itself, so they are encoded directly
+(with orjson when it is installed, pydantic-core's Rust encoder otherwise)
+instead of being validated again against the response model. Bodies above RESPONSE_COMPRESSION_MIN_BYTES are
+compressed with brotli or gzip, whichever the client prefers of those
+available.
+
+Task payloads also carry an ETag; a request whose If-None-Match still
+names it gets an empty 304 instead.
+"""
+import gzip
+from typing import Any, Dict, Optional
+
+import pydantic_core
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .config import settings
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Encodings we can produce, in order of preference on equal q-values
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return pydantic_core.to_json(payload)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick a content encoding from an Accept-Encoding header.
+
+    Args:
+        accept_encoding: Header value, e.g. "gzip, deflate, br;q=0.9"
+
+    Returns:
+        "br", "gzip" or None for an uncompressed response
+    """
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if name:
+            weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """Compress a body with a negotiated encoding."""
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.RESPONSE_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.RESPONSE_GZIP_LEVEL, mtime=0)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against the current ETag.
+
+    Args:
+        if_none_match: Header value, e.g. 'W/"3", W/"4"' or "*"
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparison is weak: W/"x" and "x" name the same version
+    current = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == current:
+            return True
+    return False
+
+
+def not_modified(headers: Optional[Dict[str, str]] = None) -> Response:
+    """Build an empty 304 response (headers should include the ETag)."""
+    return Response(status_code=304, headers={"Vary": "Accept-Encoding", **(headers or {})})
+
+
+def json_response(
+    request: Request,
+    payload: Any,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+) -> Response:
+    """
+    Build a JSON response from trusted data, compressed if the client accepts it.
+
+    Args:
+        request: Incoming request (its Accept-Encoding is honoured)
+        payload: JSON-serializable data built by the backend
+        status_code: HTTP status
+        headers: Extra response headers
+
+    Returns:
+        Response with the encoded (and possibly compressed) body
+    """
+    body = dumps(payload)
+    response_headers = {"Vary": "Accept-Encoding", **(headers or {})}
+    if len(body) >= settings.RESPONSE_COMPRESSION_MIN_BYTES:
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is not None:
+            body = compress(body, encoding)
+            response_headers["Content-Encoding"] = encoding
+    return Response(content=body, status_code=status_code, headers=response_headers, media_type="application/json")
@@ -0,0 +1,143 @@
+"""
+Lightweight per-task tracing.
+
+Spans use the monotonic high-resolution clock and are exported as
+OTLP-JSON. The trace ID is handed to the agent container so that runner
+spans join the same trace.
+"""
+import json
+import secrets
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+class Span:
+    """A single timed operation."""
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        """
+        Start a span.
+
+        Args:
+            name: Span name (e.g. "container.start")
+            trace_id: 32-hex-digit trace identifier
+            parent_id: Span ID of the parent span, if any
+            attributes: Initial span attributes
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes = dict(attributes)
+        self.error: Optional[str] = None
+        self.start_unix_ns = time.time_ns()
+        self._start_ns = time.perf_counter_ns()
+        self.duration_ns: Optional[int] = None
+
+    def end(self, error: Optional[str] = None) -> None:
+        """
+        End the span (idempotent).
+
+        Args:
+            error: Error message if the operation failed
+        """
+        if self.duration_ns is None:
+            self.duration_ns = time.perf_counter_ns() - self._start_ns
+            self.error = error
+
+    @property
+    def duration_ms(self) -> float:
+        """Span duration in milliseconds (so far, if still open)."""
+        duration = self.duration_ns if self.duration_ns is not None else time.perf_counter_ns() - self._start_ns
+        return duration / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to its OTLP-JSON representation."""
+        duration = self.duration_ns if self.duration_ns is not None else time.perf_counter_ns() - self._start_ns
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_unix_ns),
+            "endTimeUnixNano": str(self.start_unix_ns + duration),
+            "attributes": [
+                {"key": k, "value": {"stringValue": str(v)}} for k, v in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Tracer:
+    """Collects the spans of one task."""
+
+    def __init__(self, trace_id: Optional[str] = None, service_name: str = "backend"):
+        """
+        Initialize a tracer.
+
+        Args:
+            trace_id: Trace identifier (generated if omitted)
+            service_name: Service name recorded in the exported resource
+        """
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.service_name = service_name
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes: Any) -> Span:
+        """
+        Start a span.
+
+        Args:
+            name: Span name
+            parent: Parent span, if any
+            **attributes: Span attributes
+
+        Returns:
+            The started span
+        """
+        span = Span(name, self.trace_id, parent.span_id if parent else None, attributes)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    def export(self, path: Path) -> Path:
+        """
+        Write all spans to an OTLP-JSON file.
+
+        Args:
+            path: Output file
+
+        Returns:
+            The written path
+        """
+        with self._lock:
+            spans = [s.to_otlp() for s in self.spans]
+        payload = {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+                "scopeSpans": [{"scope": {"name": self.service_name}, "spans": spans}],
+            }]
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(payload))
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize span durations.
+
+        Returns:
+            Trace ID and duration in ms of every span, keyed by name
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "spans": {s.name: round(s.duration_ms, 3) for s in spans},
+        }
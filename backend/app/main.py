@@ -6,6 +6,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
 from app.api.v1 import endpoints, payment
+from app.services import payment_verifier, payment_watcher
 
 # Setup logging
 setup_logging()
@@ -50,12 +51,16 @@ async def startup_event():
     logger.info(f"Starting {settings.APP_NAME} v{settings.APP_VERSION}")
     logger.info(f"Agent image: {settings.AGENT_IMAGE}")
     logger.info(f"Docker network: {settings.DOCKER_NETWORK}")
+    if settings.PAYMENT_WATCHER_ENABLED and settings.PAYMENT_RECEIVER_ADDRESS:
+        payment_watcher.start()
 
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info(f"Shutting down {settings.APP_NAME}")
+    await payment_watcher.stop()
+    await payment_verifier.close()
 
 
 # Root endpoint
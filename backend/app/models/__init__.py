@@ -1,4 +1,4 @@
 """Data models."""
-from .task import Task, TaskStatus
+from .task import Task, TaskStatus, SNAPSHOT_FIELDS
 
-__all__ = ["Task", "TaskStatus"]
+__all__ = ["Task", "TaskStatus", "SNAPSHOT_FIELDS"]
@@ -3,8 +3,9 @@ Task model for managing smart contract generation tasks.
 """
 import time
 import uuid
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, List, Optional
 from enum import Enum
+from app.core.tracing import Tracer
 
 
 class TaskStatus(str, Enum):
@@ -15,29 +16,45 @@ class TaskStatus(str, Enum):
     FAILED = "failed"
 
 
+# Fields a status snapshot can contain
+SNAPSHOT_FIELDS = ("status", "logs", "result", "error", "version", "prompt", "created_at", "updated_at")
+
+
 class Task:
     """Represents a smart contract generation task."""
 
-    def __init__(self, prompt: str):
+    def __init__(self, prompt: str, revision_of: Optional[str] = None):
         """
         Initialize a new task.
 
         Args:
             prompt: The user's natural language prompt
+            revision_of: Task whose contract the prompt asks to change, for a revision
         """
         self.id: str = str(uuid.uuid4())
         self.prompt: str = prompt
+        self.revision_of: Optional[str] = revision_of
+        # Task whose agent execution this task shares (itself unless it was coalesced)
+        self.execution_id: str = self.id
         self.status: TaskStatus = TaskStatus.PENDING
         self.logs: List[str] = []
         self.result: Optional[Dict[str, Any]] = None
         self.created_at: float = time.time()
         self.updated_at: float = time.time()
         self.error: Optional[str] = None
+        # Incremented on every change; clients see it as the ETag of the status
+        self.version: int = 0
+        self.tracer: Tracer = Tracer(trace_id=uuid.UUID(self.id).hex)
+
+    def _touch(self) -> None:
+        """Record a change."""
+        self.version += 1
+        self.updated_at = time.time()
 
     def update_status(self, status: TaskStatus) -> None:
         """Update task status."""
         self.status = status
-        self.updated_at = time.time()
+        self._touch()
 
     def add_log(self, message: str) -> None:
         """Add a log message."""
@@ -47,28 +64,67 @@ class Task:
             self.logs.extend(lines)
         else:
             self.logs.append(str(message))
-        self.updated_at = time.time()
+        self._touch()
 
     def set_result(self, result: Dict[str, Any]) -> None:
         """Set the task result."""
         self.result = result
-        self.updated_at = time.time()
+        self._touch()
 
     def set_error(self, error: str) -> None:
         """Set task error."""
         self.error = error
         self.status = TaskStatus.FAILED
-        self.updated_at = time.time()
+        self._touch()
+
+    def restart(self) -> None:
+        """Make a failed task pending again, keeping its logs."""
+        self.status = TaskStatus.PENDING
+        self.result = None
+        self.error = None
+        self.add_log("Retrying task from its last completed phase...")
+
+    def copy_state(self, other: "Task") -> None:
+        """Take over the status, logs, result and error of another task."""
+        self.status = other.status
+        self.logs = list(other.logs)
+        self.result = other.result
+        self.error = other.error
+        self._touch()
+
+    def snapshot(self, fields: Iterable[str], log_cursor: int = 0) -> Dict[str, Any]:
+        """
+        Copy selected fields of the task.
+
+        Args:
+            fields: Names from SNAPSHOT_FIELDS to include
+            log_cursor: Log lines the caller already has; only later lines are copied
+
+        Returns:
+            The fields; with "logs", also "log_cursor" (the cursor for the next call)
+        """
+        data: Dict[str, Any] = {}
+        for field in fields:
+            if field == "status":
+                data["status"] = self.status.value
+            elif field == "logs":
+                data["logs"] = self.logs[max(0, log_cursor):]
+                data["log_cursor"] = len(self.logs)
+            else:
+                data[field] = getattr(self, field)
+        return data
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert task to dictionary."""
         return {
             "id": self.id,
             "prompt": self.prompt,
+            "revision_of": self.revision_of,
             "status": self.status.value,
             "logs": self.logs,
             "result": self.result,
             "error": self.error,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
+            "version": self.version,
         }
@@ -2,13 +2,25 @@
 from .task import (
     GenerateRequest,
     GenerateResponse,
+    ReviseRequest,
     TaskStatusResponse,
+    BulkStatusRequest,
+    BulkStatusResponse,
     HealthResponse,
+    PaymentVerifyRequest,
+    PaymentVerificationResponse,
+    PaymentConfigResponse,
 )
 
 __all__ = [
     "GenerateRequest",
     "GenerateResponse",
+    "ReviseRequest",
     "TaskStatusResponse",
+    "BulkStatusRequest",
+    "BulkStatusResponse",
     "HealthResponse",
+    "PaymentVerifyRequest",
+    "PaymentVerificationResponse",
+    "PaymentConfigResponse",
 ]
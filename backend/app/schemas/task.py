@@ -1,7 +1,7 @@
 """
 Pydantic schemas for API request/response models.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Literal, Optional
 from pydantic import BaseModel, Field
 
 
@@ -33,6 +33,18 @@ class GenerateResponse(BaseModel):
         }
 
 
+class ReviseRequest(BaseModel):
+    """Request model for a revision of a generated contract."""
+    instruction: str = Field(..., min_length=1, description="Change to make to the task's contract")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "instruction": "Also add a decrement method"
+            }
+        }
+
+
 class TaskStatusResponse(BaseModel):
     """Response model for task status."""
     status: str = Field(..., description="Task status: pending, in_progress, completed, or failed")
@@ -61,6 +73,43 @@ class TaskStatusResponse(BaseModel):
         }
 
 
+TaskField = Literal["status", "logs", "result", "error", "version", "prompt", "created_at", "updated_at"]
+
+
+class BulkStatusRequest(BaseModel):
+    """Request model for the status of several tasks."""
+    task_ids: List[str] = Field(..., min_length=1, max_length=1000, description="Tasks to report on")
+    log_cursors: Dict[str, int] = Field(
+        default={},
+        description="Per task ID, the log lines already received (the log_cursor of the previous response); "
+                    "only later lines are returned"
+    )
+    fields: List[TaskField] = Field(
+        default=["status", "logs", "result", "error", "version"],
+        min_length=1,
+        description="Fields to return for each task"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "task_ids": ["550e8400-e29b-41d4-a716-446655440000", "6fa459ea-ee8a-3ca4-894e-db77e160355e"],
+                "log_cursors": {"550e8400-e29b-41d4-a716-446655440000": 42},
+                "fields": ["status", "logs", "version"]
+            }
+        }
+
+
+class BulkStatusResponse(BaseModel):
+    """Response model for the status of several tasks."""
+    tasks: Dict[str, Dict[str, Any]] = Field(
+        ...,
+        description="Requested fields by task ID, read at one point in time; with logs, "
+                    "log_cursor is the cursor to send next"
+    )
+    missing: List[str] = Field(default=[], description="Requested task IDs that do not exist")
+
+
 class HealthResponse(BaseModel):
     """Response model for health check."""
     status: str = Field(..., description="Service health status")
@@ -73,3 +122,31 @@ class HealthResponse(BaseModel):
                 "version": "1.0.0"
             }
         }
+
+
+class PaymentVerifyRequest(BaseModel):
+    """Request model for payment verification."""
+    transaction_id: str = Field(..., min_length=1, description="Algorand payment transaction ID")
+    wallet_address: str = Field(..., min_length=1, description="Wallet address that sent the payment")
+
+
+class PaymentVerificationResponse(BaseModel):
+    """Response model for payment verification."""
+    verified: bool = Field(..., description="Whether the payment is valid and unused")
+    amount: float = Field(..., description="Amount paid in ALGO")
+    message: Optional[str] = Field(None, description="Reason the payment was rejected, if it was")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "verified": True,
+                "amount": 0.5,
+                "message": "Payment verified"
+            }
+        }
+
+
+class PaymentConfigResponse(BaseModel):
+    """Response model for the payment configuration."""
+    receiver_address: str = Field(..., description="Address deployment payments are sent to")
+    deployment_cost: float = Field(..., description="Cost of one deployment in ALGO")
@@ -1,10 +1,27 @@
 """Services module."""
 from .task_manager import task_manager, TaskManager
 from .agent_executor import agent_executor, AgentExecutor
+from .metrics import llm_metrics, LLMMetricsAggregator
+from .artifacts import artifact_repository, ArtifactRepository
+from .payment_verifier import payment_verifier, PaymentVerifier, PaymentLookupError, payment_watcher
+from .payment_watcher import PaymentWatcher
+from .coalescing import generation_coalescer, GenerationCoalescer, IdempotencyKeyReused
 
 __all__ = [
     "task_manager",
     "TaskManager",
     "agent_executor",
     "AgentExecutor",
+    "llm_metrics",
+    "LLMMetricsAggregator",
+    "artifact_repository",
+    "ArtifactRepository",
+    "payment_verifier",
+    "PaymentVerifier",
+    "PaymentLookupError",
+    "payment_watcher",
+    "PaymentWatcher",
+    "generation_coalescer",
+    "GenerationCoalescer",
+    "IdempotencyKeyReused",
 ]
@@ -6,14 +6,40 @@ import json
 import subprocess
 import threading
 import time
+from pathlib import Path
 from typing import Optional, Dict, Any
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.core.tracing import Span, Tracer
 from app.models import TaskStatus
 from app.services.task_manager import task_manager
+from app.services.metrics import llm_metrics
 
 logger = get_logger(__name__)
 
+# Runner settings (agent-runner/src/core/config.py) passed on to agent containers:
+# LLM credentials and retries, speculative coding, early exit, the template fast
+# path, shell tool limits, documentation search and the scaffold template
+RUNNER_ENV_PREFIXES = (
+    "AZURE_OPENAI_",
+    "LLM_",
+    "SPECULATIVE_",
+    "EARLY_EXIT",
+    "TEMPLATE_",
+    "SHELL_",
+    "DOCS_",
+    "SCAFFOLD_",
+    "WORKSPACE_GC_",
+    "WORKSPACE_RETENTION_",
+)
+RUNNER_ENV_KEYS = {
+    "OPENAI_API_KEY",
+    "OPENAI_API_BASE",
+    "OPENAI_API_VERSION",
+    "OPENAI_DEPLOYMENT",
+    "LITELLM_LOG",
+}
+
 
 class AgentExecutor:
     """Service for executing agent containers."""
@@ -23,35 +49,79 @@ class AgentExecutor:
         self.image = settings.AGENT_IMAGE
         self.network = settings.DOCKER_NETWORK
 
-    def execute_task(self, task_id: str, prompt: str) -> None:
+    def execute_task(
+        self,
+        task_id: str,
+        prompt: str,
+        resume: bool = False,
+        revise_of: Optional[str] = None,
+    ) -> None:
         """
         Execute a task in a background thread.
 
         Args:
             task_id: Task identifier
             prompt: User's prompt
+            resume: Continue a failed task from its last completed phase
+            revise_of: Task whose contract the prompt asks to change, for a revision
         """
+        task = task_manager.get_task(task_id)
+        # Tasks are not queued: this only covers handing the task to its thread
+        dispatch_span = task.tracer.start_span("dispatch") if task else None
+
         thread = threading.Thread(
-            target=self._run_agent_container,
-            args=(task_id, prompt),
+            target=self._run_execution,
+            args=(task_id, prompt, dispatch_span, resume, revise_of),
             daemon=True
         )
         thread.start()
         logger.info(f"Started agent execution thread for task {task_id}")
 
-    def _run_agent_container(self, task_id: str, prompt: str) -> None:
+    def _run_execution(self, task_id: str, *args: Any) -> None:
+        """Run the agent container for a task, then release the task's followers."""
+        try:
+            self._run_agent_container(task_id, *args)
+        finally:
+            task_manager.finish_execution(task_id)
+
+    def _run_agent_container(
+        self,
+        task_id: str,
+        prompt: str,
+        dispatch_span: Optional[Span] = None,
+        resume: bool = False,
+        revise_of: Optional[str] = None,
+    ) -> None:
         """
         Run the agent container for a specific task.
 
         Args:
             task_id: Task identifier
             prompt: User's prompt
+            dispatch_span: Span from execute_task() until this thread runs
+            resume: Continue a failed task from its last completed phase
+            revise_of: Task whose contract the prompt asks to change, for a revision
         """
+        if dispatch_span:
+            dispatch_span.end()
+
         task_manager.update_task_status(task_id, TaskStatus.IN_PROGRESS)
         task_manager.add_task_log(task_id, f"Starting task {task_id}...")
 
+        task = task_manager.get_task(task_id)
+        tracer = task.tracer if task else Tracer()
+        run_span = tracer.start_span("container.run", image=self.image, resume=resume)
+        start_span = tracer.start_span("container.start", parent=run_span)
+
         # Build docker command
-        cmd = self._build_docker_command(prompt)
+        cmd = self._build_docker_command(
+            prompt,
+            task_id=task_id,
+            resume=resume,
+            revise_of=revise_of,
+            trace_id=tracer.trace_id,
+            parent_span_id=run_span.span_id,
+        )
 
         # Try to run container, fall back to simulation if Docker unavailable
         try:
@@ -64,23 +134,41 @@ class AgentExecutor:
             )
         except FileNotFoundError:
             logger.warning("Docker not available, running simulation")
+            start_span.end(error="Docker not available")
+            run_span.end(error="Docker not available")
             self._run_simulation(task_id, prompt)
             return
         except Exception as e:
             error_msg = f"Failed to start agent container: {e}"
             logger.error(error_msg)
+            start_span.end(error=error_msg)
+            run_span.end(error=error_msg)
+            self._export_trace(tracer)
             task_manager.set_task_error(task_id, error_msg)
             return
 
         # Process container output
-        self._process_container_output(task_id, proc)
-
-    def _build_docker_command(self, prompt: str) -> list:
+        self._process_container_output(task_id, proc, tracer, start_span, run_span)
+
+    def _build_docker_command(
+        self,
+        prompt: str,
+        task_id: Optional[str] = None,
+        resume: bool = False,
+        revise_of: Optional[str] = None,
+        trace_id: Optional[str] = None,
+        parent_span_id: Optional[str] = None,
+    ) -> list:
         """
         Build the Docker command for running the agent.
 
         Args:
             prompt: User's prompt
+            task_id: Task identifier, naming the task's checkpoint in the workspace
+            resume: Continue the task from its last completed phase
+            revise_of: Task whose project (on the workspace volume) the revision starts from
+            trace_id: Trace the runner's spans should join
+            parent_span_id: Backend span the runner's spans are children of
 
         Returns:
             List of command arguments
@@ -105,12 +193,34 @@ class AgentExecutor:
             "-e", f"ALGOD_TOKEN={settings.ALGOD_TOKEN}",
         ])
 
+        # Compiled contracts go to the artifact volume the backend serves
+        cmd.extend([
+            "-v", f"{settings.ARTIFACT_VOLUME}:/artifacts",
+            "-e", "ARTIFACT_DIR=/artifacts",
+        ])
+
+        # Task projects and phase checkpoints outlive the container, so a
+        # failed task can be retried from its last completed phase
+        cmd.extend(["-v", f"{settings.WORKSPACE_VOLUME}:/workspace"])
+
+        # Join the backend's trace
+        if trace_id:
+            cmd.extend(["-e", f"TRACE_ID={trace_id}"])
+        if parent_span_id:
+            cmd.extend(["-e", f"TRACE_PARENT_SPAN_ID={parent_span_id}"])
+
         # Add image and prompt
         cmd.extend([
             self.image,
             "--prompt",
             prompt,
         ])
+        if task_id:
+            cmd.extend(["--task-id", task_id])
+        if resume:
+            cmd.append("--resume")
+        if revise_of:
+            cmd.extend(["--revise-of", revise_of])
 
         return cmd
 
@@ -121,30 +231,32 @@ class AgentExecutor:
         Returns:
             List of environment variable keys
         """
-        return [
-            k for k in os.environ.keys()
-            if k.startswith("AZURE_OPENAI_") or k in {
-                "OPENAI_API_KEY",
-                "OPENAI_API_BASE",
-                "OPENAI_API_VERSION",
-                "OPENAI_DEPLOYMENT",
-                "LITELLM_LOG",
-            }
-        ]
-
-    def _process_container_output(self, task_id: str, proc: subprocess.Popen) -> None:
+        return [k for k in os.environ.keys() if k.startswith(RUNNER_ENV_PREFIXES) or k in RUNNER_ENV_KEYS]
+
+    def _process_container_output(
+        self,
+        task_id: str,
+        proc: subprocess.Popen,
+        tracer: Tracer,
+        start_span: Span,
+        run_span: Span,
+    ) -> None:
         """
         Process output from the agent container.
 
         Args:
             task_id: Task identifier
             proc: Subprocess instance
+            tracer: Task tracer
+            start_span: Span ending at the container's first output line
+            run_span: Span ending when the container exits
         """
         final_result: Optional[Dict[str, Any]] = None
 
         try:
             assert proc.stdout is not None
             for line in proc.stdout:
+                start_span.end()
                 line = line.rstrip("\n")
                 if not line:
                     continue
@@ -162,11 +274,16 @@ class AgentExecutor:
 
             # Wait for process to complete
             return_code = proc.wait()
+            start_span.end()
+            run_span.end(error=None if return_code == 0 else f"exit code {return_code}")
+            self._export_trace(tracer)
 
             # Update task based on result
             if return_code == 0:
                 if final_result is None:
                     final_result = {"message": "Agent finished without explicit result"}
+                self._attach_trace_summary(final_result, tracer)
+                llm_metrics.record_task(final_result)
                 task_manager.set_task_result(task_id, final_result)
                 task_manager.update_task_status(task_id, TaskStatus.COMPLETED)
                 task_manager.add_task_log(task_id, "Agent finished successfully.")
@@ -178,6 +295,8 @@ class AgentExecutor:
 
         except Exception as e:
             error_msg = f"Runtime error: {e}"
+            run_span.end(error=error_msg)
+            self._export_trace(tracer)
             task_manager.set_task_error(task_id, error_msg)
             logger.error(f"Task {task_id} error: {error_msg}")
             try:
@@ -185,6 +304,32 @@ class AgentExecutor:
             except Exception:
                 pass
 
+    def _export_trace(self, tracer: Tracer) -> None:
+        """
+        Write a task's backend spans to the trace directory.
+
+        Args:
+            tracer: Task tracer
+        """
+        try:
+            tracer.export(Path(settings.TRACE_DIR) / f"{tracer.trace_id}.json")
+        except OSError as e:
+            logger.warning(f"Could not write trace {tracer.trace_id}: {e}")
+
+    def _attach_trace_summary(self, result: Dict[str, Any], tracer: Tracer) -> None:
+        """
+        Add the backend span summary next to the runner's trace summary.
+
+        Args:
+            result: Task result payload (modified in place)
+            tracer: Task tracer
+        """
+        trace = result.get("trace")
+        if not isinstance(trace, dict):
+            trace = {"trace_id": tracer.trace_id}
+            result["trace"] = trace
+        trace["backend"] = tracer.summary()["spans"]
+
     def _run_simulation(self, task_id: str, prompt: str) -> None:
         """
         Run a simulation when Docker is not available.
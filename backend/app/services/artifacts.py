@@ -0,0 +1,91 @@
+"""
+Read access to the content-addressed artifact store.
+
+Agent containers compile contracts into a volume shared with the backend
+(see agent-runner/src/artifacts); this module only reads it.
+"""
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+_KEY_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+_TASK_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+# Directory in the store holding the per-task files (test results)
+TASKS_DIR = "tasks"
+
+
+class ArtifactRepository:
+    """Looks up entries and files in the shared artifact store."""
+
+    def __init__(self, root: Path):
+        """
+        Initialize the repository.
+
+        Args:
+            root: Store directory (the mounted artifact volume)
+        """
+        self.root = root
+
+    def manifest(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return an entry's manifest.
+
+        Args:
+            key: Entry key (hex SHA-256)
+
+        Returns:
+            Manifest dict, or None if the key is invalid or unknown
+        """
+        if not _KEY_PATTERN.match(key):
+            return None
+        try:
+            return json.loads((self.root / key[:2] / key / "manifest.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+    def file_path(self, key: str, name: str) -> Optional[Path]:
+        """
+        Resolve a file of an entry.
+
+        Only names listed in the entry's manifest are served, so the path
+        can never leave the entry directory.
+
+        Args:
+            key: Entry key
+            name: File name from the manifest
+
+        Returns:
+            Path to the file, or None if it is not part of the entry
+        """
+        manifest = self.manifest(key)
+        if manifest is None or name not in manifest.get("files", {}):
+            return None
+        path = self.root / key[:2] / key / name
+        return path if path.is_file() else None
+
+    def task_file_path(self, task_id: str, name: str) -> Optional[Path]:
+        """
+        Resolve a file stored for one task, such as its test results.
+
+        Args:
+            task_id: ID of the task (execution) that wrote the file
+            name: File name (no directories)
+
+        Returns:
+            Path to the file, or None if there is no such file
+        """
+        if not _TASK_ID_PATTERN.match(task_id) or "/" in name or name.startswith("."):
+            return None
+        path = self.root / TASKS_DIR / task_id / name
+        return path if path.is_file() else None
+
+
+# Global repository instance
+artifact_repository = ArtifactRepository(Path(settings.ARTIFACT_DIR))
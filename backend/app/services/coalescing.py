@@ -0,0 +1,160 @@
+"""
+Coalescing of duplicate generation requests.
+
+Requests for the same prompt that arrive while an execution for it is
+still running (several users at once, or a double click) share that
+execution: each caller gets a task of its own, which follows the running
+task's logs and result instead of starting another agent container.
+Prompts are compared after normalizing whitespace and case, and paid and
+unpaid requests never share an execution.
+
+An Idempotency-Key header makes retries of /generate safe: a repeated
+request with the same key returns the task created by the first one
+(waiting for it if the first request is still being handled) instead of
+claiming the payment and starting a task again.
+"""
+import asyncio
+import hashlib
+import threading
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from app.models import TaskStatus
+from app.services.agent_executor import agent_executor
+from app.services.payment_verifier import TTLCache
+from app.services.task_manager import task_manager
+
+logger = get_logger(__name__)
+
+
+class IdempotencyKeyReused(ValueError):
+    """An Idempotency-Key was sent again with a different request."""
+
+
+class GenerationCoalescer:
+    """Shares executions between identical generation requests."""
+
+    def __init__(self, enabled: bool, idempotency_ttl_s: float, max_idempotency_keys: int):
+        """
+        Initialize the coalescer.
+
+        Args:
+            enabled: Whether identical concurrent prompts share an execution
+            idempotency_ttl_s: Seconds an Idempotency-Key is remembered
+            max_idempotency_keys: Keys remembered at most (least recently used are dropped)
+        """
+        self.enabled = enabled
+        # Coalescing key -> task running the execution
+        self._executions: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        # Idempotency-Key -> (request fingerprint, task ID)
+        self._keys = TTLCache(max_idempotency_keys, idempotency_ttl_s)
+        # Idempotency-Key -> (request fingerprint, outcome of the request being handled)
+        self._pending: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.stats = {"executions": 0, "coalesced": 0, "idempotent_replays": 0}
+
+    @staticmethod
+    def coalescing_key(prompt: str, paid: bool) -> str:
+        """Return the key under which identical requests share an execution."""
+        normalized = " ".join(prompt.split()).casefold()
+        digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        return f"{'paid' if paid else 'free'}:{digest}"
+
+    @staticmethod
+    def fingerprint(*parts: Optional[str]) -> str:
+        """Return a digest identifying a request by its fields."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or "").encode("utf-8") + b"\0")
+        return digest.hexdigest()
+
+    def start(self, task_id: str, prompt: str, paid: bool) -> Optional[str]:
+        """
+        Run a new task, sharing a running execution of the same prompt if there is one.
+
+        Args:
+            task_id: Newly created task
+            prompt: User's prompt
+            paid: Whether the request was paid for
+
+        Returns:
+            ID of the task whose execution was joined, or None if an
+            execution was started for this task
+        """
+        if self.enabled:
+            key = self.coalescing_key(prompt, paid)
+            with self._lock:
+                self._prune()
+                leader_id = self._executions.get(key)
+                if leader_id is not None and task_manager.follow(task_id, leader_id):
+                    self.stats["coalesced"] += 1
+                    task_manager.add_task_log(
+                        task_id, f"Sharing the execution of task {leader_id}, started for the same prompt"
+                    )
+                    logger.info(f"Coalesced task {task_id} into running task {leader_id}")
+                    return leader_id
+                self._executions[key] = task_id
+
+        agent_executor.execute_task(task_id, prompt)
+        self.stats["executions"] += 1
+        return None
+
+    def _prune(self) -> None:
+        """Forget executions that have ended or whose task was deleted. Called with the lock held."""
+        for key, task_id in list(self._executions.items()):
+            task = task_manager.get_task(task_id)
+            if task is None or task.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                del self._executions[key]
+
+    async def once(self, idempotency_key: str, fingerprint: str, create: Callable[[], Awaitable[str]]) -> str:
+        """
+        Create a task once per Idempotency-Key.
+
+        Args:
+            idempotency_key: Client-chosen key of the request
+            fingerprint: Digest of the request body; a key may only be reused with the same body
+            create: Handles the request and returns the ID of the created task
+
+        Returns:
+            ID of the task created for the key
+
+        Raises:
+            IdempotencyKeyReused: If the key was used for a different request
+        """
+        while True:
+            stored = self._keys.get(idempotency_key)
+            if stored is not None:
+                stored_fingerprint, task_id = stored
+                if stored_fingerprint != fingerprint:
+                    raise IdempotencyKeyReused("Idempotency-Key was already used for a different request")
+                self.stats["idempotent_replays"] += 1
+                return task_id
+
+            pending = self._pending.get(idempotency_key)
+            if pending is None:
+                break
+            pending_fingerprint, outcome = pending
+            if pending_fingerprint != fingerprint:
+                raise IdempotencyKeyReused("Idempotency-Key is in use for a different request")
+            # A failed first attempt is not remembered; then this request tries again
+            await asyncio.shield(outcome)
+
+        outcome = asyncio.get_running_loop().create_future()
+        self._pending[idempotency_key] = (fingerprint, outcome)
+        task_id = None
+        try:
+            task_id = await create()
+            self._keys.put(idempotency_key, (fingerprint, task_id))
+            return task_id
+        finally:
+            del self._pending[idempotency_key]
+            outcome.set_result(task_id)
+
+
+# Global generation coalescer instance
+generation_coalescer = GenerationCoalescer(
+    enabled=settings.GENERATE_COALESCING_ENABLED,
+    idempotency_ttl_s=settings.IDEMPOTENCY_KEY_TTL_S,
+    max_idempotency_keys=settings.IDEMPOTENCY_MAX_KEYS,
+)
@@ -0,0 +1,84 @@
+"""
+Aggregation of LLM metrics reported by finished agent runs.
+"""
+import threading
+from typing import Any, Dict
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Per-phase counters summed across tasks
+_SUMMED_FIELDS = (
+    "calls",
+    "prompt_tokens",
+    "completion_tokens",
+    "cached_tokens",
+    "latency_s",
+    "retries",
+    "errors",
+    "steps",
+    "max_steps",
+    "early_exits",
+    "steps_saved",
+    "tokens_saved",
+)
+
+
+class LLMMetricsAggregator:
+    """Thread-safe accumulator of per-phase LLM metrics across tasks."""
+
+    def __init__(self):
+        """Initialize an empty aggregator."""
+        self._phases: Dict[str, Dict[str, float]] = {}
+        self._tasks = 0
+        self._lock = threading.Lock()
+
+    def record_task(self, result: Dict[str, Any]) -> None:
+        """
+        Add the llm_metrics section of a task result.
+
+        Args:
+            result: Task result payload from the agent runner
+        """
+        metrics = result.get("llm_metrics")
+        if not isinstance(metrics, dict):
+            return
+
+        with self._lock:
+            self._tasks += 1
+            for name, phase in metrics.get("phases", {}).items():
+                entry = self._phases.setdefault(
+                    name, {"tasks": 0, "max_latency_s": 0.0, **{f: 0 for f in _SUMMED_FIELDS}}
+                )
+                entry["tasks"] += 1
+                for field in _SUMMED_FIELDS:
+                    entry[field] += phase.get(field) or 0
+                entry["max_latency_s"] = max(entry["max_latency_s"], phase.get("max_latency_s") or 0.0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return aggregated metrics with per-task and per-call averages.
+
+        Returns:
+            Task count, per-phase metrics and phases ordered by average latency
+        """
+        with self._lock:
+            phases = {name: dict(entry) for name, entry in self._phases.items()}
+            tasks = self._tasks
+
+        for entry in phases.values():
+            calls = entry["calls"]
+            entry["avg_latency_per_call_s"] = round(entry["latency_s"] / calls, 4) if calls else 0.0
+            entry["avg_latency_per_task_s"] = round(entry["latency_s"] / entry["tasks"], 4)
+            entry["avg_tokens_per_task"] = round(
+                (entry["prompt_tokens"] + entry["completion_tokens"]) / entry["tasks"], 1
+            )
+            entry["latency_s"] = round(entry["latency_s"], 4)
+
+        slowest = sorted(phases, key=lambda n: phases[n]["avg_latency_per_task_s"], reverse=True)
+        return {"tasks": tasks, "phases": phases, "slowest_phases": slowest}
+
+
+# Global metrics aggregator instance
+llm_metrics = LLMMetricsAggregator()
@@ -0,0 +1,409 @@
+"""
+On-chain verification of deployment payments.
+
+A payment is valid if it is a confirmed pay transaction from the caller's
+wallet to PAYMENT_RECEIVER_ADDRESS of at least DEPLOYMENT_COST_ALGO, and it
+has not been used for an earlier task.
+
+- Lookups go to the indexer (falling back to algod for transactions the
+  indexer has not ingested yet) over one pooled async HTTP client, so the
+  event loop is never blocked.
+- Payments already recorded by the block watcher (payment_watcher.py) are
+  answered from its local index without any request.
+- Confirmed payments are immutable and kept in an LRU cache with a TTL.
+- Concurrent checks of the same txid share one lookup (single flight).
+- Used txids are recorded in a SQLite file, so a payment cannot be
+  redeemed twice, including across restarts.
+
+Both services are plain base URLs, so a local stub indexer/algod can stand
+in for the real ones; a preconfigured httpx.AsyncClient can also be passed.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+from .payment_watcher import PaymentWatcher
+
+logger = get_logger(__name__)
+
+MICROALGOS_PER_ALGO = 1_000_000
+
+
+def to_microalgos(algo: str) -> int:
+    """Convert a decimal ALGO amount to microAlgos."""
+    return int(Decimal(algo) * MICROALGOS_PER_ALGO)
+
+
+class PaymentLookupError(Exception):
+    """The indexer and algod could not be queried."""
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time."""
+
+    def __init__(self, max_entries: int, ttl_s: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept; the least recently used is evicted first
+            ttl_s: Seconds an entry stays valid
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a live entry and mark it as recently used."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Add or refresh an entry."""
+        self._entries[key] = (time.monotonic() + self.ttl_s, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SpentTxidIndex:
+    """Durable set of payment txids that already paid for a task."""
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS spent ("
+            "txid TEXT PRIMARY KEY, wallet TEXT NOT NULL, amount INTEGER NOT NULL, spent_at REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def claim(self, txid: str, wallet: str, amount: int) -> bool:
+        """
+        Record a txid as spent.
+
+        Returns:
+            True if the txid was unused and is now claimed, False if it was already spent
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT OR IGNORE INTO spent (txid, wallet, amount, spent_at) VALUES (?, ?, ?, ?)",
+                (txid, wallet, amount, time.time()),
+            )
+            return cursor.rowcount == 1
+
+    def release(self, txid: str) -> None:
+        """Forget a claim whose task could not be started."""
+        with self._lock:
+            self._db.execute("DELETE FROM spent WHERE txid = ?", (txid,))
+
+    def is_spent(self, txid: str) -> bool:
+        """Return True if the txid already paid for a task."""
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM spent WHERE txid = ?", (txid,)).fetchone() is not None
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class PaymentVerifier:
+    """Async, cached and replay-protected payment verification."""
+
+    def __init__(
+        self,
+        indexer_url: str,
+        indexer_token: str,
+        algod_url: str,
+        algod_token: str,
+        receiver_address: str,
+        cost_algo: str,
+        spent_db: Path,
+        cache_size: int = 10_000,
+        cache_ttl_s: float = 3600.0,
+        timeout_s: float = 5.0,
+        max_connections: int = 20,
+        client: Optional[httpx.AsyncClient] = None,
+        watcher: Optional[PaymentWatcher] = None,
+    ):
+        """
+        Initialize the verifier.
+
+        Args:
+            indexer_url: Indexer base URL
+            indexer_token: Indexer API token
+            algod_url: Algod base URL (fallback for freshly confirmed payments)
+            algod_token: Algod API token
+            receiver_address: Address payments must be sent to
+            cost_algo: Minimum payment in ALGO (decimal string)
+            spent_db: SQLite file of spent txids
+            cache_size: Confirmed payments kept in memory
+            cache_ttl_s: Seconds a cached payment stays valid
+            timeout_s: Timeout of each HTTP request
+            max_connections: Size of the HTTP connection pool
+            client: HTTP client to use instead of creating one (e.g. for a stub transport)
+            watcher: Block watcher whose local index is consulted before the network
+        """
+        self.indexer_url = indexer_url.rstrip("/")
+        self.indexer_token = indexer_token
+        self.algod_url = algod_url.rstrip("/")
+        self.algod_token = algod_token
+        self.receiver_address = receiver_address
+        self.min_amount = to_microalgos(cost_algo)
+        self.spent_db = spent_db
+        self.timeout_s = timeout_s
+        self.max_connections = max_connections
+        self._client = client
+        self.watcher = watcher
+        self._cache = TTLCache(cache_size, cache_ttl_s)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._spent: Optional[SpentTxidIndex] = None
+        self.stats = {"lookups": 0, "cache_hits": 0, "index_hits": 0, "coalesced": 0}
+
+    @property
+    def spent(self) -> SpentTxidIndex:
+        if self._spent is None:
+            self._spent = SpentTxidIndex(self.spent_db)
+        return self._spent
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout_s,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the HTTP connection pool and the spent-txid index."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._spent is not None:
+            self._spent.close()
+            self._spent = None
+
+    async def verify_payment(self, txn_id: str, wallet_address: str) -> Dict[str, Any]:
+        """
+        Check a payment without using it up.
+
+        Args:
+            txn_id: Payment transaction ID
+            wallet_address: Address that must have sent the payment
+
+        Returns:
+            Dict with "verified", "amount" (ALGO) and "message"
+
+        Raises:
+            PaymentLookupError: If neither the indexer nor algod could be queried
+        """
+        payment = await self.lookup(txn_id)
+        error = self._validate(payment, wallet_address)
+        if error is None and await asyncio.to_thread(self.spent.is_spent, txn_id):
+            error = "Payment has already been used for a deployment"
+        return self._verification(payment, error)
+
+    async def claim_payment(self, txn_id: str, wallet_address: str) -> Dict[str, Any]:
+        """
+        Verify a payment and mark it as spent, so it pays for exactly one task.
+
+        Args:
+            txn_id: Payment transaction ID
+            wallet_address: Address that must have sent the payment
+
+        Returns:
+            Dict with "verified", "amount" (ALGO) and "message"
+
+        Raises:
+            PaymentLookupError: If neither the indexer nor algod could be queried
+        """
+        payment = await self.lookup(txn_id)
+        error = self._validate(payment, wallet_address)
+        if error is None and not await asyncio.to_thread(
+            self.spent.claim, txn_id, wallet_address, payment["amount"]
+        ):
+            error = "Payment has already been used for a deployment"
+        return self._verification(payment, error)
+
+    async def release_payment(self, txn_id: str) -> None:
+        """Make a claimed payment usable again (its task could not be started)."""
+        await asyncio.to_thread(self.spent.release, txn_id)
+
+    async def lookup(self, txn_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a confirmed payment's details, sharing lookups of the same txid.
+
+        Returns:
+            Dict with txid, type, sender, receiver, amount (microAlgos) and
+            round, or None if the transaction is not (yet) confirmed
+        """
+        cached = self._cache.get(txn_id)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+
+        if self.watcher is not None:
+            # A SQLite read; kept off the event loop like the spent-txid index
+            payment = await asyncio.to_thread(self.watcher.lookup, txn_id)
+            if payment is not None:
+                self.stats["index_hits"] += 1
+                self._cache.put(txn_id, payment)
+                return payment
+
+        future = self._inflight.get(txn_id)
+        if future is None:
+            future = asyncio.ensure_future(self._fetch(txn_id))
+            self._inflight[txn_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(txn_id, None))
+        else:
+            self.stats["coalesced"] += 1
+
+        # A cancelled caller must not cancel the lookup other callers wait for
+        payment = await asyncio.shield(future)
+        if payment is not None:
+            self._cache.put(txn_id, payment)
+        return payment
+
+    async def _fetch(self, txn_id: str) -> Optional[Dict[str, Any]]:
+        """Query the indexer, then algod for transactions the indexer has not caught up with."""
+        self.stats["lookups"] += 1
+        errors = []
+        try:
+            payment = await self._fetch_indexer(txn_id)
+            if payment is not None:
+                return payment
+        except httpx.HTTPError as e:
+            errors.append(f"indexer: {e}")
+        try:
+            payment = await self._fetch_algod(txn_id)
+            if payment is not None:
+                return payment
+        except httpx.HTTPError as e:
+            errors.append(f"algod: {e}")
+        if len(errors) == 2:
+            raise PaymentLookupError("; ".join(errors))
+        return None
+
+    async def _fetch_indexer(self, txn_id: str) -> Optional[Dict[str, Any]]:
+        response = await self.client.get(
+            f"{self.indexer_url}/v2/transactions/{txn_id}",
+            headers={"X-Indexer-API-Token": self.indexer_token},
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        txn = response.json().get("transaction", {})
+        if not txn.get("confirmed-round"):
+            return None
+        pay = txn.get("payment-transaction", {})
+        return {
+            "txid": txn_id,
+            "type": txn.get("tx-type"),
+            "sender": txn.get("sender"),
+            "receiver": pay.get("receiver"),
+            "amount": int(pay.get("amount", 0)),
+            "round": txn["confirmed-round"],
+        }
+
+    async def _fetch_algod(self, txn_id: str) -> Optional[Dict[str, Any]]:
+        response = await self.client.get(
+            f"{self.algod_url}/v2/transactions/pending/{txn_id}",
+            headers={"X-Algod-API-Token": self.algod_token},
+        )
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        body = response.json()
+        if not body.get("confirmed-round"):
+            return None
+        txn = body.get("txn", {}).get("txn", {})
+        return {
+            "txid": txn_id,
+            "type": txn.get("type"),
+            "sender": txn.get("snd"),
+            "receiver": txn.get("rcv"),
+            "amount": int(txn.get("amt", 0)),
+            "round": body["confirmed-round"],
+        }
+
+    def _validate(self, payment: Optional[Dict[str, Any]], wallet_address: str) -> Optional[str]:
+        """Return why a payment is not acceptable, or None if it is."""
+        if payment is None:
+            return "Transaction not found or not yet confirmed"
+        if payment["type"] != "pay":
+            return "Transaction is not a payment"
+        if payment["sender"] != wallet_address:
+            return "Payment was not sent from this wallet"
+        if payment["receiver"] != self.receiver_address:
+            return "Payment was not sent to the deployment address"
+        if payment["amount"] < self.min_amount:
+            return (
+                f"Payment of {payment['amount'] / MICROALGOS_PER_ALGO} ALGO is below the deployment cost "
+                f"of {self.min_amount / MICROALGOS_PER_ALGO} ALGO"
+            )
+        return None
+
+    def _verification(self, payment: Optional[Dict[str, Any]], error: Optional[str]) -> Dict[str, Any]:
+        return {
+            "verified": error is None,
+            "amount": payment["amount"] / MICROALGOS_PER_ALGO if payment else 0,
+            "message": error or "Payment verified",
+        }
+
+
+# Global watcher instance, started with the application if enabled
+payment_watcher = PaymentWatcher(
+    algod_url=settings.ALGOD_SERVER,
+    algod_token=settings.ALGOD_TOKEN,
+    receiver_address=settings.PAYMENT_RECEIVER_ADDRESS,
+    min_amount=to_microalgos(settings.DEPLOYMENT_COST_ALGO),
+    index_db=Path(settings.PAYMENT_INDEX_DB),
+    lookback_rounds=settings.PAYMENT_WATCHER_LOOKBACK_ROUNDS,
+    catchup_concurrency=settings.PAYMENT_WATCHER_CATCHUP_CONCURRENCY,
+)
+
+# Global verifier instance
+payment_verifier = PaymentVerifier(
+    indexer_url=settings.INDEXER_SERVER,
+    indexer_token=settings.INDEXER_TOKEN,
+    algod_url=settings.ALGOD_SERVER,
+    algod_token=settings.ALGOD_TOKEN,
+    receiver_address=settings.PAYMENT_RECEIVER_ADDRESS,
+    cost_algo=settings.DEPLOYMENT_COST_ALGO,
+    spent_db=Path(settings.PAYMENT_SPENT_DB),
+    cache_size=settings.PAYMENT_CACHE_SIZE,
+    cache_ttl_s=settings.PAYMENT_CACHE_TTL_S,
+    timeout_s=settings.PAYMENT_HTTP_TIMEOUT_S,
+    max_connections=settings.PAYMENT_HTTP_MAX_CONNECTIONS,
+    watcher=payment_watcher if settings.PAYMENT_WATCHER_ENABLED else None,
+)
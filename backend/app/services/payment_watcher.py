@@ -0,0 +1,301 @@
+"""
+Background indexing of incoming deployment payments.
+
+The watcher follows new blocks from algod and records every payment to
+PAYMENT_RECEIVER_ADDRESS of at least DEPLOYMENT_COST_ALGO in a local SQLite
+index, so the payment verifier can answer with a local lookup instead of a
+round trip to the indexer (which may also lag behind the chain).
+
+The last processed round is stored with the payments. After downtime the
+watcher catches up from there, fetching several blocks at a time; once
+current it long-polls algod for the next block. Algod is a plain base URL
+(or an injected httpx.AsyncClient), so a fake algod serving recorded
+blocks can stand in for a node.
+"""
+import asyncio
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Seconds algod holds a wait-for-block-after request before answering anyway
+_WAIT_TIMEOUT_S = 70.0
+
+
+class PaymentIndex:
+    """Durable index of qualifying payments and the last processed round."""
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the index.
+
+        Args:
+            path: SQLite database file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS payments ("
+            "txid TEXT PRIMARY KEY, sender TEXT NOT NULL, receiver TEXT NOT NULL, "
+            "amount INTEGER NOT NULL, round INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._lock = threading.Lock()
+
+    def get(self, txid: str) -> Optional[Dict[str, Any]]:
+        """Return an indexed payment in the verifier's format, or None."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT sender, receiver, amount, round FROM payments WHERE txid = ?", (txid,)
+            ).fetchone()
+        if row is None:
+            return None
+        sender, receiver, amount, confirmed_round = row
+        return {
+            "txid": txid,
+            "type": "pay",
+            "sender": sender,
+            "receiver": receiver,
+            "amount": amount,
+            "round": confirmed_round,
+        }
+
+    def last_round(self) -> Optional[int]:
+        """Return the last fully processed round, or None for a new index."""
+        with self._lock:
+            row = self._db.execute("SELECT value FROM state WHERE key = 'last_round'").fetchone()
+        return row[0] if row else None
+
+    def commit(self, payments: List[Dict[str, Any]], last_round: int) -> None:
+        """
+        Add the payments of processed rounds and advance the last round, atomically.
+
+        Args:
+            payments: Qualifying payments found in the rounds
+            last_round: Highest round processed
+        """
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO payments (txid, sender, receiver, amount, round) VALUES (?, ?, ?, ?, ?)",
+                    [(p["txid"], p["sender"], p["receiver"], p["amount"], p["round"]) for p in payments],
+                )
+                self._db.execute(
+                    "INSERT OR REPLACE INTO state (key, value) VALUES ('last_round', ?)", (last_round,)
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class PaymentWatcher:
+    """Follows algod's blocks and indexes payments to the receiver address."""
+
+    def __init__(
+        self,
+        algod_url: str,
+        algod_token: str,
+        receiver_address: str,
+        min_amount: int,
+        index_db: Path,
+        lookback_rounds: int = 1000,
+        catchup_concurrency: int = 8,
+        timeout_s: float = 5.0,
+        retry_s: float = 5.0,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        """
+        Initialize the watcher.
+
+        Args:
+            algod_url: Algod base URL
+            algod_token: Algod API token
+            receiver_address: Address whose incoming payments are indexed
+            min_amount: Smallest indexed payment in microAlgos
+            index_db: SQLite file of the payment index
+            lookback_rounds: Rounds scanned before the current one on first start
+            catchup_concurrency: Blocks fetched at the same time while catching up
+            timeout_s: Timeout of block and status requests
+            retry_s: Seconds to wait after algod could not be reached
+            client: HTTP client to use instead of creating one (e.g. for a fake algod)
+        """
+        self.algod_url = algod_url.rstrip("/")
+        self.algod_token = algod_token
+        self.receiver_address = receiver_address
+        self.min_amount = min_amount
+        self.index_db = index_db
+        self.lookback_rounds = lookback_rounds
+        self.catchup_concurrency = max(1, catchup_concurrency)
+        self.timeout_s = timeout_s
+        self.retry_s = retry_s
+        self._client = client
+        self._index: Optional[PaymentIndex] = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_round: Optional[int] = None
+        self.node_round: Optional[int] = None
+        self.stats = {"blocks": 0, "payments": 0, "missing_blocks": 0, "errors": 0}
+
+    @property
+    def index(self) -> PaymentIndex:
+        if self._index is None:
+            self._index = PaymentIndex(self.index_db)
+        return self._index
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout_s)
+        return self._client
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def lookup(self, txid: str) -> Optional[Dict[str, Any]]:
+        """Return an indexed payment, or None if the watcher has not seen it."""
+        return self.index.get(txid)
+
+    def status(self) -> Dict[str, Any]:
+        """Return the watcher's progress."""
+        return {
+            "running": self.running,
+            "last_round": self.last_round,
+            "node_round": self.node_round,
+            "lag_rounds": (self.node_round - self.last_round)
+            if self.node_round is not None and self.last_round is not None else None,
+            **self.stats,
+        }
+
+    def start(self) -> None:
+        """Start following blocks in the background (no-op if already running)."""
+        if not self.running:
+            self._task = asyncio.create_task(self.run(), name="payment-watcher")
+
+    async def stop(self) -> None:
+        """Stop the watcher and close its connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self._index is not None:
+            self._index.close()
+            self._index = None
+
+    async def run(self) -> None:
+        """Catch up with the chain, then process each new block as it is produced."""
+        while True:
+            try:
+                node_round = await self._node_round()
+                if self.last_round is None:
+                    saved = await asyncio.to_thread(self.index.last_round)
+                    self.last_round = saved if saved is not None else max(0, node_round - self.lookback_rounds)
+                    logger.info(
+                        f"Payment watcher: starting after round {self.last_round} "
+                        f"({node_round - self.last_round} rounds behind the node)"
+                    )
+                await self.catch_up(node_round)
+                await self._wait_for_block_after(node_round)
+            except asyncio.CancelledError:
+                raise
+            except (httpx.HTTPError, ValueError, KeyError) as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Payment watcher: algod unavailable ({e}), retrying in {self.retry_s:.0f}s")
+                await asyncio.sleep(self.retry_s)
+
+    async def catch_up(self, node_round: int) -> None:
+        """
+        Process every round after the last processed one up to node_round.
+
+        Args:
+            node_round: Latest round of the node
+        """
+        self.node_round = node_round
+        start = time.perf_counter()
+        first = self.last_round + 1
+        while self.last_round < node_round:
+            rounds = range(self.last_round + 1, min(node_round, self.last_round + self.catchup_concurrency) + 1)
+            blocks = await asyncio.gather(*(self._block_payments(r) for r in rounds))
+            payments = [payment for block in blocks for payment in block]
+            await asyncio.to_thread(self.index.commit, payments, rounds[-1])
+            self.last_round = rounds[-1]
+            self.stats["blocks"] += len(rounds)
+            self.stats["payments"] += len(payments)
+            for payment in payments:
+                logger.info(
+                    f"Payment watcher: indexed {payment['txid']} "
+                    f"({payment['amount']} microAlgos from {payment['sender']}, round {payment['round']})"
+                )
+        caught_up = node_round - first + 1
+        if caught_up > 1:
+            logger.info(f"Payment watcher: caught up {caught_up} rounds in {time.perf_counter() - start:.1f}s")
+
+    async def _block_payments(self, block_round: int) -> List[Dict[str, Any]]:
+        """Return the qualifying payments of one block."""
+        headers = {"X-Algod-API-Token": self.algod_token}
+        block_response, txids_response = await asyncio.gather(
+            self.client.get(f"{self.algod_url}/v2/blocks/{block_round}", params={"format": "json"}, headers=headers),
+            self.client.get(f"{self.algod_url}/v2/blocks/{block_round}/txids", headers=headers),
+        )
+        if block_response.status_code == 404 or txids_response.status_code == 404:
+            # Pruned by a non-archival node after a long downtime
+            self.stats["missing_blocks"] += 1
+            logger.warning(f"Payment watcher: block {block_round} is not available, skipping it")
+            return []
+        block_response.raise_for_status()
+        txids_response.raise_for_status()
+
+        txns = block_response.json()["block"].get("txns") or []
+        txids = txids_response.json()["blockTxids"]
+        payments = []
+        for signed, txid in zip(txns, txids):
+            txn = signed.get("txn", {})
+            if (
+                txn.get("type") == "pay"
+                and txn.get("rcv") == self.receiver_address
+                and int(txn.get("amt", 0)) >= self.min_amount
+            ):
+                payments.append({
+                    "txid": txid,
+                    "sender": txn.get("snd"),
+                    "receiver": txn["rcv"],
+                    "amount": int(txn["amt"]),
+                    "round": block_round,
+                })
+        return payments
+
+    async def _node_round(self) -> int:
+        response = await self.client.get(
+            f"{self.algod_url}/v2/status", headers={"X-Algod-API-Token": self.algod_token}
+        )
+        response.raise_for_status()
+        return int(response.json()["last-round"])
+
+    async def _wait_for_block_after(self, block_round: int) -> None:
+        """Return once algod has a block after block_round (or its wait times out)."""
+        response = await self.client.get(
+            f"{self.algod_url}/v2/status/wait-for-block-after/{block_round}",
+            headers={"X-Algod-API-Token": self.algod_token},
+            timeout=_WAIT_TIMEOUT_S,
+        )
+        response.raise_for_status()
@@ -1,8 +1,13 @@
 """
 Task manager service for handling task storage and retrieval.
+
+Tasks are updated from agent executor threads; status requests can wait
+for the next change of a task (long polling). Waiters park on an asyncio
+event of the task, which an update sets on the waiter's event loop.
 """
+import asyncio
 import threading
-from typing import Dict, Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from app.models import Task, TaskStatus
 from app.core.logging import get_logger
 
@@ -16,18 +21,69 @@ class TaskManager:
         """Initialize task manager."""
         self._tasks: Dict[str, Task] = {}
         self._lock = threading.Lock()
+        # Per task: event set on its next change, and the loop it belongs to
+        self._changed: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = {}
+        # Per running execution: the tasks mirroring its updates
+        self._followers: Dict[str, List[str]] = {}
+
+    def _targets(self, task_id: str) -> List[Task]:
+        """Return a task and its followers. Called with the lock held."""
+        ids = [task_id, *self._followers.get(task_id, ())]
+        return [self._tasks[i] for i in ids if i in self._tasks]
+
+    def _notify(self, task_id: str) -> None:
+        """Wake the waiters of a task. Called with the lock held."""
+        waiters = self._changed.pop(task_id, None)
+        if waiters is None:
+            return
+        loop, event = waiters
+        try:
+            loop.call_soon_threadsafe(event.set)
+        except RuntimeError:
+            # The loop has been closed (shutdown); nobody is waiting anymore
+            pass
+
+    async def wait_for_change(self, task_id: str, version: int, timeout: float) -> Optional[Task]:
+        """
+        Wait until a task has changed since a version.
 
-    def create_task(self, prompt: str) -> Task:
+        Args:
+            task_id: Task identifier
+            version: Version the caller has already seen
+            timeout: Maximum seconds to wait
+
+        Returns:
+            The task (changed, or unchanged after the timeout), or None if
+            it does not exist or was deleted while waiting
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.version != version:
+                return task
+            loop = asyncio.get_running_loop()
+            waiters = self._changed.get(task_id)
+            if waiters is None or waiters[0] is not loop:
+                waiters = self._changed[task_id] = (loop, asyncio.Event())
+            event = waiters[1]
+
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        return self.get_task(task_id)
+
+    def create_task(self, prompt: str, revision_of: Optional[str] = None) -> Task:
         """
         Create a new task.
 
         Args:
             prompt: User's natural language prompt
+            revision_of: Task whose contract the prompt asks to change, for a revision
 
         Returns:
             Created task instance
         """
-        task = Task(prompt)
+        task = Task(prompt, revision_of=revision_of)
         with self._lock:
             self._tasks[task.id] = task
         logger.info(f"Created task {task.id}")
@@ -55,9 +111,11 @@ class TaskManager:
             status: New status
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
+            targets = self._targets(task_id)
+            for task in targets:
                 task.update_status(status)
+                self._notify(task.id)
+            if targets:
                 logger.info(f"Task {task_id} status updated to {status.value}")
 
     def add_task_log(self, task_id: str, message: str) -> None:
@@ -69,9 +127,10 @@ class TaskManager:
             message: Log message
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
+            targets = self._targets(task_id)
+            for task in targets:
                 task.add_log(message)
+                self._notify(task.id)
 
     def set_task_result(self, task_id: str, result: Dict) -> None:
         """
@@ -82,9 +141,11 @@ class TaskManager:
             result: Result dictionary
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
+            targets = self._targets(task_id)
+            for task in targets:
                 task.set_result(result)
+                self._notify(task.id)
+            if targets:
                 logger.info(f"Task {task_id} result set")
 
     def set_task_error(self, task_id: str, error: str) -> None:
@@ -96,11 +157,133 @@ class TaskManager:
             error: Error message
         """
         with self._lock:
-            task = self._tasks.get(task_id)
-            if task:
+            targets = self._targets(task_id)
+            for task in targets:
                 task.set_error(error)
+                self._notify(task.id)
+            if targets:
                 logger.error(f"Task {task_id} failed: {error}")
 
+    def follow(self, task_id: str, leader_id: str) -> bool:
+        """
+        Make a task mirror the updates of a running task.
+
+        The follower first receives the leader's current status, logs and
+        result, then every later update, even if the leader itself is
+        deleted in the meantime.
+
+        Args:
+            task_id: Task that should mirror the leader
+            leader_id: Task whose execution is shared
+
+        Returns:
+            False if either task does not exist or the leader has already finished
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            leader = self._tasks.get(leader_id)
+            if task is None or leader is None or leader.status in (TaskStatus.COMPLETED, TaskStatus.FAILED):
+                return False
+            task.copy_state(leader)
+            task.execution_id = leader_id
+            self._followers.setdefault(leader_id, []).append(task_id)
+            self._notify(task_id)
+        logger.info(f"Task {task_id} follows task {leader_id}")
+        return True
+
+    def execution_of(self, task_id: str) -> str:
+        """
+        Find the task whose execution a task shares.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            ID of the followed task, or task_id if it ran its own execution
+            (or does not exist)
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return task.execution_id if task else task_id
+
+    def finish_execution(self, task_id: str) -> None:
+        """
+        Stop routing the updates of an execution that has ended to its followers.
+
+        Does nothing if the execution has been restarted in the meantime.
+
+        Args:
+            task_id: Task that ran the execution
+        """
+        with self._lock:
+            finished = (TaskStatus.COMPLETED, TaskStatus.FAILED)
+            if all(task.status in finished for task in self._targets(task_id)):
+                self._followers.pop(task_id, None)
+
+    def restart_task(self, task_id: str) -> Optional[str]:
+        """
+        Make a failed task pending again so that it can be retried.
+
+        A task's checkpoint belongs to the execution it ran or followed, so
+        the execution is what is retried: every task sharing it is
+        restarted and follows it again.
+
+        Args:
+            task_id: Task identifier
+
+        Returns:
+            ID of the execution to resume, or None if the task does not
+            exist or has not failed
+        """
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is None or task.status != TaskStatus.FAILED:
+                return None
+            execution_id = task.execution_id
+            sharing = [t for t in self._tasks.values() if t.execution_id == execution_id]
+            followers = [t.id for t in sharing if t.id != execution_id]
+            if followers:
+                self._followers[execution_id] = followers
+            for target in sharing:
+                if target.status == TaskStatus.FAILED:
+                    target.restart()
+                    self._notify(target.id)
+        logger.info(f"Task {task_id} restarted (execution {execution_id})")
+        return execution_id
+
+    def get_snapshots(
+        self,
+        task_ids: Iterable[str],
+        fields: Iterable[str],
+        log_cursors: Optional[Dict[str, int]] = None,
+    ) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """
+        Copy the state of several tasks at one point in time.
+
+        All tasks are read under a single acquisition of the lock, so no
+        update lands between two of them.
+
+        Args:
+            task_ids: Task identifiers
+            fields: Fields to copy (see Task.snapshot)
+            log_cursors: Per task, log lines the caller already has
+
+        Returns:
+            Snapshots by task ID, and the IDs of unknown tasks
+        """
+        fields = tuple(fields)
+        log_cursors = log_cursors or {}
+        snapshots: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        with self._lock:
+            for task_id in task_ids:
+                task = self._tasks.get(task_id)
+                if task is None:
+                    missing.append(task_id)
+                else:
+                    snapshots[task_id] = task.snapshot(fields, log_cursors.get(task_id, 0))
+        return snapshots, missing
+
     def get_all_tasks(self) -> Dict[str, Task]:
         """
         Get all tasks.
@@ -124,6 +307,12 @@ class TaskManager:
         with self._lock:
             if task_id in self._tasks:
                 del self._tasks[task_id]
+                self._notify(task_id)
+                for leader_id, followers in list(self._followers.items()):
+                    if task_id in followers:
+                        followers.remove(task_id)
+                    if not followers:
+                        del self._followers[leader_id]
                 logger.info(f"Deleted task {task_id}")
                 return True
             return False
@@ -0,0 +1,110 @@
+"""
+Micro-benchmark of the /status response path on a task with 10k log lines.
+
+Compares the previous path (TaskStatusResponse validated against the
+response model and encoded by FastAPI's default JSON encoder) with
+json_response(), uncompressed and with gzip and brotli negotiated.
+Reports CPU time per request and bytes sent.
+
+Run from the backend directory:
+
+    python -m benchmarks.status_payload [--lines 10000] [--requests 50]
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.responses import json_response, orjson, brotli
+from app.schemas import TaskStatusResponse
+
+_PHASES = ["PLANNER AGENT", "CODING AGENT", "TESTING AGENT", "DEPLOYMENT AGENT"]
+_WORDS = (
+    "contract state global counter increment approval program compiled teal method abi "
+    "uint64 string application client deploy localnet test passed failed assert value "
+    "transaction round account balance tool read_file write_file execute_shell_command"
+).split()
+
+
+def build_task(lines: int) -> Dict[str, Any]:
+    """Build a task payload resembling a long agent run."""
+    rng = random.Random(42)
+    logs = [
+        f"[2025-01-15T10:{i // 600 % 60:02d}:{i // 10 % 60:02d}Z] {rng.choice(_PHASES)}: "
+        f"step {i} tool call returned {rng.randint(0, 10 ** 6)} bytes "
+        + " ".join(rng.choice(_WORDS) for _ in range(rng.randint(3, 15)))
+        for i in range(lines)
+    ]
+    return {
+        "status": "completed",
+        "logs": logs,
+        "result": {"app_id": "1001", "message": "Contract deployed successfully to LocalNet"},
+        "error": None,
+    }
+
+
+def build_app(task: Dict[str, Any]) -> FastAPI:
+    """App serving the same task through the old and the new response path."""
+    app = FastAPI()
+
+    @app.get("/old", response_model=TaskStatusResponse)
+    async def old():
+        return TaskStatusResponse(**task)
+
+    @app.get("/new", response_model=TaskStatusResponse)
+    async def new(request: Request):
+        return json_response(request, task)
+
+    return app
+
+
+def measure(call: Callable[[], bytes], requests: int) -> Dict[str, float]:
+    """Return CPU milliseconds per request and the response size."""
+    body = call()  # warm up
+    start = time.process_time()
+    for _ in range(requests):
+        body = call()
+    cpu_ms = (time.process_time() - start) * 1000 / requests
+    return {"cpu_ms": cpu_ms, "bytes": len(body)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--lines", type=int, default=10_000, help="Log lines in the task")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per variant")
+    args = parser.parse_args()
+
+    task = build_task(args.lines)
+    # The test client would transparently decompress; count the wire bytes instead
+    client = TestClient(build_app(task))
+
+    def get(path: str, encoding: str) -> bytes:
+        with client.stream("GET", path, headers={"Accept-Encoding": encoding}) as response:
+            return b"".join(response.iter_raw())
+
+    variants = [
+        ("default encoder, validated", "/old", "identity"),
+        ("fast encoder, uncompressed", "/new", "identity"),
+        ("fast encoder, gzip", "/new", "gzip"),
+    ]
+    if brotli is not None:
+        variants.append(("fast encoder, brotli", "/new", "br"))
+
+    print(f"Task with {args.lines} log lines, {args.requests} requests per variant "
+          f"(orjson {'on' if orjson else 'off'}, brotli {'on' if brotli else 'off'})")
+    baseline = None
+    for label, path, encoding in variants:
+        stats = measure(lambda: get(path, encoding), args.requests)
+        baseline = baseline or stats
+        print(
+            f"  {label:<28} {stats['cpu_ms']:8.2f} ms CPU/request "
+            f"({baseline['cpu_ms'] / stats['cpu_ms']:4.1f}x)  {stats['bytes']:>10,} bytes "
+            f"({100 * (1 - stats['bytes'] / baseline['bytes']):5.1f}% saved)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+"""
+Shared pytest setup for the backend tests.
+
+Run from backend/: `python -m pytest tests`
+"""
+import sys
+from pathlib import Path
+
+# Make `app` importable however pytest is invoked
+sys.path.insert(0, str(Path(__file__).parent.parent))
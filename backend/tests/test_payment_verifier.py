@@ -0,0 +1,185 @@
+"""
+Payment verification against a fake indexer (httpx.MockTransport).
+"""
+import asyncio
+
+import httpx
+
+from app.services.payment_verifier import PaymentVerifier
+
+RECEIVER = "RECEIVER"
+WALLET = "WALLET"
+
+# txid -> (receiver, amount in microAlgos)
+PAYMENTS = {
+    "PAID": (RECEIVER, 500_000),
+    "TOO_SMALL": (RECEIVER, 100_000),
+    "ELSEWHERE": ("SOMEONE_ELSE", 500_000),
+}
+
+
+class FakeIndexer:
+    """Serves the PAYMENTS as confirmed indexer transactions and counts requests."""
+
+    def __init__(self):
+        self.requests = []
+        # Set to hold responses until the test releases them
+        self.gate = None
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request.url.path)
+        if self.gate is not None:
+            await self.gate.wait()
+        txid = request.url.path.rsplit("/", 1)[-1]
+        if request.url.host != "indexer" or txid not in PAYMENTS:
+            return httpx.Response(404)
+        receiver, amount = PAYMENTS[txid]
+        return httpx.Response(200, json={"transaction": {
+            "id": txid,
+            "tx-type": "pay",
+            "sender": WALLET,
+            "confirmed-round": 42,
+            "payment-transaction": {"receiver": receiver, "amount": amount},
+        }})
+
+
+def make_verifier(tmp_path, indexer):
+    return PaymentVerifier(
+        indexer_url="http://indexer",
+        indexer_token="token",
+        algod_url="http://algod",
+        algod_token="token",
+        receiver_address=RECEIVER,
+        cost_algo="0.5",
+        spent_db=tmp_path / "spent.sqlite3",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(indexer)),
+    )
+
+
+def run(verifier, coroutine_fn):
+    async def main():
+        try:
+            return await coroutine_fn()
+        finally:
+            await verifier.close()
+    return asyncio.run(main())
+
+
+def test_confirmed_payment_is_verified(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    result = run(verifier, lambda: verifier.verify_payment("PAID", WALLET))
+
+    assert result == {"verified": True, "amount": 0.5, "message": "Payment verified"}
+
+
+def test_payment_below_cost_is_rejected(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    result = run(verifier, lambda: verifier.verify_payment("TOO_SMALL", WALLET))
+
+    assert not result["verified"]
+    assert "below the deployment cost" in result["message"]
+
+
+def test_payment_to_wrong_receiver_is_rejected(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    result = run(verifier, lambda: verifier.verify_payment("ELSEWHERE", WALLET))
+
+    assert not result["verified"]
+    assert result["message"] == "Payment was not sent to the deployment address"
+
+
+def test_payment_from_other_wallet_is_rejected(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    result = run(verifier, lambda: verifier.verify_payment("PAID", "OTHER_WALLET"))
+
+    assert not result["verified"]
+    assert result["message"] == "Payment was not sent from this wallet"
+
+
+def test_spent_txid_cannot_be_reused(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    async def claim_twice():
+        first = await verifier.claim_payment("PAID", WALLET)
+        second = await verifier.claim_payment("PAID", WALLET)
+        check = await verifier.verify_payment("PAID", WALLET)
+        return first, second, check
+
+    first, second, check = run(verifier, claim_twice)
+
+    assert first["verified"]
+    assert not second["verified"]
+    assert second["message"] == "Payment has already been used for a deployment"
+    assert not check["verified"]
+
+
+def test_spent_txids_survive_a_restart(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+    assert run(verifier, lambda: verifier.claim_payment("PAID", WALLET))["verified"]
+
+    restarted = make_verifier(tmp_path, FakeIndexer())
+    result = run(restarted, lambda: restarted.claim_payment("PAID", WALLET))
+
+    assert not result["verified"]
+
+
+def test_released_payment_can_be_claimed_again(tmp_path):
+    verifier = make_verifier(tmp_path, FakeIndexer())
+
+    async def claim_release_claim():
+        await verifier.claim_payment("PAID", WALLET)
+        await verifier.release_payment("PAID")
+        return await verifier.claim_payment("PAID", WALLET)
+
+    assert run(verifier, claim_release_claim)["verified"]
+
+
+def test_confirmed_payments_are_cached(tmp_path):
+    indexer = FakeIndexer()
+    verifier = make_verifier(tmp_path, indexer)
+
+    async def verify_twice():
+        await verifier.verify_payment("PAID", WALLET)
+        return await verifier.verify_payment("PAID", WALLET)
+
+    assert run(verifier, verify_twice)["verified"]
+    assert len(indexer.requests) == 1
+    assert verifier.stats["lookups"] == 1
+    assert verifier.stats["cache_hits"] == 1
+
+
+def test_unconfirmed_payments_are_not_cached(tmp_path):
+    indexer = FakeIndexer()
+    verifier = make_verifier(tmp_path, indexer)
+
+    async def look_twice():
+        await verifier.lookup("UNKNOWN")
+        return await verifier.lookup("UNKNOWN")
+
+    assert run(verifier, look_twice) is None
+    # Indexer and algod fallback, twice
+    assert len(indexer.requests) == 4
+    assert verifier.stats["cache_hits"] == 0
+
+
+def test_concurrent_lookups_share_one_request(tmp_path):
+    indexer = FakeIndexer()
+    verifier = make_verifier(tmp_path, indexer)
+
+    async def verify_concurrently():
+        indexer.gate = asyncio.Event()
+        checks = [asyncio.ensure_future(verifier.verify_payment("PAID", WALLET)) for _ in range(5)]
+        await asyncio.sleep(0)
+        indexer.gate.set()
+        return await asyncio.gather(*checks)
+
+    results = run(verifier, verify_concurrently)
+
+    assert all(result["verified"] for result in results)
+    assert len(indexer.requests) == 1
+    assert verifier.stats["lookups"] == 1
+    assert verifier.stats["coalesced"] == 4
@@ -0,0 +1,195 @@
+"""
+Payment watcher against a fake algod (httpx.MockTransport) serving scripted blocks.
+"""
+import asyncio
+
+import httpx
+
+from app.services.payment_verifier import PaymentVerifier
+from app.services.payment_watcher import PaymentWatcher
+
+RECEIVER = "RECEIVER"
+WALLET = "WALLET"
+
+
+def pay(txid, receiver=RECEIVER, amount=500_000, sender=WALLET):
+    return txid, {"txn": {"type": "pay", "snd": sender, "rcv": receiver, "amt": amount}}
+
+
+class FakeAlgod:
+    """Serves blocks by round; wait-for-block-after produces the next queued block."""
+
+    def __init__(self, blocks, last_round):
+        # round -> [(txid, signed transaction)]
+        self.blocks = dict(blocks)
+        self.last_round = last_round
+        self.upcoming = []
+        self.requests = []
+        self._produced = None
+
+    def produce(self, txns):
+        """Queue a block for the next wait-for-block-after request."""
+        self.upcoming.append(txns)
+        if self._produced is not None:
+            self._produced.set()
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        self.requests.append(path)
+        if path == "/v2/status":
+            return httpx.Response(200, json={"last-round": self.last_round})
+        if path.startswith("/v2/status/wait-for-block-after/"):
+            while not self.upcoming:
+                self._produced = asyncio.Event()
+                await self._produced.wait()
+            self.last_round += 1
+            self.blocks[self.last_round] = self.upcoming.pop(0)
+            return httpx.Response(200, json={"last-round": self.last_round})
+        parts = path.split("/")
+        block_round = int(parts[3])
+        if block_round not in self.blocks:
+            return httpx.Response(404)
+        txns = self.blocks[block_round]
+        if path.endswith("/txids"):
+            return httpx.Response(200, json={"blockTxids": [txid for txid, _ in txns]})
+        return httpx.Response(200, json={"block": {"rnd": block_round, "txns": [signed for _, signed in txns]}})
+
+
+def make_watcher(tmp_path, algod, lookback_rounds=5):
+    return PaymentWatcher(
+        algod_url="http://algod",
+        algod_token="token",
+        receiver_address=RECEIVER,
+        min_amount=500_000,
+        index_db=tmp_path / "index.sqlite3",
+        lookback_rounds=lookback_rounds,
+        catchup_concurrency=3,
+        retry_s=0.01,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(algod)),
+    )
+
+
+async def until(condition, timeout=5.0):
+    """Wait until condition() holds."""
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.005)
+
+
+def test_catch_up_indexes_qualifying_payments_within_lookback(tmp_path):
+    algod = FakeAlgod({
+        12: [pay("TOO_OLD")],
+        17: [pay("PAID"), pay("OTHER_RECEIVER", receiver="SOMEONE_ELSE")],
+        18: [pay("TOO_SMALL", amount=1000)],
+        19: [("APPCALL", {"txn": {"type": "appl", "snd": WALLET}})],
+        **{r: [] for r in range(13, 21) if r not in (17, 18, 19)},
+    }, last_round=20)
+    watcher = make_watcher(tmp_path, algod)
+
+    async def main():
+        watcher.start()
+        await until(lambda: watcher.last_round == 20)
+        await watcher.stop()
+
+    asyncio.run(main())
+
+    reopened = make_watcher(tmp_path, algod)
+    assert reopened.lookup("PAID") == {
+        "txid": "PAID", "type": "pay", "sender": WALLET, "receiver": RECEIVER, "amount": 500_000, "round": 17,
+    }
+    for txid in ("TOO_OLD", "OTHER_RECEIVER", "TOO_SMALL", "APPCALL"):
+        assert reopened.lookup(txid) is None
+    assert reopened.index.last_round() == 20
+    assert watcher.stats["blocks"] == 5
+    assert watcher.stats["payments"] == 1
+    assert "/v2/blocks/12" not in algod.requests
+
+
+def test_restart_resumes_after_the_saved_round(tmp_path):
+    algod = FakeAlgod({r: [] for r in range(16, 21)}, last_round=20)
+
+    async def follow_until(watcher, last_round):
+        watcher.start()
+        await until(lambda: watcher.last_round == last_round)
+        await watcher.stop()
+
+    asyncio.run(follow_until(make_watcher(tmp_path, algod), 20))
+
+    algod.blocks.update({21: [pay("WHILE_DOWN")], 22: []})
+    algod.last_round = 22
+    algod.requests.clear()
+    restarted = make_watcher(tmp_path, algod)
+    asyncio.run(follow_until(restarted, 22))
+
+    assert restarted.lookup("WHILE_DOWN") is not None
+    fetched = {path for path in algod.requests if path.startswith("/v2/blocks/")}
+    assert fetched == {"/v2/blocks/21", "/v2/blocks/21/txids", "/v2/blocks/22", "/v2/blocks/22/txids"}
+
+
+def test_new_blocks_are_indexed_after_waiting_for_them(tmp_path):
+    algod = FakeAlgod({r: [] for r in range(6, 11)}, last_round=10)
+    watcher = make_watcher(tmp_path, algod)
+
+    async def main():
+        watcher.start()
+        await until(lambda: watcher.last_round == 10)
+        assert watcher.lookup("NEW") is None
+        algod.produce([pay("NEW")])
+        await until(lambda: watcher.last_round == 11)
+        payment = watcher.lookup("NEW")
+        await watcher.stop()
+        return payment
+
+    assert asyncio.run(main())["round"] == 11
+    assert any(path.startswith("/v2/status/wait-for-block-after/10") for path in algod.requests)
+
+
+def test_pruned_blocks_are_skipped(tmp_path):
+    algod = FakeAlgod({6: [], 7: [], 9: [pay("AFTER_GAP")], 10: []}, last_round=10)
+    watcher = make_watcher(tmp_path, algod)
+
+    async def main():
+        watcher.start()
+        await until(lambda: watcher.last_round == 10)
+        await watcher.stop()
+
+    asyncio.run(main())
+
+    assert watcher.stats["missing_blocks"] == 1
+    assert make_watcher(tmp_path, algod).lookup("AFTER_GAP") is not None
+
+
+def test_verifier_answers_indexed_payments_without_a_request(tmp_path):
+    algod = FakeAlgod({r: [] for r in range(6, 10)} | {10: [pay("PAID")]}, last_round=10)
+    watcher = make_watcher(tmp_path, algod)
+    network = []
+
+    def no_network(request):
+        network.append(request.url.path)
+        return httpx.Response(500)
+
+    verifier = PaymentVerifier(
+        indexer_url="http://indexer",
+        indexer_token="token",
+        algod_url="http://algod",
+        algod_token="token",
+        receiver_address=RECEIVER,
+        cost_algo="0.5",
+        spent_db=tmp_path / "spent.sqlite3",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(no_network)),
+        watcher=watcher,
+    )
+
+    async def main():
+        watcher.start()
+        await until(lambda: watcher.last_round == 10)
+        try:
+            return await verifier.verify_payment("PAID", WALLET)
+        finally:
+            await watcher.stop()
+            await verifier.close()
+
+    assert asyncio.run(main())["verified"]
+    assert verifier.stats["index_hits"] == 1
+    assert network == []